@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+
+# ==============================================================================
+# asyncio twin of freeton_utils;
+# network calls go through TonClient(is_async=True) from the shared pool,
+# offline helpers (addresses, artifacts, message bodies) are reused as is;
+#
+import asyncio
+import freeton_utils
+from   freeton_utils import *
+
+# ==============================================================================
+#
+ASYNC_LIMIT = 32
+
+# ==============================================================================
+#
+def getAsyncClient(serverAddress: str = None):
+    return getClient(serverAddress=serverAddress, isAsync=True)
+
+# ==============================================================================
+# Runs coroutines with at most "limit" of them in flight;
+# with "cancelOnError" the first exception cancels everything that is left,
+# otherwise exceptions are returned in place of results;
+async def gatherWithLimit(coroutines, limit: int = ASYNC_LIMIT, cancelOnError: bool = False):
+
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _limited(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    tasks = [asyncio.ensure_future(_limited(coroutine)) for coroutine in coroutines]
+    try:
+        return await asyncio.gather(*tasks, return_exceptions=not cancelOnError)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+# ==============================================================================
+#
+async def deployContract(tonClient: TonClient, abiPath, tvcPath, constructorInput, initialData, signer, initialPubkey):
+
+    try:
+        (abi, tvc)    = getAbiTvc(abiPath, tvcPath)
+        callSet       = CallSet(function_name='constructor', input=constructorInput)
+        deploySet     = DeploySet(tvc=tvc, initial_pubkey=initialPubkey, initial_data=initialData)
+        params        = ParamsOfEncodeMessage(abi=abi, signer=signer, call_set=callSet, deploy_set=deploySet)
+        encoded       = await tonClient.abi.encode_message(params=params)
+
+        messageParams = ParamsOfSendMessage(message=encoded.message, send_events=False, abi=abi)
+        messageResult = await tonClient.processing.send_message(params=messageParams)
+        waitParams    = ParamsOfWaitForTransaction(message=encoded.message, shard_block_id=messageResult.shard_block_id, send_events=False, abi=abi)
+        result        = await tonClient.processing.wait_for_transaction(params=waitParams)
+
+        return (result, dict(NO_ERROR))
+
+    except TonException as ton:
+        if freeton_utils.THROW:
+            raise ton
+        exceptionDetails = getValuesFromException(ton)
+        return ({}, exceptionDetails)
+
+# ==============================================================================
+#
+async def runFunctionInternal(tonClient: TonClient, boc: str, abiPath: str, contractAddress: str, functionName: str, functionParams):
+
+    abi          = getAbi(abiPath)
+    callSet      = CallSet(function_name=functionName, input=functionParams)
+    params       = ParamsOfEncodeMessage(abi=abi, address=contractAddress, signer=Signer.NoSigner(), call_set=callSet)
+    encoded      = await tonClient.abi.encode_message(params=params)
+
+    paramsRun    = ParamsOfRunTvm(message=encoded.message, account=boc, abi=abi)
+    result       = await tonClient.tvm.run_tvm(params=paramsRun)
+
+    paramsDecode = ParamsOfDecodeMessage(abi=abi, message=result.out_messages[0])
+    decoded      = await tonClient.abi.decode_message(params=paramsDecode)
+
+    if len(decoded.value) == 1 and list(decoded.value.keys())[0] == "value0":
+        result = decoded.value["value0"]
+    else:
+        result = decoded.value
+
+    return result
+
+async def runFunction(tonClient: TonClient, abiPath, contractAddress, functionName, functionParams):
+
+    result = await getAccountGraphQL(tonClient, contractAddress, "boc")
+    if result == "":
+        return ""
+    if result["boc"] is None:
+        return ""
+
+    return (await runFunctionInternal(tonClient=tonClient, boc=result["boc"], abiPath=abiPath, contractAddress=contractAddress, functionName=functionName, functionParams=functionParams))
+
+async def runFunctionsInternal(tonClient: TonClient, boc: str, contractAddress: str, calls):
+
+    pin    = "getters-{}".format(next(freeton_utils.GETTERS_PIN))
+    bocRef = (await tonClient.boc.cache_set(params=ParamsOfBocCacheSet(boc=boc, cache_type=BocCacheType.Pinned(pin=pin)))).boc_ref
+
+    async def _run(abiPath, functionName, functionParams):
+        try:
+            abi       = getAbi(abiPath)
+            callSet   = CallSet(function_name=functionName, input=functionParams)
+            params    = ParamsOfEncodeMessage(abi=abi, address=contractAddress, signer=Signer.NoSigner(), call_set=callSet)
+            encoded   = await tonClient.abi.encode_message(params=params)
+            paramsRun = ParamsOfRunTvm(message=encoded.message, account=bocRef, abi=abi, return_updated_account=False)
+            output    = (await tonClient.tvm.run_tvm(params=paramsRun)).decoded.output
+            return (freeton_utils._unwrapOutput(output), dict(NO_ERROR))
+        except TonException as ton:
+            return ({}, getValuesFromException(ton))
+
+    try:
+        return list(await asyncio.gather(*[_run(*call) for call in calls]))
+    finally:
+        await tonClient.boc.cache_unpin(params=ParamsOfBocCacheUnpin(pin=pin))
+
+async def runFunctionsMany(tonClient: TonClient, contractAddresses, calls, limit: int = ASYNC_LIMIT):
+
+    accounts = await getAccountsGraphQL(tonClient=tonClient, accountIDsArray=contractAddresses, fields="id, boc")
+    bocs     = {address: account["boc"] for address, account in accounts.items() if account["boc"] is not None}
+    results  = await gatherWithLimit([runFunctionsInternal(tonClient=tonClient, boc=boc, contractAddress=address, calls=calls) for (address, boc) in bocs.items()], limit=limit, cancelOnError=True)
+    result   = dict(zip(bocs.keys(), results))
+    return {address: result.get(address, []) for address in contractAddresses}
+
+# ==============================================================================
+#
+async def callFunction(tonClient: TonClient, abiPath, contractAddress, functionName, functionParams, signer, waitForTransaction: bool = True):
+
+    try:
+        abi           = getAbi(abiPath)
+        callSet       = CallSet(function_name=functionName, input=functionParams)
+        params        = ParamsOfEncodeMessage(abi=abi, address=contractAddress, signer=signer, call_set=callSet)
+        encoded       = await tonClient.abi.encode_message(params=params)
+
+        messageParams = ParamsOfSendMessage(message=encoded.message, send_events=False, abi=abi)
+        messageResult = await tonClient.processing.send_message(params=messageParams)
+        BOC_CACHE.invalidate(contractAddress)
+
+        if waitForTransaction:
+            waitParams    = ParamsOfWaitForTransaction(message=encoded.message, shard_block_id=messageResult.shard_block_id, send_events=False, abi=abi)
+            result        = await tonClient.processing.wait_for_transaction(params=waitParams)
+        else:
+            result = ""
+
+        return (result, dict(NO_ERROR))
+
+    except TonException as ton:
+        if freeton_utils.THROW:
+            raise ton
+        exceptionDetails = getValuesFromException(ton)
+        return ({}, exceptionDetails)
+
+# ==============================================================================
+# Same contract as freeton_utils.callFunctionPipelined, async generator;
+#
+async def sendFunctionMessage(tonClient: TonClient, abiPath, contractAddress, functionName, functionParams, signer):
+
+    abi           = getAbi(abiPath)
+    callSet       = CallSet(function_name=functionName, input=functionParams)
+    params        = ParamsOfEncodeMessage(abi=abi, address=contractAddress, signer=signer, call_set=callSet)
+    encoded       = await tonClient.abi.encode_message(params=params)
+
+    messageParams = ParamsOfSendMessage(message=encoded.message, send_events=False, abi=abi)
+    messageResult = await tonClient.processing.send_message(params=messageParams)
+    BOC_CACHE.invalidate(contractAddress)
+
+    return ParamsOfWaitForTransaction(message=encoded.message, shard_block_id=messageResult.shard_block_id, send_events=False, abi=abi)
+
+async def callFunctionPipelined(tonClient: TonClient, calls, limit: int = ASYNC_LIMIT):
+
+    waiting = {}
+    for index, call in enumerate(calls):
+        try:
+            waiting[index] = await sendFunctionMessage(tonClient=tonClient, **call)
+        except TonException as ton:
+            if freeton_utils.THROW:
+                raise ton
+            yield (index, {}, getValuesFromException(ton))
+
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _wait(index, waitParams):
+        async with semaphore:
+            try:
+                return (index, await tonClient.processing.wait_for_transaction(params=waitParams), dict(NO_ERROR))
+            except TonException as ton:
+                if freeton_utils.THROW:
+                    raise ton
+                return (index, {}, getValuesFromException(ton))
+
+    tasks = [asyncio.ensure_future(_wait(index, waitParams)) for index, waitParams in waiting.items()]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+# ==============================================================================
+# Same contract as freeton_utils.prebuildMessage/sendPrebuiltMessage/PrebuiltQueue;
+#
+async def prebuildMessage(tonClient: TonClient, abiPath, contractAddress, functionName, functionParams, signer, expire: int):
+
+    header  = FunctionHeader(expire=expire, time=freeton_utils._getPrebuildTime(tonClient))
+    callSet = CallSet(function_name=functionName, header=header, input=functionParams)
+    params  = ParamsOfEncodeMessage(abi=getAbi(abiPath), address=contractAddress, signer=signer, call_set=callSet)
+    encoded = await tonClient.abi.encode_message(params=params)
+    return PrebuiltMessage(abiPath=abiPath, contractAddress=contractAddress, functionName=functionName, functionParams=functionParams,
+        message=encoded.message, messageID=encoded.message_id, expire=expire)
+
+async def sendPrebuiltMessage(tonClient: TonClient, prebuilt: PrebuiltMessage, waitForTransaction: bool = True):
+
+    try:
+        abi           = getAbi(prebuilt.abiPath)
+        messageParams = ParamsOfSendMessage(message=prebuilt.message, send_events=False, abi=abi)
+        messageResult = await tonClient.processing.send_message(params=messageParams)
+        BOC_CACHE.invalidate(prebuilt.contractAddress)
+        if not waitForTransaction:
+            return (messageResult, dict(NO_ERROR))
+
+        waitParams    = ParamsOfWaitForTransaction(message=prebuilt.message, shard_block_id=messageResult.shard_block_id, send_events=False, abi=abi)
+        result        = await tonClient.processing.wait_for_transaction(params=waitParams)
+        return (result, dict(NO_ERROR))
+
+    except TonException as ton:
+        if freeton_utils.THROW:
+            raise ton
+        exceptionDetails = getValuesFromException(ton)
+        return ({}, exceptionDetails)
+
+class AsyncPrebuiltQueue(PrebuiltQueue):
+    async def send(self, key, waitForTransaction: bool = True):
+        prebuilt = self._take(key)
+        if prebuilt is None:
+            return ({}, dict(NO_PREBUILT_MESSAGE))
+        return await sendPrebuiltMessage(tonClient=self.TONCLIENT, prebuilt=prebuilt, waitForTransaction=waitForTransaction)
+
+# ==============================================================================
+#
+async def queryCollectionIn(tonClient: TonClient, collection: str, keyField: str, keysArray, fields: str, limit: int = ACCOUNTS_QUERY_LIMIT):
+
+    if keyField not in [field.strip() for field in fields.split(",")]:
+        fields = keyField + ", " + fields
+
+    result     = {}
+    uniqueKeys = list(dict.fromkeys(keysArray))
+
+    async def _queryChunk(chunk):
+        lastKey = ""
+        while True:
+            keyFilter = {"in":chunk} if lastKey == "" else {"in":chunk, "gt":lastKey}
+            paramsCollection = ParamsOfQueryCollection(
+            collection=collection, result=fields, limit=limit,
+            filter={keyField:keyFilter},
+            order=[OrderBy(path=keyField, direction=SortDirection.ASC)])
+
+            page = (await tonClient.net.query_collection(params=paramsCollection)).result
+            for item in page:
+                result[item[keyField]] = item
+
+            if len(page) < limit or all(key in result for key in chunk):
+                break
+            lastKey = page[-1][keyField]
+
+    # chunks are independent, query them concurrently
+    await gatherWithLimit([_queryChunk(uniqueKeys[start : start + limit]) for start in range(0, len(uniqueKeys), limit)], cancelOnError=True)
+    return result
+
+async def getAccountsGraphQL(tonClient: TonClient, accountIDsArray, fields: str, limit: int = ACCOUNTS_QUERY_LIMIT):
+    return await queryCollectionIn(tonClient=tonClient, collection="accounts", keyField="id", keysArray=accountIDsArray, fields=fields, limit=limit)
+
+async def getAccountGraphQL(tonClient: TonClient, accountID, fields):
+    result = await getAccountsGraphQL(tonClient=tonClient, accountIDsArray=[accountID], fields=fields, limit=1)
+    return result.get(accountID, "")
+
+async def getBalances(tonClient: TonClient, accountIDsArray):
+    result = await getAccountsGraphQL(tonClient=tonClient, accountIDsArray=accountIDsArray, fields="id, balance(format:DEC)")
+    return {accountID: int(account["balance"]) for accountID, account in result.items()}
+
+# ==============================================================================
+#
+class AsyncSetcodeMultisig(SetcodeMultisig):
+    def __init__(self, tonClient: TonClient = None, signer: Signer = None):
+        SetcodeMultisig.__init__(self, tonClient=getAsyncClient() if tonClient is None else tonClient, signer=signer)
+
+    async def deploy(self):
+        result = await deployContract(tonClient=self.TONCLIENT, abiPath=self.ABI, tvcPath=self.TVC, constructorInput=self.CONSTRUCTOR, initialData=self.INITDATA, signer=self.SIGNER, initialPubkey=self.PUBKEY)
+        return result
+
+    async def call(self, functionName, functionParams):
+        result = await callFunction(tonClient=self.TONCLIENT, abiPath=self.ABI, contractAddress=self.ADDRESS, functionName=functionName, functionParams=functionParams, signer=self.SIGNER)
+        return result
+
+    async def callTransfer(self, addressDest, value, payload, flags):
+        result = await self.call(functionName="sendTransaction", functionParams={"dest":addressDest, "value":value, "bounce":False, "flags":flags, "payload":payload})
+        return result
+
+    async def prebuildTransfer(self, addressDest, value, payload, flags, expire: int):
+        result = await prebuildMessage(tonClient=self.TONCLIENT, abiPath=self.ABI, contractAddress=self.ADDRESS, functionName="sendTransaction",
+            functionParams={"dest":addressDest, "value":value, "bounce":False, "flags":flags, "payload":payload}, signer=self.SIGNER, expire=expire)
+        return result
+
+    async def run(self, functionName, functionParams):
+        result = await runFunction(tonClient=self.TONCLIENT, abiPath=self.ABI, contractAddress=self.ADDRESS, functionName=functionName, functionParams=functionParams)
+        return result
+
+    async def destroy(self, addressDest):
+        result = await callFunction(tonClient=self.TONCLIENT, abiPath=self.ABI, contractAddress=self.ADDRESS, functionName="sendTransaction", functionParams={"dest":addressDest, "value":0, "bounce":False, "flags":128+32, "payload":""}, signer=self.SIGNER)
+        return result
+
+    async def getBalance(self):
+        result = await getAccountGraphQL(tonClient=self.TONCLIENT, accountID=self.ADDRESS, fields="balance(format:DEC)")
+        return int(result["balance"])
+
+# ==============================================================================
+#
@@ -6,15 +6,18 @@ import freeton_utils
 from   freeton_utils import *
 
 class AuctionDebot(object):
+    SIGNER  = lazySigner()
+    PUBKEY  = LazyAttribute(lambda self: self.SIGNER.keys.public)
+    ADDRESS = lazyAddress()
+
     def __init__(self, tonClient: TonClient, ownerAddress: str, signer: Signer = None):
-        self.SIGNER      = generateSigner() if signer is None else signer
-        self.TONCLIENT   = tonClient
+        if signer is not None:
+            self.SIGNER  = signer
+        self.TONCLIENT   = getClient() if tonClient is None else tonClient
         self.ABI         = "../bin/AuctionDebot.abi.json"
         self.TVC         = "../bin/AuctionDebot.tvc"
         self.CONSTRUCTOR = {"ownerAddress":ownerAddress}
         self.INITDATA    = {}
-        self.PUBKEY      = self.SIGNER.keys.public
-        self.ADDRESS     = getAddress(abiPath=self.ABI, tvcPath=self.TVC, signer=self.SIGNER, initialPubkey=self.PUBKEY, initialData=self.INITDATA)
 
     def deploy(self):
         result = deployContract(tonClient=self.TONCLIENT, abiPath=self.ABI, tvcPath=self.TVC, constructorInput=self.CONSTRUCTOR, initialData=self.INITDATA, signer=self.SIGNER, initialPubkey=self.PUBKEY)
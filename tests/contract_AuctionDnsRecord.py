@@ -2,10 +2,19 @@
 
 # ==============================================================================
 #
+import asyncio
 import freeton_utils
+import freeton_pricing
+import freeton_models
+import async_freeton_utils
 from   freeton_utils import *
 
 class AuctionDnsRecord(object):
+    SIGNER   = lazySigner()
+    CODE     = LazyAttribute(lambda self: getCodeFromTvc(self.TVC))
+    INITDATA = LazyAttribute(lambda self: dict(self.STATICS, _bidCode=getCodeFromTvc(self.TVC_BID)))
+    ADDRESS  = lazyAddress()
+
     def __init__(self, 
         tonClient: TonClient, 
         # statics
@@ -25,23 +34,23 @@ class AuctionDnsRecord(object):
         dtRevealEnd: int, 
         dutchCycle: int,
         signer: Signer = None):
-        self.SIGNER      = generateSigner() if signer is None else signer
-        self.TONCLIENT   = tonClient
+        if signer is not None:
+            self.SIGNER  = signer
+        self.TONCLIENT   = getClient() if tonClient is None else tonClient
         self.ABI         = "../bin/AuctionDnsRecord.abi.json"
         self.TVC         = "../bin/AuctionDnsRecord.tvc"
+        self.ABI_BID     = "../bin/AuctionBid.abi.json"
         self.TVC_BID     = "../bin/AuctionBid.tvc"
-        self.CODE        = getCodeFromTvc(self.TVC)
         self.CONSTRUCTOR = {
             "escrowAddress":escrowAddress, "escrowPercent":escrowPercent, "feeValue":feeValue,
             "minBid":minBid,               "minPriceStep":minPriceStep,   "buyNowPrice":buyNowPrice,
             "dtEnd":dtEnd,                 "dtRevealEnd":dtRevealEnd,     "dutchCycle":dutchCycle
             }
-        self.INITDATA    = {
+        self.STATICS     = {
             "_sellerAddress":sellerAddress, "_buyerAddress":buyerAddress,   "_assetAddress":assetAddress,   
-            "_auctionType":auctionType, "_dtStart":dtStart, "_bidCode":getCodeFromTvc(self.TVC_BID)
+            "_auctionType":auctionType, "_dtStart":dtStart
             }
         self.PUBKEY      = ZERO_PUBKEY
-        self.ADDRESS     = getAddressZeroPubkey(abiPath=self.ABI, tvcPath=self.TVC, initialData=self.INITDATA)
 
     def deploy(self):
         result = deployContract(tonClient=self.TONCLIENT, abiPath=self.ABI, tvcPath=self.TVC, constructorInput=self.CONSTRUCTOR, initialData=self.INITDATA, signer=self.SIGNER, initialPubkey=self.PUBKEY)
@@ -86,6 +95,37 @@ class AuctionDnsRecord(object):
         result = self._callFromMultisig(msig=msig, functionName="receiveAsset", functionParams={}, value=value, flags=1)
         return result
 
+    # ========================================
+    # Signed bids ready to go (see PrebuiltQueue); sync client only.
+    # "values" are full message values, i.e. the price plus "feeValue";
+    def prebuildBids(self, msig: SetcodeMultisig, values, expire: int):
+        messageBoc = prepareMessageBoc(abiPath=self.ABI, functionName="bid", functionParams={})
+        result     = PrebuiltQueue(tonClient=msig.TONCLIENT)
+        for value in values:
+            result.put(value, msig.prebuildTransfer(addressDest=self.ADDRESS, value=value, payload=messageBoc, flags=1, expire=expire))
+        return result
+
+    # One bid per step of the price ladder until "expire", keyed by the time the step starts;
+    # "info" is a "getInfo" result
+    def prebuildBidLadder(self, msig: SetcodeMultisig, info, expire: int, fromTime: int = None):
+        ladder     = freeton_pricing.getPriceLadder(info, int(getChainClock(self.TONCLIENT)()) if fromTime is None else fromTime, expire)
+        messageBoc = prepareMessageBoc(abiPath=self.ABI, functionName="bid", functionParams={})
+        result     = PrebuiltQueue(tonClient=msig.TONCLIENT)
+        for (dt, price) in ladder:
+            result.put(dt, msig.prebuildTransfer(addressDest=self.ADDRESS, value=price + self.CONSTRUCTOR["feeValue"], payload=messageBoc, flags=1, expire=expire))
+        return result
+
+    # ========================================
+    # Offline version of "calculateBidInit"
+    def calculateBidAddress(self, bidderAddress: str):
+        result = getAddressWithCode(abiPath=self.ABI_BID, tvcPath=self.TVC_BID, code=self.INITDATA["_bidCode"], initialPubkey=ZERO_PUBKEY, 
+            initialData={"_auctionAddress":self.ADDRESS, "_bidderAddress":bidderAddress})
+        return result
+
+    def calculateBidAddresses(self, bidderAddresses: list):
+        result = [self.calculateBidAddress(bidderAddress) for bidderAddress in bidderAddresses]
+        return result
+
     # ========================================
     #
     def getInfo(self):
@@ -96,5 +136,118 @@ class AuctionDnsRecord(object):
         result = self._run(functionName="getDesiredPrice", functionParams={})
         return result
 
+    # Typed versions of "getInfo" and of the bid contract "getInfo" (see freeton_models)
+    def getAuctionInfo(self):
+        result = freeton_models.AuctionInfo.fromDecoded(self.getInfo(), address=self.ADDRESS)
+        return result
+
+    def getBidInfo(self, bidderAddress: str):
+        bidAddress = self.calculateBidAddress(bidderAddress)
+        result     = runFunction(tonClient=self.TONCLIENT, abiPath=self.ABI_BID, contractAddress=bidAddress, functionName="getInfo", functionParams={})
+        result     = freeton_models.BidInfo.fromDecoded(result, address=bidAddress)
+        return result
+
+    # ========================================
+    # Local version of "getDesiredPrice" (see freeton_pricing), "info" is a cached "getInfo" result
+    def getDesiredPriceLocal(self, info, now: int = None):
+        result = freeton_pricing.getDesiredPrice(info, int(getChainClock(self.TONCLIENT)()) if now is None else now)
+        return result
+
+    # "getInfo" and "getDesiredPrice" in one pass over the same account state (see runFunctionsInternal);
+    # the price is PRICE_UNAVAILABLE where the getter throws
+    def _getInfoAndDesiredPrice(self, results):
+        ((info, _), (price, errorDetails)) = results
+        price  = freeton_pricing.PRICE_UNAVAILABLE if errorDetails["errorCode"] != 0 else int(str(price), 0)
+        result = (freeton_models.AuctionInfo.fromDecoded(info, address=self.ADDRESS), price)
+        return result
+
+    def getInfoAndDesiredPrice(self):
+        account = getAccountGraphQL(tonClient=self.TONCLIENT, accountID=self.ADDRESS, fields="boc")
+        results = runFunctionsInternal(tonClient=self.TONCLIENT, boc=account["boc"], contractAddress=self.ADDRESS, calls=[(self.ABI, "getInfo", {}), (self.ABI, "getDesiredPrice", {})])
+        result  = self._getInfoAndDesiredPrice(results)
+        return result
+
+    # Cross-check: both getters run on the same account state,
+    # the local engine has to agree with the getter for some second of the TVM run
+    def checkDesiredPrice(self):
+        clock         = getChainClock(self.TONCLIENT)
+        before        = int(clock())
+        (info, price) = self.getInfoAndDesiredPrice()
+        after         = int(clock())
+        result        = self._getPriceCheck(info, price, before, after)
+        return result
+
+    def _getPriceCheck(self, info, price, before: int, after: int):
+        local   = [self.getDesiredPriceLocal(info, now) for now in range(before, after + 1)]
+        result  = {"price":price, "localPrices":local, "match":price in local}
+        return result
+
+# ==============================================================================
+# asyncio flavour: methods that talk to the network return awaitables, either inherited on top of the async plumbing below
+# or overridden where the sync version consumes a result; offline helpers (calculateBidAddress, getDesiredPriceLocal) stay sync,
+# use with AsyncSetcodeMultisig;
+class AsyncAuctionDnsRecord(AuctionDnsRecord):
+    def __init__(self, tonClient: TonClient, *args, **kwargs):
+        AuctionDnsRecord.__init__(self, async_freeton_utils.getAsyncClient() if tonClient is None else tonClient, *args, **kwargs)
+
+    async def deploy(self):
+        result = await async_freeton_utils.deployContract(tonClient=self.TONCLIENT, abiPath=self.ABI, tvcPath=self.TVC, constructorInput=self.CONSTRUCTOR, initialData=self.INITDATA, signer=self.SIGNER, initialPubkey=self.PUBKEY)
+        return result
+
+    async def _call(self, functionName, functionParams, signer):
+        result = await async_freeton_utils.callFunction(tonClient=self.TONCLIENT, abiPath=self.ABI, contractAddress=self.ADDRESS, functionName=functionName, functionParams=functionParams, signer=signer)
+        return result
+
+    async def _callFromMultisig(self, msig: async_freeton_utils.AsyncSetcodeMultisig, functionName, functionParams, value, flags):
+        messageBoc = prepareMessageBoc(abiPath=self.ABI, functionName=functionName, functionParams=functionParams)
+        result     = await msig.callTransfer(addressDest=self.ADDRESS, value=value, payload=messageBoc, flags=flags)
+        return result
+
+    async def _run(self, functionName, functionParams):
+        result = await async_freeton_utils.runFunction(tonClient=self.TONCLIENT, abiPath=self.ABI, contractAddress=self.ADDRESS, functionName=functionName, functionParams=functionParams)
+        return result
+
+    async def getInfoAndDesiredPrice(self):
+        account = await async_freeton_utils.getAccountGraphQL(tonClient=self.TONCLIENT, accountID=self.ADDRESS, fields="boc")
+        results = await async_freeton_utils.runFunctionsInternal(tonClient=self.TONCLIENT, boc=account["boc"], contractAddress=self.ADDRESS, calls=[(self.ABI, "getInfo", {}), (self.ABI, "getDesiredPrice", {})])
+        result  = self._getInfoAndDesiredPrice(results)
+        return result
+
+    async def checkDesiredPrice(self):
+        clock         = getChainClock(self.TONCLIENT)
+        before        = int(clock())
+        (info, price) = await self.getInfoAndDesiredPrice()
+        after         = int(clock())
+        result        = self._getPriceCheck(info, price, before, after)
+        return result
+
+    async def getAuctionInfo(self):
+        result = freeton_models.AuctionInfo.fromDecoded(await self.getInfo(), address=self.ADDRESS)
+        return result
+
+    # AsyncPrebuiltQueue of messages signed concurrently; "time" headers still follow the order of "values"
+    async def prebuildBids(self, msig: async_freeton_utils.AsyncSetcodeMultisig, values, expire: int):
+        messageBoc = prepareMessageBoc(abiPath=self.ABI, functionName="bid", functionParams={})
+        prebuilt   = await asyncio.gather(*[msig.prebuildTransfer(addressDest=self.ADDRESS, value=value, payload=messageBoc, flags=1, expire=expire) for value in values])
+        result     = async_freeton_utils.AsyncPrebuiltQueue(tonClient=msig.TONCLIENT)
+        for (value, message) in zip(values, prebuilt):
+            result.put(value, message)
+        return result
+
+    async def prebuildBidLadder(self, msig: async_freeton_utils.AsyncSetcodeMultisig, info, expire: int, fromTime: int = None):
+        ladder     = freeton_pricing.getPriceLadder(info, int(getChainClock(self.TONCLIENT)()) if fromTime is None else fromTime, expire)
+        messageBoc = prepareMessageBoc(abiPath=self.ABI, functionName="bid", functionParams={})
+        prebuilt   = await asyncio.gather(*[msig.prebuildTransfer(addressDest=self.ADDRESS, value=price + self.CONSTRUCTOR["feeValue"], payload=messageBoc, flags=1, expire=expire) for (_, price) in ladder])
+        result     = async_freeton_utils.AsyncPrebuiltQueue(tonClient=msig.TONCLIENT)
+        for ((dt, _), message) in zip(ladder, prebuilt):
+            result.put(dt, message)
+        return result
+
+    async def getBidInfo(self, bidderAddress: str):
+        bidAddress = self.calculateBidAddress(bidderAddress)
+        result     = await async_freeton_utils.runFunction(tonClient=self.TONCLIENT, abiPath=self.ABI_BID, contractAddress=bidAddress, functionName="getInfo", functionParams={})
+        result     = freeton_models.BidInfo.fromDecoded(result, address=bidAddress)
+        return result
+
 # ==============================================================================
 # 
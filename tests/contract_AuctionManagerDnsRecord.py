@@ -2,20 +2,27 @@
 
 # ==============================================================================
 #
+import asyncio
+import itertools
 import freeton_utils
+import async_freeton_utils
 from   freeton_utils import *
+from   freeton_models import AuctionInfo, SnapshotTable
 
 class AuctionManagerDnsRecord(object):
+    SIGNER  = lazySigner()
+    CODE    = LazyAttribute(lambda self: getCodeFromTvc(self.TVC))
+    PUBKEY  = LazyAttribute(lambda self: self.SIGNER.keys.public)
+    ADDRESS = lazyAddress()
+
     def __init__(self, tonClient: TonClient, ownerAddress: str, bidCode: str, auctionCode: str, signer: Signer = None):
-        self.SIGNER      = generateSigner() if signer is None else signer
-        self.TONCLIENT   = tonClient
+        if signer is not None:
+            self.SIGNER  = signer
+        self.TONCLIENT   = getClient() if tonClient is None else tonClient
         self.ABI         = "../bin/AuctionManagerDnsRecord.abi.json"
         self.TVC         = "../bin/AuctionManagerDnsRecord.tvc"
-        self.CODE        = getCodeFromTvc(self.TVC)
         self.CONSTRUCTOR = {"ownerAddress":ownerAddress}
         self.INITDATA    = {"_bidCode":bidCode, "_auctionCode":auctionCode}
-        self.PUBKEY      = self.SIGNER.keys.public
-        self.ADDRESS     = getAddress(abiPath=self.ABI, tvcPath=self.TVC, signer=self.SIGNER, initialPubkey=self.PUBKEY, initialData=self.INITDATA)
 
     def deploy(self):
         result = deployContract(tonClient=self.TONCLIENT, abiPath=self.ABI, tvcPath=self.TVC, constructorInput=self.CONSTRUCTOR, initialData=self.INITDATA, signer=self.SIGNER, initialPubkey=self.PUBKEY)
@@ -46,13 +53,155 @@ class AuctionManagerDnsRecord(object):
             value=value, flags=1)
         return result
     
+    # ========================================
+    # Bulk "createAuction": "specs" is an iterable of dicts with "createAuctionDnsRecord" arguments (except "msig" and "value"),
+    # addresses are derived locally, at most "concurrency" creations are in flight;
+    # returns [{"spec", "address", "tx", "status", "error"}] in "specs" order,
+    # with "verify" statuses are taken from the auction accounts: "active" or "missing", otherwise "sent" or "failed";
+    def createAuctionsDnsRecord(self, msig: SetcodeMultisig, value: int, specs, concurrency: int = PIPELINE_WORKERS, verify: bool = True, verifyTimeout: int = 30):
+        specs = iter(specs)
+        table = []
+        while True:
+            chunk = list(itertools.islice(specs, concurrency))
+            if not chunk:
+                break
+
+            (rows, calls) = self._getCreationCalls(msig=msig, value=value, chunk=chunk, table=table)
+            for (index, result, errorDetails) in callFunctionPipelined(tonClient=msig.TONCLIENT, calls=calls, maxWorkers=concurrency):
+                self._setCreationResult(rows[index], result, errorDetails)
+
+        # auctions are deployed by the manager a couple of hops after the multisig transaction, poll for them in bulk
+        deadline = time.time() + verifyTimeout
+        while verify:
+            pending  = [row for row in table if row["status"] == "sent"]
+            accounts = getAccountsGraphQL(tonClient=self.TONCLIENT, accountIDsArray=[row["address"] for row in pending], fields="id, acc_type") if pending else {}
+            if self._setCreationActive(pending, accounts) or time.time() >= deadline:
+                break
+            time.sleep(1)
+
+        return self._setCreationMissing(table, verify)
+
+    # Rows of "chunk" go to "table", returns (rows, calls) of the ones that are sent;
+    # a spec the ABI rejects fails alone, the rest of the chunk still goes out
+    def _getCreationCalls(self, msig: SetcodeMultisig, value: int, chunk, table):
+        rows  = []
+        calls = []
+        for spec in chunk:
+            row = {"spec":spec, "address":self.calculateAuctionAddress(sellerAddress=spec["sellerAddress"], buyerAddress=spec["buyerAddress"],
+                assetAddress=spec["assetAddress"], auctionType=spec["auctionType"], dtStart=spec["dtStart"]), "tx":"", "status":"", "error":{}}
+            table.append(row)
+            try:
+                payload = prepareMessageBoc(abiPath=self.ABI, functionName="createAuction", functionParams=spec)
+            except TonException as ton:
+                if freeton_utils.THROW:
+                    raise ton
+                row["status"] = "failed"
+                row["error"]  = getValuesFromException(ton)
+                continue
+            rows.append(row)
+            calls.append(msig.getTransferCall(addressDest=self.ADDRESS, value=value, payload=payload, flags=1))
+        return (rows, calls)
+
+    def _setCreationResult(self, row, result, errorDetails):
+        if errorDetails["errorCode"] == 0:
+            row["tx"]     = result.transaction["id"]
+            row["status"] = "sent"
+        else:
+            row["tx"]     = errorDetails["transactionID"]
+            row["status"] = "failed"
+            row["error"]  = errorDetails
+
+    # True when every pending auction is deployed
+    def _setCreationActive(self, pending, accounts):
+        for row in pending:
+            if accounts.get(row["address"], {}).get("acc_type") == 1:
+                row["status"] = "active"
+        return all(row["status"] == "active" for row in pending)
+
+    def _setCreationMissing(self, table, verify: bool):
+        for row in table:
+            if verify and row["status"] == "sent":
+                row["status"] = "missing"
+        return table
+
+    # ========================================
+    # Offline version of "calculateAuctionInit"
+    def calculateAuctionAddress(self, sellerAddress: str, buyerAddress: str, assetAddress: str, auctionType: int, dtStart: int):
+        result = getAddressWithCode(abiPath="../bin/AuctionDnsRecord.abi.json", tvcPath="../bin/AuctionDnsRecord.tvc", code=self.INITDATA["_auctionCode"], initialPubkey=ZERO_PUBKEY, 
+            initialData={"_sellerAddress":sellerAddress, "_buyerAddress":buyerAddress, "_assetAddress":assetAddress, "_auctionType":auctionType, "_dtStart":dtStart, "_bidCode":self.INITDATA["_bidCode"]})
+        return result
+
     # ========================================
     #
     def getHashFromPrice(self, price: int, salt: str):
         result = self._run(functionName="getHashFromPrice", functionParams={"price":price, "salt":salt})
         return result
 
-    
+    # "getInfo" of many auctions (one batched accounts query) as a columnar SnapshotTable;
+    # auctions without state are skipped
+    def getAuctionsInfo(self, auctionAddresses: list):
+        infos  = runFunctionMany(tonClient=self.TONCLIENT, abiPath="../bin/AuctionDnsRecord.abi.json", contractAddresses=auctionAddresses, functionName="getInfo", functionParams={})
+        result = SnapshotTable(AuctionInfo)
+        for (address, info) in infos.items():
+            if info != "":
+                result.append(info, address=address)
+        return result
+
+# ==============================================================================
+# asyncio flavour: methods that talk to the network return awaitables, either inherited on top of the async plumbing below
+# or overridden where the sync version consumes a result; calculateAuctionAddress stays sync;
+# use with AsyncSetcodeMultisig;
+class AsyncAuctionManagerDnsRecord(AuctionManagerDnsRecord):
+    def __init__(self, tonClient: TonClient, *args, **kwargs):
+        AuctionManagerDnsRecord.__init__(self, async_freeton_utils.getAsyncClient() if tonClient is None else tonClient, *args, **kwargs)
+
+    async def deploy(self):
+        result = await async_freeton_utils.deployContract(tonClient=self.TONCLIENT, abiPath=self.ABI, tvcPath=self.TVC, constructorInput=self.CONSTRUCTOR, initialData=self.INITDATA, signer=self.SIGNER, initialPubkey=self.PUBKEY)
+        return result
+
+    async def _call(self, functionName, functionParams, signer):
+        result = await async_freeton_utils.callFunction(tonClient=self.TONCLIENT, abiPath=self.ABI, contractAddress=self.ADDRESS, functionName=functionName, functionParams=functionParams, signer=signer)
+        return result
+
+    async def _callFromMultisig(self, msig: async_freeton_utils.AsyncSetcodeMultisig, functionName, functionParams, value, flags):
+        messageBoc = prepareMessageBoc(abiPath=self.ABI, functionName=functionName, functionParams=functionParams)
+        result     = await msig.callTransfer(addressDest=self.ADDRESS, value=value, payload=messageBoc, flags=flags)
+        return result
+
+    async def _run(self, functionName, functionParams):
+        result = await async_freeton_utils.runFunction(tonClient=self.TONCLIENT, abiPath=self.ABI, contractAddress=self.ADDRESS, functionName=functionName, functionParams=functionParams)
+        return result
+
+    async def getAuctionsInfo(self, auctionAddresses: list):
+        accounts = await async_freeton_utils.getAccountsGraphQL(tonClient=self.TONCLIENT, accountIDsArray=auctionAddresses, fields="id, boc")
+        bocs     = {address: account["boc"] for (address, account) in accounts.items() if account["boc"] is not None}
+        infos    = await asyncio.gather(*[async_freeton_utils.runFunctionInternal(tonClient=self.TONCLIENT, boc=boc, abiPath="../bin/AuctionDnsRecord.abi.json",
+            contractAddress=address, functionName="getInfo", functionParams={}) for (address, boc) in bocs.items()])
+        result   = SnapshotTable(AuctionInfo)
+        result.extend(infos, list(bocs.keys()))
+        return result
+
+    async def createAuctionsDnsRecord(self, msig: async_freeton_utils.AsyncSetcodeMultisig, value: int, specs, concurrency: int = async_freeton_utils.ASYNC_LIMIT, verify: bool = True, verifyTimeout: int = 30):
+        specs = iter(specs)
+        table = []
+        while True:
+            chunk = list(itertools.islice(specs, concurrency))
+            if not chunk:
+                break
+
+            (rows, calls) = self._getCreationCalls(msig=msig, value=value, chunk=chunk, table=table)
+            async for (index, result, errorDetails) in async_freeton_utils.callFunctionPipelined(tonClient=msig.TONCLIENT, calls=calls, limit=concurrency):
+                self._setCreationResult(rows[index], result, errorDetails)
+
+        deadline = time.time() + verifyTimeout
+        while verify:
+            pending  = [row for row in table if row["status"] == "sent"]
+            accounts = await async_freeton_utils.getAccountsGraphQL(tonClient=self.TONCLIENT, accountIDsArray=[row["address"] for row in pending], fields="id, acc_type") if pending else {}
+            if self._setCreationActive(pending, accounts) or time.time() >= deadline:
+                break
+            await asyncio.sleep(1)
+
+        return self._setCreationMissing(table, verify)
 
 # ==============================================================================
 # 
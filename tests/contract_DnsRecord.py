@@ -3,19 +3,24 @@
 # ==============================================================================
 #
 import freeton_utils
+import async_freeton_utils
 from   freeton_utils import *
+from   freeton_models import DnsWhois
 
 class DnsRecord(object):
+    SIGNER   = lazySigner()
+    CODE     = LazyAttribute(lambda self: getCodeFromTvc(self.TVC))
+    INITDATA = LazyAttribute(lambda self: {"_domainName":self.NAME_HEX,"_domainCode": self.CODE})
+    ADDRESS  = lazyAddress()
+
     def __init__(self, tonClient: TonClient, name: str, signer: Signer = None):
-        self.SIGNER      = generateSigner() if signer is None else signer
-        self.TONCLIENT   = tonClient
+        if signer is not None:
+            self.SIGNER  = signer
+        self.TONCLIENT   = getClient() if tonClient is None else tonClient
         self.ABI         = "../bin/DnsRecord.abi.json"
         self.TVC         = "../bin/DnsRecord.tvc"
-        self.CODE        = getCodeFromTvc(self.TVC)
         self.CONSTRUCTOR = {}
-        self.INITDATA    = {"_domainName":stringToHex(name),"_domainCode": self.CODE}
         self.PUBKEY      = ZERO_PUBKEY
-        self.ADDRESS     = getAddressZeroPubkey(abiPath=self.ABI, tvcPath=self.TVC, initialData=self.INITDATA)
         self.NAME        = name
         self.NAME_HEX    = stringToHex(name)
 
@@ -37,5 +42,38 @@ class DnsRecord(object):
         result = runFunction(tonClient=self.TONCLIENT, abiPath=self.ABI, contractAddress=self.ADDRESS, functionName=functionName, functionParams=functionParams)
         return result
 
+    def getWhois(self):
+        result = DnsWhois.fromDecoded(self.run(functionName="getWhois", functionParams={}), address=self.ADDRESS)
+        return result
+
+# ==============================================================================
+# asyncio flavour: public methods are inherited and return awaitables
+# because the plumbing below is async; use with AsyncSetcodeMultisig;
+class AsyncDnsRecord(DnsRecord):
+    def __init__(self, tonClient: TonClient, *args, **kwargs):
+        DnsRecord.__init__(self, async_freeton_utils.getAsyncClient() if tonClient is None else tonClient, *args, **kwargs)
+
+    async def deploy(self, ownerAddress: str, forceFeeReturnToOwner: bool = False):
+        self.CONSTRUCTOR = {"ownerAddress": ownerAddress, "forceFeeReturnToOwner":forceFeeReturnToOwner}
+        result = await async_freeton_utils.deployContract(tonClient=self.TONCLIENT, abiPath=self.ABI, tvcPath=self.TVC, constructorInput=self.CONSTRUCTOR, initialData=self.INITDATA, signer=self.SIGNER, initialPubkey=self.PUBKEY)
+        return result
+
+    async def call(self, functionName, functionParams, signer):
+        result = await async_freeton_utils.callFunction(tonClient=self.TONCLIENT, abiPath=self.ABI, contractAddress=self.ADDRESS, functionName=functionName, functionParams=functionParams, signer=signer)
+        return result
+
+    async def callFromMultisig(self, msig: async_freeton_utils.AsyncSetcodeMultisig, functionName, functionParams, value, flags):
+        messageBoc = prepareMessageBoc(abiPath=self.ABI, functionName=functionName, functionParams=functionParams)
+        result     = await msig.callTransfer(addressDest=self.ADDRESS, value=value, payload=messageBoc, flags=flags)
+        return result
+
+    async def run(self, functionName, functionParams):
+        result = await async_freeton_utils.runFunction(tonClient=self.TONCLIENT, abiPath=self.ABI, contractAddress=self.ADDRESS, functionName=functionName, functionParams=functionParams)
+        return result
+
+    async def getWhois(self):
+        result = DnsWhois.fromDecoded(await self.run(functionName="getWhois", functionParams={}), address=self.ADDRESS)
+        return result
+
 # ==============================================================================
 # 
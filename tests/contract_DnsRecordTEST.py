@@ -4,18 +4,22 @@
 #
 import freeton_utils
 from   freeton_utils import *
+from   freeton_models import DnsWhois
 
 class DnsRecordTEST(object):
+    SIGNER   = lazySigner()
+    CODE     = LazyAttribute(lambda self: getCodeFromTvc(self.TVC))
+    INITDATA = LazyAttribute(lambda self: {"_domainName":self.NAME_HEX,"_domainCode": self.CODE})
+    ADDRESS  = lazyAddress()
+
     def __init__(self, tonClient: TonClient, name: str, signer: Signer = None):
-        self.SIGNER      = generateSigner() if signer is None else signer
-        self.TONCLIENT   = tonClient
+        if signer is not None:
+            self.SIGNER  = signer
+        self.TONCLIENT   = getClient() if tonClient is None else tonClient
         self.ABI         = "../bin/DnsRecordTEST.abi.json"
         self.TVC         = "../bin/DnsRecordTEST.tvc"
-        self.CODE        = getCodeFromTvc(self.TVC)
         self.CONSTRUCTOR = {}
-        self.INITDATA    = {"_domainName":stringToHex(name),"_domainCode": self.CODE}
         self.PUBKEY      = ZERO_PUBKEY
-        self.ADDRESS     = getAddressZeroPubkey(abiPath=self.ABI, tvcPath=self.TVC, initialData=self.INITDATA)
         self.NAME        = name
         self.NAME_HEX    = stringToHex(name)
 
@@ -37,6 +41,10 @@ class DnsRecordTEST(object):
         result = runFunction(tonClient=self.TONCLIENT, abiPath=self.ABI, contractAddress=self.ADDRESS, functionName=functionName, functionParams=functionParams)
         return result
 
+    def getWhois(self):
+        result = DnsWhois.fromDecoded(self.run(functionName="getWhois", functionParams={}), address=self.ADDRESS)
+        return result
+
     def destroy(self, addressDest):
         result = self.call(functionName="TEST_selfdestruct", functionParams={"dest":freeton_utils.giverGetAddress()}, signer=self.SIGNER)
         return result
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+
+# ==============================================================================
+# Pure-Python cells, BOC parsing, hashmaps and StateInit/address derivation.
+# Mirrors what the SDK does in "abi.encode_message" with a DeploySet, so that
+# contract addresses can be computed without a TonClient.
+#
+import base64
+import hashlib
+from functools import lru_cache
+
+# ==============================================================================
+#
+BOC_MAGIC_GENERIC      = b"\xb5\xee\x9c\x72"
+BOC_MAGIC_INDEXED      = b"\x68\xff\x65\xf3"
+BOC_MAGIC_INDEXED_CRC  = b"\xac\xc3\xa7\x28"
+DATA_MAP_KEYLEN        = 64
+CELL_MAX_BITS          = 1023
+CELL_MAX_REFS          = 4
+CELL_MAX_BYTES         = 127
+
+# ==============================================================================
+#
+class Cell(object):
+    __slots__ = ("bits", "bitsLen", "refs", "special", "_hash", "_depth")
+
+    def __init__(self, bits: int = 0, bitsLen: int = 0, refs: tuple = (), special: bool = False):
+        if bitsLen > CELL_MAX_BITS or len(refs) > CELL_MAX_REFS:
+            raise ValueError("Cell overflow: {} bits, {} refs".format(bitsLen, len(refs)))
+        self.bits    = bits
+        self.bitsLen = bitsLen
+        self.refs    = tuple(refs)
+        self.special = special
+        self._hash   = None
+        self._depth  = None
+
+    def getDataBytes(self):
+        fullBytes = self.bitsLen // 8
+        padBits   = self.bitsLen % 8
+        if padBits == 0:
+            return self.bits.to_bytes(fullBytes, "big")
+        # augment with a completion tag: single "1" bit followed by zeroes
+        value = ((self.bits << 1) | 1) << (7 - padBits)
+        return value.to_bytes(fullBytes + 1, "big")
+
+    def getDescriptors(self):
+        d1 = len(self.refs) + (8 if self.special else 0)
+        d2 = (self.bitsLen // 8) + ((self.bitsLen + 7) // 8)
+        return bytes([d1, d2])
+
+    def getDepth(self):
+        if self._depth is None:
+            self._depth = 0 if not self.refs else max(ref.getDepth() for ref in self.refs) + 1
+        return self._depth
+
+    def getHash(self):
+        if self._hash is None:
+            sha = hashlib.sha256()
+            sha.update(self.getDescriptors())
+            sha.update(self.getDataBytes())
+            for ref in self.refs:
+                sha.update(ref.getDepth().to_bytes(2, "big"))
+            for ref in self.refs:
+                sha.update(ref.getHash())
+            self._hash = sha.digest()
+        return self._hash
+
+    def getHashHex(self):
+        return self.getHash().hex()
+
+    def beginParse(self):
+        return CellSlice(self)
+
+# ==============================================================================
+#
+class CellSlice(object):
+    __slots__ = ("cell", "bitPos", "refPos")
+
+    def __init__(self, cell: Cell):
+        self.cell   = cell
+        self.bitPos = 0
+        self.refPos = 0
+
+    def remainingBits(self):
+        return self.cell.bitsLen - self.bitPos
+
+    def remainingRefs(self):
+        return len(self.cell.refs) - self.refPos
+
+    def preloadUint(self, length: int):
+        if length > self.remainingBits():
+            raise ValueError("Cell underflow: need {} bits, have {}".format(length, self.remainingBits()))
+        shift = self.cell.bitsLen - self.bitPos - length
+        return (self.cell.bits >> shift) & ((1 << length) - 1)
+
+    def loadUint(self, length: int):
+        value        = self.preloadUint(length)
+        self.bitPos += length
+        return value
+
+    def loadBit(self):
+        return self.loadUint(1)
+
+    def skipBits(self, length: int):
+        self.loadUint(length)
+
+    def loadRef(self):
+        if self.remainingRefs() == 0:
+            raise ValueError("Cell underflow: no more references")
+        ref          = self.cell.refs[self.refPos]
+        self.refPos += 1
+        return ref
+
+    def loadRest(self):
+        # (bits, bitsLen, refs) of everything that was not read yet;
+        length = self.remainingBits()
+        bits   = self.loadUint(length)
+        refs   = self.cell.refs[self.refPos:]
+        self.refPos = len(self.cell.refs)
+        return (bits, length, refs)
+
+# ==============================================================================
+#
+class CellBuilder(object):
+    __slots__ = ("bits", "bitsLen", "refs")
+
+    def __init__(self):
+        self.bits    = 0
+        self.bitsLen = 0
+        self.refs    = []
+
+    def storeUint(self, value: int, length: int):
+        if value < 0 or value >> length:
+            raise ValueError("Value {} does not fit into {} bits".format(value, length))
+        self.bits     = (self.bits << length) | value
+        self.bitsLen += length
+        return self
+
+    def storeInt(self, value: int, length: int):
+        if value < -(1 << (length - 1)) or value >= (1 << (length - 1)):
+            raise ValueError("Value {} does not fit into {} signed bits".format(value, length))
+        return self.storeUint(value & ((1 << length) - 1), length)
+
+    def storeBit(self, value):
+        return self.storeUint(1 if value else 0, 1)
+
+    def storeBytes(self, data: bytes):
+        return self.storeUint(int.from_bytes(data, "big"), len(data) * 8)
+
+    def storeRef(self, cell: Cell):
+        self.refs.append(cell)
+        return self
+
+    def storeRaw(self, bits: int, bitsLen: int, refs = ()):
+        self.storeUint(bits, bitsLen)
+        self.refs.extend(refs)
+        return self
+
+    def storeAddress(self, address: str):
+        # addr_std$10 anycast:(Maybe Anycast) workchain_id:int8 address:bits256
+        (wid, hexAddress) = address.split(":")
+        self.storeUint(0b100, 3)
+        self.storeInt(int(wid), 8)
+        self.storeUint(int(hexAddress, 16), 256)
+        return self
+
+    def endCell(self):
+        return Cell(self.bits, self.bitsLen, self.refs)
+
+# ==============================================================================
+#
+def _readVarUint(data: bytes, offset: int, size: int):
+    return int.from_bytes(data[offset:offset + size], "big")
+
+def bocToCells(boc):
+    if isinstance(boc, str):
+        boc = base64.b64decode(boc)
+
+    magic = boc[0:4]
+    if magic == BOC_MAGIC_GENERIC:
+        flags       = boc[4]
+        hasIndex    = bool(flags & 0x80)
+        hasCrc      = bool(flags & 0x40)
+        refSize     = flags & 0x07
+    elif magic in (BOC_MAGIC_INDEXED, BOC_MAGIC_INDEXED_CRC):
+        hasIndex    = True
+        hasCrc      = magic == BOC_MAGIC_INDEXED_CRC
+        refSize     = boc[4]
+    else:
+        raise ValueError("Unknown BOC magic: {}".format(magic.hex()))
+
+    offSize   = boc[5]
+    pos       = 6
+    cellsNum  = _readVarUint(boc, pos, refSize); pos += refSize
+    rootsNum  = _readVarUint(boc, pos, refSize); pos += refSize
+    pos      += refSize # absent cells, always zero
+    pos      += offSize # total cells size
+
+    roots = []
+    if magic == BOC_MAGIC_GENERIC:
+        for _ in range(rootsNum):
+            roots.append(_readVarUint(boc, pos, refSize)); pos += refSize
+    else:
+        roots = [0]
+    if hasIndex:
+        pos += cellsNum * offSize
+
+    rawCells = []
+    for _ in range(cellsNum):
+        d1       = boc[pos]
+        d2       = boc[pos + 1]
+        pos     += 2
+        refsNum  = d1 & 0x07
+        special  = bool(d1 & 0x08)
+        if d1 >> 5:
+            raise ValueError("Cells with non-zero level are not supported")
+        dataLen  = (d2 + 1) // 2
+        data     = boc[pos:pos + dataLen]
+        pos     += dataLen
+        bitsLen  = dataLen * 8
+        bits     = int.from_bytes(data, "big")
+        if d2 & 1:
+            # strip completion tag
+            trailing = (bits & -bits).bit_length()
+            bits   >>= trailing
+            bitsLen -= trailing
+        refs = []
+        for _ in range(refsNum):
+            refs.append(_readVarUint(boc, pos, refSize)); pos += refSize
+        rawCells.append((bits, bitsLen, refs, special))
+
+    # references always point forward, so build from the tail
+    cells = [None] * cellsNum
+    for index in range(cellsNum - 1, -1, -1):
+        (bits, bitsLen, refs, special) = rawCells[index]
+        cells[index] = Cell(bits, bitsLen, [cells[ref] for ref in refs], special)
+
+    return [cells[root] for root in roots]
+
+def bocToCell(boc):
+    return bocToCells(boc)[0]
+
+@lru_cache(maxsize=256)
+def bocToCellCached(boc: str):
+    # code cells are passed around as base64 strings, parse (and hash) them once
+    return bocToCell(boc)
+
+# serialized_boc#b5ee9c72 without index and crc, single root;
+# cells are deduplicated by hash and stored parents first (reverse postorder)
+def cellToBoc(root: Cell):
+    visited   = set()
+    postorder = []
+
+    def _visit(cell):
+        if cell.getHash() in visited:
+            return
+        visited.add(cell.getHash())
+        for ref in cell.refs:
+            _visit(ref)
+        postorder.append(cell)
+
+    _visit(root)
+    cells   = postorder[::-1]
+    indexes = {cell.getHash(): index for (index, cell) in enumerate(cells)}
+    refSize = max(1, (len(cells).bit_length() + 7) // 8)
+    payload = b"".join(cell.getDescriptors() + cell.getDataBytes() + b"".join(indexes[ref.getHash()].to_bytes(refSize, "big") for ref in cell.refs) for cell in cells)
+    offSize = max(1, (len(payload).bit_length() + 7) // 8)
+
+    header  = BOC_MAGIC_GENERIC + bytes([refSize, offSize])
+    header += len(cells).to_bytes(refSize, "big") + (1).to_bytes(refSize, "big") + (0).to_bytes(refSize, "big")
+    header += len(payload).to_bytes(offSize, "big") + (0).to_bytes(refSize, "big")
+    return base64.b64encode(header + payload).decode()
+
+# ==============================================================================
+# Hashmaps
+# hml_short$0 len:(Unary ~n) s:(n * Bit)
+# hml_long$10 n:(#<= m) s:(n * Bit)
+# hml_same$11 v:Bit n:(#<= m)
+#
+def _loadLabel(slice: CellSlice, maxLen: int):
+    lenBits = maxLen.bit_length()
+    if slice.loadBit() == 0:
+        length = 0
+        while slice.loadBit() == 1:
+            length += 1
+        return (slice.loadUint(length), length)
+    if slice.loadBit() == 0:
+        length = slice.loadUint(lenBits)
+        return (slice.loadUint(length), length)
+    bit    = slice.loadBit()
+    length = slice.loadUint(lenBits)
+    return (((1 << length) - 1) if bit else 0, length)
+
+def _storeLabel(builder: CellBuilder, label: int, length: int, maxLen: int):
+    # choose the shortest encoding, "short" wins ties (same rules as the node)
+    lenBits = maxLen.bit_length()
+    if length == 0:
+        builder.storeUint(0, 2)
+        return
+    if length > 1 and lenBits < 2 * length - 1:
+        if label == 0 or label == (1 << length) - 1:
+            builder.storeUint(0b11, 2).storeBit(label & 1).storeUint(length, lenBits)
+            return
+        if lenBits < length:
+            builder.storeUint(0b10, 2).storeUint(length, lenBits).storeUint(label, length)
+            return
+    builder.storeBit(0).storeUint((1 << (length + 1)) - 2, length + 1).storeUint(label, length)
+
+def _parseHashmap(cell: Cell, keyLen: int, prefix: int, result: dict):
+    slice            = cell.beginParse()
+    (label, length)  = _loadLabel(slice, keyLen)
+    prefix           = (prefix << length) | label
+    remaining        = keyLen - length
+    if remaining == 0:
+        result[prefix] = slice.loadRest()
+        return
+    left  = slice.loadRef()
+    right = slice.loadRef()
+    _parseHashmap(left,  remaining - 1, (prefix << 1),     result)
+    _parseHashmap(right, remaining - 1, (prefix << 1) | 1, result)
+
+def parseHashmapE(cell: Cell, keyLen: int = DATA_MAP_KEYLEN):
+    # HashmapE as stored in a contract data cell: 1 bit + optional ref to root
+    slice  = cell.beginParse()
+    result = {}
+    if slice.loadBit():
+        _parseHashmap(slice.loadRef(), keyLen, 0, result)
+    return result
+
+def _buildHashmap(items: list, keyLen: int):
+    builder = CellBuilder()
+    if len(items) == 1:
+        (key, (bits, bitsLen, refs)) = items[0]
+        _storeLabel(builder, key, keyLen, keyLen)
+        builder.storeRaw(bits, bitsLen, refs)
+        return builder.endCell()
+
+    # items are sorted, so the common prefix is shared by first and last keys
+    diff      = items[0][0] ^ items[-1][0]
+    remaining = diff.bit_length()
+    length    = keyLen - remaining
+    _storeLabel(builder, items[0][0] >> remaining, length, keyLen)
+
+    mask      = (1 << (remaining - 1)) - 1
+    left      = [(key & mask, value) for (key, value) in items if not (key >> (remaining - 1)) & 1]
+    right     = [(key & mask, value) for (key, value) in items if     (key >> (remaining - 1)) & 1]
+    builder.storeRef(_buildHashmap(left,  remaining - 1))
+    builder.storeRef(_buildHashmap(right, remaining - 1))
+    return builder.endCell()
+
+def buildHashmapE(entries: dict, keyLen: int = DATA_MAP_KEYLEN):
+    builder = CellBuilder()
+    if not entries:
+        return builder.storeBit(0).endCell()
+    builder.storeBit(1)
+    builder.storeRef(_buildHashmap(sorted(entries.items()), keyLen))
+    return builder.endCell()
+
+# ==============================================================================
+# ABI values for the initial data dictionary (same layout as "pack_into_chain")
+#
+def _packBytes(data: bytes):
+    # first CELL_MAX_BYTES bytes go to the root cell, the rest is chained after it, so build from the tail
+    chunks = [data[offset:offset + CELL_MAX_BYTES] for offset in range(0, len(data), CELL_MAX_BYTES)]
+    cell   = None
+    for chunk in reversed(chunks):
+        builder = CellBuilder()
+        builder.storeBytes(chunk)
+        if cell is not None:
+            builder.storeRef(cell)
+        cell    = builder.endCell()
+
+    builder = CellBuilder()
+    builder.storeRef(Cell() if cell is None else cell)
+    return builder
+
+def packAbiValue(abiType: str, value):
+    builder = CellBuilder()
+    if abiType == "address":
+        builder.storeAddress(value)
+    elif abiType == "bool":
+        builder.storeBit(value is True or str(value).lower() == "true")
+    elif abiType.startswith("uint"):
+        builder.storeUint(int(str(value), 0), int(abiType[4:]))
+    elif abiType.startswith("int"):
+        builder.storeInt(int(str(value), 0), int(abiType[3:]))
+    elif abiType == "cell":
+        builder.storeRef(value if isinstance(value, Cell) else bocToCellCached(value))
+    elif abiType in ("bytes", "string"):
+        data = value if isinstance(value, bytes) else (bytes.fromhex(value) if abiType == "bytes" else value.encode("utf-8"))
+        builder = _packBytes(data)
+    else:
+        raise ValueError("Unsupported static variable type: {}".format(abiType))
+    return (builder.bits, builder.bitsLen, tuple(builder.refs))
+
+# ==============================================================================
+# StateInit and addresses
+#
+def getStateInitFromTvc(tvc):
+    # returns (code, data) cells of a TVC (StateInit BOC)
+    stateInit = bocToCell(tvc).beginParse()
+    if stateInit.loadBit():    # split_depth
+        stateInit.skipBits(5)
+    if stateInit.loadBit():    # special
+        stateInit.skipBits(2)
+    code = stateInit.loadRef() if stateInit.loadBit() else None
+    data = stateInit.loadRef() if stateInit.loadBit() else None
+    return (code, data)
+
+def buildInitialData(data: Cell, abiData: list, initialPubkey: str, initialData: dict):
+    entries   = parseHashmapE(data) if data is not None else {}
+    abiFields = {field["name"]: field for field in abiData}
+
+    for name, value in initialData.items():
+        field = abiFields[name]
+        entries[int(field["key"])] = packAbiValue(field["type"], value)
+
+    if initialPubkey is not None and initialPubkey != "":
+        entries[0] = (int(initialPubkey, 16), 256, ())
+
+    return buildHashmapE(entries)
+
+def buildStateInit(code: Cell, data: Cell):
+    # _ split_depth:(Maybe (## 5)) special:(Maybe TickTock) code:(Maybe ^Cell) data:(Maybe ^Cell) library:(HashmapE 256 SimpleLib)
+    builder = CellBuilder()
+    builder.storeUint(0b00110, 5)
+    builder.storeRef(code)
+    builder.storeRef(data)
+    return builder.endCell()
+
+def getAddressFromStateInit(stateInit: Cell, workchainID: int = 0):
+    return "{}:{}".format(workchainID, stateInit.getHashHex())
+
+# ==============================================================================
+#
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+# ==============================================================================
+# Encoding, decoding and signing fanned out to a process pool;
+# every worker imports freeton_utils once and keeps its own client and ABI cache,
+# jobs travel in batches to keep pickling overhead per item small;
+# workers are spawned, not forked: a forked copy of a live TonClient context hangs on the first call;
+#
+import os
+import multiprocessing
+import time
+import threading
+import freeton_utils
+from   concurrent.futures import ProcessPoolExecutor
+from   freeton_utils      import *
+
+# ==============================================================================
+#
+CODEC_BATCH_SIZE = 256
+
+# ==============================================================================
+# Worker side, top-level functions so they can be pickled
+def _initWorker(serverAddress: str):
+    freeton_utils.SERVER_ADDRESS = serverAddress
+
+def _decodeBodies(bodies, possibleAbiFiles):
+    return [decodeMessageBody(body, possibleAbiFiles) for body in bodies]
+
+def _encodeBodies(calls):
+    return [prepareMessageBoc(abiPath=abiPath, functionName=functionName, functionParams=functionParams) for (abiPath, functionName, functionParams) in calls]
+
+def _encodeMessages(calls):
+    tonClient = getClient()
+    result    = []
+    for (abiPath, contractAddress, functionName, functionParams, signer) in calls:
+        callSet = CallSet(function_name=functionName, input=functionParams)
+        params  = ParamsOfEncodeMessage(abi=getAbi(abiPath), address=contractAddress, signer=signer, call_set=callSet)
+        encoded = tonClient.abi.encode_message(params=params)
+        result.append((encoded.message, encoded.message_id))
+    return result
+
+def _sign(unsignedArray, keys: KeyPair):
+    tonClient = getClient()
+    return [tonClient.crypto.sign(params=ParamsOfSign(unsigned=unsigned, keys=keys)).signature for unsigned in unsignedArray]
+
+# ==============================================================================
+# Usage:
+#     codec   = CodecService(maxWorkers=8)
+#     decoded = codec.decodeBodies([message["body"] for message in messages], ["../bin/AuctionDnsRecord.abi.json"])
+#     codec.close()
+#
+class CodecService(object):
+    def __init__(self, maxWorkers: int = None, batchSize: int = CODEC_BATCH_SIZE):
+        self.MAX_WORKERS = os.cpu_count() if maxWorkers is None else maxWorkers
+        self.BATCH_SIZE  = batchSize
+        self.EXECUTOR    = ProcessPoolExecutor(max_workers=self.MAX_WORKERS, mp_context=multiprocessing.get_context("spawn"), initializer=_initWorker, initargs=(freeton_utils.SERVER_ADDRESS,))
+        self.LOCK        = threading.Lock()
+        self.STATS       = {}
+
+    def _map(self, kind: str, function, items, *args):
+        items   = list(items)
+        batches = [items[start : start + self.BATCH_SIZE] for start in range(0, len(items), self.BATCH_SIZE)]
+        started = time.monotonic()
+        result  = [item for batch in self.EXECUTOR.map(function, batches, *[[arg] * len(batches) for arg in args]) for item in batch]
+        elapsed = time.monotonic() - started
+
+        with self.LOCK:
+            stats = self.STATS.setdefault(kind, {"items": 0, "batches": 0, "seconds": 0.0})
+            stats["items"]   += len(items)
+            stats["batches"] += len(batches)
+            stats["seconds"] += elapsed
+        return result
+
+    # ========================================
+    # Results keep the order of the input
+    def decodeBodies(self, bodies, possibleAbiFiles):
+        return self._map("decode", _decodeBodies, bodies, possibleAbiFiles)
+
+    # [(abiPath, functionName, functionParams), ...] -> internal message bodies
+    def encodeBodies(self, calls):
+        return self._map("encodeBody", _encodeBodies, calls)
+
+    # [(abiPath, contractAddress, functionName, functionParams, signer), ...] -> [(message, messageID), ...], signed with "signer"
+    def encodeMessages(self, calls):
+        return self._map("encodeMessage", _encodeMessages, calls)
+
+    def sign(self, unsignedArray, keys: KeyPair):
+        return self._map("sign", _sign, unsignedArray, keys)
+
+    # ========================================
+    #
+    def getStats(self):
+        with self.LOCK:
+            return {kind: dict(stats, itemsPerSecond=stats["items"] / stats["seconds"] if stats["seconds"] > 0 else 0.0) for (kind, stats) in self.STATS.items()}
+
+    def close(self):
+        self.EXECUTOR.shutdown(wait=True)
+
+# ==============================================================================
+#
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+# ==============================================================================
+# Structured SDK errors: fields are taken from "TonException.client_error" (code, message, data dict),
+# the exception text is never parsed; "classifyError" only compares integers and is meant for retry decisions;
+#
+from enum            import IntEnum
+from tonclient.types import NetErrorCode, ProcessingErrorCode, TvmErrorCode
+
+# ==============================================================================
+# IAuction.sol "require" codes; AuctionBid.sol reuses some numbers with other meanings (its 200 is ERROR_NOT_ENOUGH_MONEY)
+class AuctionError(IntEnum):
+    ERROR_MESSAGE_SENDER_IS_NOT_MY_OWNER = 100
+    ERROR_MESSAGE_SENDER_IS_NOT_MY_BID   = 101
+    ERROR_AUCTION_NOT_RUNNING            = 200
+    ERROR_AUCTION_ENDED                  = 201
+    ERROR_ASSET_NOT_TRANSFERRED          = 202
+    ERROR_AUCTION_IN_PROCESS             = 203
+    ERROR_PRICE_REVEAL_IN_PROCESS        = 204
+    ERROR_NOT_ENOUGH_MONEY               = 205
+    ERROR_DO_NOT_BEAT_YOURSELF           = 206
+    ERROR_MESSAGE_SENDER_IS_NOT_SELLER   = 207
+    ERROR_MESSAGE_SENDER_IS_NOT_ASSET    = 208
+    ERROR_INVALID_AUCTION_TYPE           = 209
+    ERROR_INVALID_BUYER_ADDRESS          = 210
+    ERROR_INVALID_START_DATE             = 211
+    ERROR_INVALID_END_DATE               = 212
+
+# ==============================================================================
+# Error classes
+ERROR_CLASS_NONE      = "none"
+ERROR_CLASS_TRANSIENT = "transient" # network trouble, worth retrying as is
+ERROR_CLASS_EXPIRED   = "expired"   # message was not delivered in time, worth rebuilding and retrying
+ERROR_CLASS_CONTRACT  = "contract"  # contract threw, "exitCode" says why
+ERROR_CLASS_PERMANENT = "permanent"
+
+TRANSIENT_ERROR_CODES = frozenset([
+    NetErrorCode.QUERY_FAILED, NetErrorCode.WAIT_FOR_FAILED, NetErrorCode.GET_SUBSCRIPTION_RESULT_FAILED, NetErrorCode.INVALID_SERVER_RESPONSE,
+    NetErrorCode.WAIT_FOR_TIMEOUT, NetErrorCode.NETWORK_MODULE_SUSPENDED, NetErrorCode.WEBSOCKET_DISCONNECTED, NetErrorCode.NETWORK_MODULE_RESUMED,
+    NetErrorCode.QUERY_TRANSACTION_TREE_TIMEOUT, NetErrorCode.GRAPHQL_CONNECTION_ERROR,
+    ProcessingErrorCode.FETCH_BLOCK_FAILED, ProcessingErrorCode.SEND_MESSAGE_FAILED, ProcessingErrorCode.TRANSACTION_WAIT_TIMEOUT,
+    ProcessingErrorCode.INVALID_BLOCK_RECEIVED, ProcessingErrorCode.CANNOT_CHECK_BLOCK_SHARD, ProcessingErrorCode.BLOCK_NOT_FOUND])
+EXPIRED_ERROR_CODES   = frozenset([ProcessingErrorCode.MESSAGE_ALREADY_EXPIRED, ProcessingErrorCode.MESSAGE_EXPIRED])
+
+# ==============================================================================
+#
+class TonError(object):
+    __slots__ = ("code", "message", "exitCode", "transactionID", "accountAddress", "description", "data")
+
+    def __init__(self, code: int, message: str, data: dict):
+        data                = data if isinstance(data, dict) else {}
+        localError          = data.get("local_error") if isinstance(data.get("local_error"), dict) else {}
+        self.code           = code
+        self.data           = data
+        self.exitCode       = data.get("exit_code", (localError.get("data") or {}).get("exit_code", ""))
+        self.transactionID  = data.get("transaction_id", "")
+        self.accountAddress = data.get("account_address", "")
+        self.description    = data.get("description", "")
+        self.message        = data.get("message", localError.get("message", message))
+
+    @staticmethod
+    def fromException(tonException):
+        clientError = getattr(tonException, "client_error", None)
+        if clientError is not None:
+            return TonError(code=clientError.code, message=clientError.message, data=clientError.data)
+
+        # raised without ClientError (never by the SDK itself), keep the text only
+        return TonError(code=0, message=str(tonException), data={})
+
+    # Meaningful only for exit codes of the auction contract itself: with "auctionAddress" an error of any other account
+    # (AuctionBid, a multisig) gives None, without it the exit code is taken as the auction's one
+    def getAuctionError(self, auctionAddress: str = None):
+        if auctionAddress is not None and self.accountAddress != auctionAddress:
+            return None
+        try:
+            return AuctionError(self.exitCode)
+        except ValueError:
+            return None
+
+    def getClass(self):
+        return classifyError(self)
+
+    def isRetryable(self):
+        return self.getClass() in (ERROR_CLASS_TRANSIENT, ERROR_CLASS_EXPIRED)
+
+    # The dict shape returned by wrappers everywhere as "errorDetails"
+    def toDict(self):
+        return {"errorCode":self.exitCode, "errorMessage":self.message, "transactionID":self.transactionID, "errorDesc":self.description,
+            "sdkCode":self.code}
+
+    def __repr__(self):
+        return "TonError(code={}, exitCode={!r}, message={!r})".format(self.code, self.exitCode, self.message)
+
+# ==============================================================================
+# "error" is a TonError or an "errorDetails" dict
+def classifyError(error):
+    if isinstance(error, TonError):
+        (code, exitCode) = (error.code, error.exitCode)
+    else:
+        (code, exitCode) = (error.get("sdkCode", 0), error["errorCode"])
+
+    if code == 0 and exitCode in (0, ""):
+        return ERROR_CLASS_NONE if exitCode == 0 else ERROR_CLASS_PERMANENT
+    if code in TRANSIENT_ERROR_CODES:
+        return ERROR_CLASS_TRANSIENT
+    if code in EXPIRED_ERROR_CODES:
+        return ERROR_CLASS_EXPIRED
+    if code == TvmErrorCode.CONTRACT_EXECUTION_ERROR or exitCode != "":
+        return ERROR_CLASS_CONTRACT
+    return ERROR_CLASS_PERMANENT
+
+def isRetryableError(error):
+    return classifyError(error) in (ERROR_CLASS_TRANSIENT, ERROR_CLASS_EXPIRED)
+
+# ==============================================================================
+#
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+
+# ==============================================================================
+# IAuction event streams: external outbound messages of many auctions are pushed
+# by "net.subscribe_collection" (all subscriptions share the client's single connection),
+# decoded with the ABI index and delivered to async consumers as typed events;
+# the consumer queue is bounded, on overflow the stream pauses and later catches up with "query_collection";
+#
+import asyncio
+import freeton_utils
+import async_freeton_utils
+from   collections import OrderedDict
+from   freeton_utils import *
+from   freeton_boc   import CellBuilder, packAbiValue, cellToBoc
+
+# ==============================================================================
+#
+MESSAGE_FIELDS       = "id, src, body, created_at, created_lt"
+MSG_TYPE_EXT_OUT     = 2
+SUBSCRIPTION_CHUNK   = 500
+SEEN_MESSAGES_LIMIT  = 100000
+CATCH_UP_MARGIN      = 10
+
+# ==============================================================================
+# Typed events
+class AuctionEvent(object):
+    __slots__ = ("auctionAddress", "messageID", "createdAt")
+
+    def __init__(self, auctionAddress: str, messageID: str, createdAt: int):
+        self.auctionAddress = auctionAddress
+        self.messageID      = messageID
+        self.createdAt      = createdAt
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, ", ".join("{}={!r}".format(name, getattr(self, name)) for name in self._getFields()))
+
+    def _getFields(self):
+        return [name for cls in reversed(type(self).__mro__) for name in getattr(cls, "__slots__", ())]
+
+class BidReceived(AuctionEvent):
+    __slots__ = ("bidderAddress", "amount")
+
+    def __init__(self, auctionAddress: str, messageID: str, createdAt: int, bidderAddress: str, amount: int):
+        AuctionEvent.__init__(self, auctionAddress, messageID, createdAt)
+        self.bidderAddress = bidderAddress
+        self.amount        = amount
+
+class AuctionCancelled(AuctionEvent):
+    __slots__ = ()
+
+def getEventFromMessage(message, abiFilesArray):
+    (abiPath, decoded) = decodeMessageBody(message["body"], abiFilesArray)
+    return getEventFromDecoded(message, abiPath, decoded)
+
+# "abiPath" and "decoded" as returned by decodeMessageBody (or CodecService.decodeBodies)
+def getEventFromDecoded(message, abiPath: str, decoded):
+    if abiPath == "" or decoded.body_type != MessageBodyType.EVENT:
+        return None
+
+    if decoded.name == "bidReceived":
+        return BidReceived(auctionAddress=message["src"], messageID=message["id"], createdAt=message["created_at"],
+            bidderAddress=decoded.value["bidderAddress"], amount=int(str(decoded.value["amount"]), 0))
+    if decoded.name == "auctionCancelled":
+        return AuctionCancelled(auctionAddress=message["src"], messageID=message["id"], createdAt=message["created_at"])
+    return None
+
+# Events "auctionAddress" emitted so far, oldest first (one query, an auction emits a handful)
+def getAuctionEvents(tonClient: TonClient, auctionAddress: str, abiFilesArray = None):
+    params   = ParamsOfQueryCollection(collection="messages", result=MESSAGE_FIELDS, filter={"src": {"eq": auctionAddress}, "msg_type": {"eq": MSG_TYPE_EXT_OUT}},
+        order=[OrderBy(path="created_lt", direction=SortDirection.ASC)], limit=ACCOUNTS_QUERY_LIMIT)
+    messages = tonClient.net.query_collection(params=params).result
+    events   = [getEventFromMessage(message, ["../bin/AuctionDnsRecord.abi.json"] if abiFilesArray is None else abiFilesArray) for message in messages]
+    return [event for event in events if event is not None]
+
+# ==============================================================================
+# Usage:
+#     stream = EventStream(tonClient=getAsyncClient(), addresses=[...])
+#     await stream.start()
+#     async for event in stream: ...
+#
+class EventStream(object):
+    def __init__(self, tonClient: TonClient, addresses, abiFilesArray = None, maxSize: int = 10000, chunkSize: int = SUBSCRIPTION_CHUNK):
+        self.TONCLIENT     = async_freeton_utils.getAsyncClient() if tonClient is None else tonClient
+        self.ABI_FILES     = ["../bin/AuctionDnsRecord.abi.json"] if abiFilesArray is None else abiFilesArray
+        self.ADDRESSES     = list(dict.fromkeys(addresses))
+        self.CHUNK_SIZE    = chunkSize
+        self.QUEUE         = asyncio.Queue(maxsize=maxSize)
+        self.HANDLES       = []
+        self.SEEN          = OrderedDict()
+        self.PAUSED        = False
+        self.LAST_CREATED  = 0
+        self.RESUME_TASK   = None
+        self.STATS         = {"received": 0, "duplicates": 0, "dropped": 0, "pauses": 0, "caughtUp": 0}
+
+    # ========================================
+    #
+    async def start(self):
+        for start in range(0, len(self.ADDRESSES), self.CHUNK_SIZE):
+            await self._subscribe(self.ADDRESSES[start : start + self.CHUNK_SIZE])
+
+    async def addAddresses(self, addresses):
+        newAddresses = [address for address in dict.fromkeys(addresses) if address not in self.ADDRESSES]
+        self.ADDRESSES += newAddresses
+        for start in range(0, len(newAddresses), self.CHUNK_SIZE):
+            await self._subscribe(newAddresses[start : start + self.CHUNK_SIZE])
+
+    async def stop(self):
+        if self.RESUME_TASK is not None:
+            self.RESUME_TASK.cancel()
+        await self._unsubscribeAll()
+
+    def _getFilter(self, addresses):
+        return {"src": {"in": addresses}, "msg_type": {"eq": MSG_TYPE_EXT_OUT}}
+
+    async def _subscribe(self, addresses):
+        params = ParamsOfSubscribeCollection(collection="messages", result=MESSAGE_FIELDS, filter=self._getFilter(addresses))
+        handle = await self.TONCLIENT.net.subscribe_collection(params=params, callback=self._onResponse)
+        self.HANDLES.append(handle)
+
+    async def _unsubscribeAll(self):
+        (handles, self.HANDLES) = (self.HANDLES, [])
+        for handle in handles:
+            await self.TONCLIENT.net.unsubscribe(params=handle)
+
+    # ========================================
+    # Called by the SDK from its own thread
+    def _onResponse(self, responseData, responseType, loop):
+        if responseType == SubscriptionResponseType.OK:
+            loop.call_soon_threadsafe(self._push, responseData["result"])
+
+    def _isNew(self, message):
+        if message["id"] in self.SEEN:
+            self.STATS["duplicates"] += 1
+            return False
+        self.SEEN[message["id"]] = True
+        while len(self.SEEN) > SEEN_MESSAGES_LIMIT:
+            self.SEEN.popitem(last=False)
+        return True
+
+    def _push(self, message):
+        if self.PAUSED:
+            self.STATS["dropped"] += 1 # will be fetched again on catch-up
+            return
+        if message["id"] in self.SEEN:
+            self.STATS["duplicates"] += 1
+            return
+        try:
+            self.QUEUE.put_nowait(message)
+        except asyncio.QueueFull:
+            self.PAUSED = True
+            self.STATS["pauses"] += 1
+            if self.RESUME_TASK is None:
+                self.RESUME_TASK = asyncio.ensure_future(self._resume())
+            return
+        self._isNew(message)
+        self.LAST_CREATED = max(self.LAST_CREATED, message["created_at"])
+        self.STATS["received"] += 1
+
+    # Consumer is behind: stop the subscriptions, wait for the queue to drain, resubscribe
+    # and fetch everything created since the last delivered message (duplicates are filtered by id)
+    async def _resume(self):
+        while self.PAUSED:
+            await self._unsubscribeAll()
+            while self.QUEUE.qsize() > self.QUEUE.maxsize // 2:
+                await asyncio.sleep(0.1)
+
+            # different shards do not deliver in "created_at" order, go back a bit
+            since       = self.LAST_CREATED - CATCH_UP_MARGIN
+            self.PAUSED = False
+            for start in range(0, len(self.ADDRESSES), self.CHUNK_SIZE):
+                await self._subscribe(self.ADDRESSES[start : start + self.CHUNK_SIZE])
+
+            # keyset pagination over (created_at, id)
+            order = [OrderBy(path="created_at", direction=SortDirection.ASC), OrderBy(path="id", direction=SortDirection.ASC)]
+            for start in range(0, len(self.ADDRESSES), self.CHUNK_SIZE):
+                chunkFilter = self._getFilter(self.ADDRESSES[start : start + self.CHUNK_SIZE])
+                pageFilter  = dict(chunkFilter, created_at={"ge": since})
+                while True:
+                    params = ParamsOfQueryCollection(collection="messages", result=MESSAGE_FIELDS, filter=pageFilter, order=order, limit=ACCOUNTS_QUERY_LIMIT)
+                    page   = (await self.TONCLIENT.net.query_collection(params=params)).result
+                    for message in page:
+                        if self._isNew(message):
+                            await self.QUEUE.put(message)
+                            self.LAST_CREATED = max(self.LAST_CREATED, message["created_at"])
+                            self.STATS["caughtUp"] += 1
+                    if len(page) < ACCOUNTS_QUERY_LIMIT:
+                        break
+                    last       = page[-1]
+                    pageFilter = dict(chunkFilter, created_at={"gt": last["created_at"]}, OR=dict(chunkFilter, created_at={"eq": last["created_at"]}, id={"gt": last["id"]}))
+        self.RESUME_TASK = None
+
+    # ========================================
+    # Events that fail to decode (not an IAuction event) are skipped
+    async def get(self):
+        while True:
+            message = await self.QUEUE.get()
+            event   = getEventFromMessage(message, self.ABI_FILES)
+            if event is not None:
+                return event
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.get()
+
+    def getStats(self):
+        return dict(self.STATS, queued=self.QUEUE.qsize(), subscriptions=len(self.HANDLES))
+
+# ==============================================================================
+# Event body as the contract emits it (single cell, simple types only), for the local stand-in
+def encodeEventBody(abiPath: str, eventName: str, values: dict):
+    abiJson = getAbiJson(abiPath)
+    version = str(abiJson.get("ABI version", 2)).split(".")[0]
+    event   = [event for event in abiJson["events"] if event["name"] == eventName][0]
+    inputs  = ",".join([freeton_utils._getAbiParamSignature(param) for param in event["inputs"]])
+    builder = CellBuilder().storeUint(freeton_utils._getAbiId("{}({})v{}".format(eventName, inputs, version)), 32)
+    for param in event["inputs"]:
+        builder.storeRaw(*packAbiValue(param["type"], values[param["name"]]))
+    return cellToBoc(builder.endCell())
+
+# ==============================================================================
+# Local stand-in for the "net" module: filters by "src in" and "msg_type",
+# "publish" pushes a message to every matching subscription and keeps it for "query_collection";
+# "callback" is called the same way the SDK does it, from a non-loop thread;
+class LocalEventNet(object):
+    def __init__(self):
+        self.SUBSCRIPTIONS = {}
+        self.MESSAGES      = []
+        self.NEXT_HANDLE   = 1
+        self.LOOP          = None
+
+    @staticmethod
+    def _matches(message, messageFilter):
+        for (field, condition) in messageFilter.items():
+            if field == "OR":
+                continue
+            value = message.get(field)
+            for (operation, operand) in condition.items():
+                if (operation == "in" and value not in operand) or (operation == "eq" and value != operand) or \
+                   (operation == "ge" and value < operand)      or (operation == "gt" and value <= operand):
+                    return "OR" in messageFilter and LocalEventNet._matches(message, messageFilter["OR"])
+        return True
+
+    async def subscribe_collection(self, params: ParamsOfSubscribeCollection, callback = None):
+        self.LOOP   = asyncio.get_event_loop()
+        handle      = ResultOfSubscribeCollection(handle=self.NEXT_HANDLE)
+        self.NEXT_HANDLE += 1
+        self.SUBSCRIPTIONS[handle.handle] = (params.filter, callback)
+        return handle
+
+    async def unsubscribe(self, params: ResultOfSubscribeCollection):
+        self.SUBSCRIPTIONS.pop(params.handle, None)
+
+    async def query_collection(self, params: ParamsOfQueryCollection):
+        result = [message for message in self.MESSAGES if self._matches(message, params.filter or {})]
+        result.sort(key=lambda message: (message["created_at"], message["id"]))
+        return ResultOfQueryCollection(result=result[:params.limit] if params.limit else result)
+
+    def publishEvent(self, auctionAddress: str, eventName: str, values: dict, abiPath: str = "../bin/AuctionDnsRecord.abi.json", createdAt: int = None):
+        body    = encodeEventBody(abiPath=abiPath, eventName=eventName, values=values)
+        message = {"id": hashlib.sha256("{}{}".format(len(self.MESSAGES), body).encode()).hexdigest(), "src": auctionAddress, "body": body,
+            "msg_type": MSG_TYPE_EXT_OUT, "created_at": int(time.time()) if createdAt is None else createdAt, "created_lt": hex(len(self.MESSAGES))}
+        self.publish(message)
+        return message
+
+    def publish(self, message):
+        self.MESSAGES.append(message)
+        for (messageFilter, callback) in list(self.SUBSCRIPTIONS.values()):
+            if callback is not None and self._matches(message, messageFilter):
+                callback({"result": message}, SubscriptionResponseType.OK, self.LOOP)
+
+class LocalEventClient(object):
+    def __init__(self):
+        self.net = LocalEventNet()
+
+# ==============================================================================
+#
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+
+# ==============================================================================
+# Local index of auctions and bids in SQLite:
+# auctions deployed by an AuctionManagerDnsRecord are discovered from its outbound messages,
+# their state comes from batched "getInfo" snapshots and bids from "bidReceived" events;
+# deployments and events are read after saved cursors, so "catchUp" is incremental across restarts;
+#
+import sqlite3
+import threading
+import time
+import freeton_utils
+from   freeton_utils  import *
+from   freeton_boc    import bocToCellCached
+from   freeton_events import MESSAGE_FIELDS, MSG_TYPE_EXT_OUT, BidReceived, AuctionCancelled, getEventFromMessage, getEventFromDecoded
+
+# ==============================================================================
+#
+MSG_TYPE_INTERNAL = 0
+INT64_MAX         = 2**63 - 1 # prices above this are clamped in the indexed columns
+
+AUCTION_COLUMNS = [
+    "escrowAddress", "escrowPercent", "sellerAddress", "buyerAddress", "assetAddress", "auctionType",
+    "minBid", "minPriceStep", "buyNowPrice", "dtStart", "dtEnd", "dtRevealEnd", "dutchCycle",
+    "assetReceived", "auctionStarted", "auctionSucceeded", "moneySentOut", "assetDelivered",
+    "currentBuyer", "currentBuyPrice", "currentBuyDT", "currentBlindBets"]
+
+ADDRESS_COLUMNS = ["escrowAddress", "sellerAddress", "buyerAddress", "assetAddress", "currentBuyer"]
+
+def _toSqlValue(name, value):
+    if name in ADDRESS_COLUMNS:
+        return value
+    if isinstance(value, bool):
+        return int(value)
+    return min(int(str(value), 0), INT64_MAX)
+
+# ==============================================================================
+#
+class AuctionIndexer(object):
+    def __init__(self, dbPath: str, tonClient: TonClient = None, managerAddress: str = "", auctionCode: str = None,
+                 abiPath: str = "../bin/AuctionDnsRecord.abi.json", codec = None):
+        self.TONCLIENT       = getClient() if tonClient is None else tonClient
+        self.MANAGER_ADDRESS = managerAddress
+        self.ABI             = abiPath
+        self.CODEC           = codec # optional CodecService, decodes event pages in its process pool
+        self.CODE_HASH       = None if auctionCode is None else bocToCellCached(auctionCode).getHashHex()
+        self.LOCK            = threading.Lock()
+        self.DB              = sqlite3.connect(dbPath, check_same_thread=False, isolation_level=None)
+        self.DB.execute("PRAGMA journal_mode=WAL")
+
+        columns = ", ".join("{} {}".format(name, "TEXT" if name in ADDRESS_COLUMNS else "INTEGER") for name in AUCTION_COLUMNS)
+        self.DB.execute("CREATE TABLE IF NOT EXISTS auctions (address TEXT PRIMARY KEY, managerAddress TEXT, createdAt INTEGER, cancelled INTEGER DEFAULT 0, updatedAt INTEGER, eventsCursor INTEGER DEFAULT 0, " + columns + ")")
+        self.DB.execute("CREATE TABLE IF NOT EXISTS bids (messageID TEXT PRIMARY KEY, auctionAddress TEXT, bidderAddress TEXT, amount INTEGER, createdAt INTEGER)")
+        self.DB.execute("CREATE TABLE IF NOT EXISTS cursors (name TEXT PRIMARY KEY, createdAt INTEGER, id TEXT)")
+        for (name, columns) in [("auctions_asset",  "assetAddress, dtEnd"), ("auctions_seller", "sellerAddress, dtEnd"), ("auctions_type", "auctionType, dtEnd"),
+                                ("auctions_dt_end", "dtEnd"),               ("auctions_price",  "currentBuyPrice"),      ("bids_auction",  "auctionAddress, createdAt"),
+                                ("bids_bidder",     "bidderAddress")]:
+            self.DB.execute("CREATE INDEX IF NOT EXISTS {} ON {} ({})".format(name, name.split("_")[0], columns))
+
+    def _execute(self, query: str, params = ()):
+        with self.LOCK:
+            return self.DB.execute(query, params).fetchall()
+
+    def _executeMany(self, query: str, rows):
+        with self.LOCK:
+            self.DB.execute("BEGIN")
+            self.DB.executemany(query, rows)
+            self.DB.execute("COMMIT")
+
+    # ========================================
+    # Cursors
+    def getCursor(self, name: str):
+        rows = self._execute("SELECT createdAt, id FROM cursors WHERE name = ?", (name,))
+        return rows[0] if rows else (0, "")
+
+    def setCursor(self, name: str, createdAt: int, messageID: str):
+        self._execute("INSERT OR REPLACE INTO cursors (name, createdAt, id) VALUES (?, ?, ?)", (name, createdAt, messageID))
+
+    # Messages after (createdAt, messageID), keyset pagination over (created_at, id)
+    def _queryMessages(self, messageFilter: dict, createdAt: int, messageID: str):
+        order = [OrderBy(path="created_at", direction=SortDirection.ASC), OrderBy(path="id", direction=SortDirection.ASC)]
+        while True:
+            pageFilter = dict(messageFilter, created_at={"gt": createdAt}, OR=dict(messageFilter, created_at={"eq": createdAt}, id={"gt": messageID}))
+            params     = ParamsOfQueryCollection(collection="messages", result=MESSAGE_FIELDS + ", dst", filter=pageFilter, order=order, limit=ACCOUNTS_QUERY_LIMIT)
+            page       = self.TONCLIENT.net.query_collection(params=params).result
+            if not page:
+                return
+            yield page
+            (createdAt, messageID) = (page[-1]["created_at"], page[-1]["id"])
+            if len(page) < ACCOUNTS_QUERY_LIMIT:
+                return
+
+    # ========================================
+    # Ingestion
+    def ingestDeployments(self):
+        cursorName = "manager:" + self.MANAGER_ADDRESS
+        found      = 0
+        for page in self._queryMessages({"src": {"eq": self.MANAGER_ADDRESS}, "msg_type": {"eq": MSG_TYPE_INTERNAL}}, *self.getCursor(cursorName)):
+            createdAt = {message["dst"]: message["created_at"] for message in page}
+            self._executeMany("INSERT OR IGNORE INTO auctions (address, managerAddress, createdAt) VALUES (?, ?, ?)",
+                [(address, self.MANAGER_ADDRESS, created) for (address, created) in createdAt.items()])
+            self.setCursor(cursorName, page[-1]["created_at"], page[-1]["id"])
+            found += len(createdAt)
+        return found
+
+    # "getInfo" of many auctions from one batched accounts query; non-auction accounts (e.g. change sent back) are dropped
+    def ingestSnapshots(self, addresses = None):
+        if addresses is None:
+            addresses = [row[0] for row in self._execute("SELECT address FROM auctions WHERE cancelled = 0 AND (auctionType IS NULL OR assetDelivered = 0 OR moneySentOut = 0)")]
+
+        accounts = getAccountsGraphQL(tonClient=self.TONCLIENT, accountIDsArray=addresses, fields="id, boc, code_hash")
+        rows     = []
+        notAuctions = []
+        for address in addresses:
+            account = accounts.get(address)
+            if account is None or account["boc"] is None:
+                continue
+            if self.CODE_HASH is not None and account["code_hash"] != self.CODE_HASH:
+                notAuctions.append((address,))
+                continue
+            try:
+                info = runFunctionInternal(tonClient=self.TONCLIENT, boc=account["boc"], abiPath=self.ABI, contractAddress=address, functionName="getInfo", functionParams={})
+            except TonException:
+                notAuctions.append((address,))
+                continue
+            rows.append([int(time.time())] + [_toSqlValue(name, info[name]) for name in AUCTION_COLUMNS] + [address])
+
+        self._executeMany("UPDATE auctions SET updatedAt = ?, " + ", ".join(name + " = ?" for name in AUCTION_COLUMNS) + " WHERE address = ?", rows)
+        self._executeMany("DELETE FROM auctions WHERE address = ?", notAuctions)
+        return len(rows)
+
+    def ingestEvent(self, event):
+        if isinstance(event, BidReceived):
+            self._execute("INSERT OR IGNORE INTO bids (messageID, auctionAddress, bidderAddress, amount, createdAt) VALUES (?, ?, ?, ?, ?)",
+                (event.messageID, event.auctionAddress, event.bidderAddress, min(event.amount, INT64_MAX), event.createdAt))
+            # a blind reveal may be lower than the current price, keep the best one
+            self._execute("UPDATE auctions SET currentBuyer = ?, currentBuyPrice = ?, currentBuyDT = ? WHERE address = ? AND (currentBuyPrice IS NULL OR currentBuyPrice < ?)",
+                (event.bidderAddress, min(event.amount, INT64_MAX), event.createdAt, event.auctionAddress, min(event.amount, INT64_MAX)))
+        elif isinstance(event, AuctionCancelled):
+            self._execute("UPDATE auctions SET cancelled = 1 WHERE address = ?", (event.auctionAddress,))
+
+    # Every auction keeps its own events cursor (auctions discovered late start from zero);
+    # auctions with close cursors are queried together from the smallest one, bids are deduplicated by message id
+    def ingestEvents(self, chunkSize: int = 500):
+        auctions = self._execute("SELECT address, eventsCursor FROM auctions WHERE auctionType IS NOT NULL ORDER BY eventsCursor")
+        ingested = 0
+        for start in range(0, len(auctions), chunkSize):
+            chunk     = auctions[start : start + chunkSize]
+            addresses = [address for (address, _) in chunk]
+            cursor    = chunk[0][1]
+            for page in self._queryMessages({"src": {"in": addresses}, "msg_type": {"eq": MSG_TYPE_EXT_OUT}}, cursor - 1, ""):
+                if self.CODEC is None:
+                    events = [getEventFromMessage(message, [self.ABI]) for message in page]
+                else:
+                    decoded = self.CODEC.decodeBodies([message["body"] for message in page], [self.ABI])
+                    events  = [getEventFromDecoded(message, abiPath, body) for (message, (abiPath, body)) in zip(page, decoded)]
+                for event in events:
+                    if event is not None:
+                        self.ingestEvent(event)
+                        ingested += 1
+                cursor = page[-1]["created_at"]
+            self._executeMany("UPDATE auctions SET eventsCursor = ? WHERE address = ?", [(cursor, address) for address in addresses])
+        return ingested
+
+    # Everything new since the saved cursors
+    def catchUp(self):
+        result = {"auctions": self.ingestDeployments()}
+        result["snapshots"] = self.ingestSnapshots()
+        result["events"]    = self.ingestEvents()
+        return result
+
+    # ========================================
+    # Queries; "activeAt" keeps auctions running at that moment (started, not succeeded, not cancelled, dtStart <= t <= dtEnd)
+    def findAuctions(self, assetAddress: str = None, sellerAddress: str = None, auctionType: int = None, activeAt: int = None,
+                     endingBefore: int = None, endingAfter: int = None, minPrice: int = None, maxPrice: int = None, limit: int = 100):
+        conditions = []
+        params     = []
+        for (condition, value) in [("assetAddress = ?", assetAddress), ("sellerAddress = ?", sellerAddress), ("auctionType = ?", auctionType),
+                                   ("dtEnd <= ?", endingBefore),       ("dtEnd >= ?", endingAfter),          ("currentBuyPrice >= ?", minPrice),
+                                   ("currentBuyPrice <= ?", maxPrice)]:
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        if activeAt is not None:
+            conditions.append("auctionStarted = 1 AND auctionSucceeded = 0 AND cancelled = 0 AND dtStart <= ? AND dtEnd >= ?")
+            params += [activeAt, activeAt]
+
+        query = "SELECT * FROM auctions" + (" WHERE " + " AND ".join(conditions) if conditions else "") + " ORDER BY dtEnd LIMIT ?"
+        with self.LOCK:
+            cursor = self.DB.execute(query, params + [limit])
+            names  = [column[0] for column in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def getBids(self, auctionAddress: str):
+        rows = self._execute("SELECT bidderAddress, amount, createdAt, messageID FROM bids WHERE auctionAddress = ? ORDER BY createdAt", (auctionAddress,))
+        return [{"bidderAddress":bidder, "amount":amount, "createdAt":createdAt, "messageID":messageID} for (bidder, amount, createdAt, messageID) in rows]
+
+    def close(self):
+        with self.LOCK:
+            self.DB.close()
+
+# ==============================================================================
+#
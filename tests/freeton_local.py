@@ -0,0 +1,518 @@
+#!/usr/bin/env python3
+
+# ==============================================================================
+# Local stand-in for a node, plugged into getClient() as "local://<name>":
+# "net" and "processing" are served from memory while contracts really run in "tvm.run_executor"
+# of an offline context (abi/boc/crypto/tvm go to that context, getters and message headers use chain time);
+# every external message makes one block and its whole transaction tree is processed at once,
+# so "wait_for_transaction" never waits; the TON OS SE giver address mints whatever "sendGrams" asks for;
+# chain time can be fast-forwarded with "advance"/"advanceTo" (see freeton_utils.waitForChainTime);
+#
+import asyncio
+import copy
+import functools
+import hashlib
+import itertools
+import re
+import threading
+import time
+from   collections      import deque
+from   tonclient.client import TonClient
+from   tonclient.errors import TonException
+from   tonclient.types  import *
+
+# ==============================================================================
+#
+LOCAL_URL_PREFIX    = "local://"
+LOCAL_GIVER_ADDRESS = "0:841288ed3b55d9cdafa806807f02a0ae0c169aa5edfe88a789a6482429756a94"
+LOCAL_GIVER_ABI     = "../bin/local_giver.abi.json"
+LOCAL_WAIT_TIMEOUT  = 40000 # ms, "wait_for_collection" default
+LOCAL_BLOCK_DELAY   = 1     # seconds, a message sent now lands in the next block, as on a real network
+LOCAL_MESSAGE_TTL   = 40    # seconds, same as the SDK default "message_expiration_timeout"
+
+MSG_TYPE_INTERNAL   = 0
+ACCOUNT_NON_EXIST   = 3     # "end_status" of a transaction that deleted its account
+LT_STEP             = 1000
+OPERATIONS          = frozenset(["eq", "ne", "gt", "lt", "ge", "le", "in", "notIn"])
+
+# (collection, field) -> joined collection, see LocalBlockchain._join
+JOINS = {
+    ("messages",     "dst_transaction"): "transactions",
+    ("messages",     "src_transaction"): "transactions",
+    ("transactions", "in_message"):      "messages",
+    ("transactions", "out_messages"):    "messages",
+    ("transactions", "account"):         "accounts"}
+
+def isLocalAddress(serverAddress: str):
+    return serverAddress.startswith(LOCAL_URL_PREFIX)
+
+def _localError(code: int, message: str, data: dict = None):
+    return TonException(ClientError(code=code, message=message, data={} if data is None else data))
+
+# ==============================================================================
+# GraphQL-like filters, ordering and field selection over plain dicts;
+# big numbers are "0x..." strings in the stored JSON, they are compared as integers
+def _toComparable(value):
+    if isinstance(value, str) and value.startswith("0x"):
+        return int(value, 16)
+    return value
+
+def _check(value, operation: str, operand):
+    value = _toComparable(value)
+    if value is None:
+        return operation in ("ne", "notIn")
+    if isinstance(value, int) and not isinstance(value, bool):
+        operand = [int(str(item), 0) for item in operand] if operation in ("in", "notIn") else int(str(operand), 0)
+
+    if operation == "eq":    return value == operand
+    if operation == "ne":    return value != operand
+    if operation == "gt":    return value >  operand
+    if operation == "lt":    return value <  operand
+    if operation == "ge":    return value >= operand
+    if operation == "le":    return value <= operand
+    if operation == "in":    return value in operand
+    if operation == "notIn": return value not in operand
+    raise _localError(NetErrorCode.QUERY_FAILED, "Unsupported filter operation: {}".format(operation))
+
+def matchesFilter(doc, docFilter):
+    for (field, condition) in (docFilter or {}).items():
+        if field == "OR":
+            continue
+        value = doc.get(field) if isinstance(doc, dict) else None
+        if isinstance(condition, dict) and condition and not set(condition) <= OPERATIONS:
+            matched = matchesFilter(value, condition) if isinstance(value, dict) else False
+        else:
+            matched = all(_check(value, operation, operand) for (operation, operand) in condition.items())
+        if not matched:
+            return "OR" in docFilter and matchesFilter(doc, docFilter["OR"])
+    return True
+
+def _sortDocs(docs, order):
+    for orderBy in reversed(order or []):
+        path = orderBy.path.split(".")
+        docs.sort(key=lambda doc: functools.reduce(lambda item, name: (item or {}).get(name), path, doc) or 0,
+            reverse=(orderBy.direction == SortDirection.DESC))
+    return docs
+
+# "id, balance(format:DEC), compute{exit_code}" -> {name: [decimal, subfields or None]}
+def parseFields(text: str):
+    tokens = deque(re.findall(r"[A-Za-z_]\w*|\([^)]*\)|[{}]", text))
+    return _parseFieldTokens(tokens)
+
+def _parseFieldTokens(tokens):
+    fields = {}
+    name   = None
+    while tokens:
+        token = tokens.popleft()
+        if token == "}":
+            break
+        if token == "{":
+            fields[name][1] = _parseFieldTokens(tokens)
+        elif token.startswith("("):
+            fields[name][0] = "DEC" in token
+        else:
+            name = token
+            fields[name] = [False, None]
+    return fields
+
+def _toDecimal(value):
+    if isinstance(value, str) and value.startswith("0x"):
+        return str(int(value, 16))
+    return str(value) if isinstance(value, int) and not isinstance(value, bool) else value
+
+# Without a server address the SDK executes with its built-in blockchain config instead of fetching one
+def getOfflineClientConfig():
+    config = ClientConfig()
+    config.network.server_address = None
+    return config
+
+# ==============================================================================
+#
+class LocalBlockchain(object):
+    def __init__(self, name: str):
+        self.NAME          = name
+        self.TONCLIENT     = TonClient(config=getOfflineClientConfig(), is_async=False)
+        self.LOCK          = threading.RLock()
+        self.CHANGED       = threading.Condition(self.LOCK)
+        self.COLLECTIONS   = {"accounts": {}, "messages": {}, "transactions": {}, "blocks": {}}
+        self.TX_BY_IN_MSG  = {}
+        self.TX_BY_OUT_MSG = {}
+        self.RESULTS       = {} # external message id -> ResultOfProcessMessage or TonException
+        self.QUEUE         = deque()
+        self.SUBSCRIPTIONS = {} # handle -> (collection, filter, fields, callback, loop)
+        self.HANDLES       = itertools.count(1)
+        self.LT            = itertools.count(LT_STEP, LT_STEP)
+        self.SEQNO         = 0
+        self.TIME_SHIFT    = 0
+        self.GIVER_ABI     = None
+        self.STATS         = {"blocks": 0, "transactions": 0, "rejected": 0}
+
+    # ========================================
+    # Chain time is the wall clock plus the block delay plus whatever "advance" added;
+    # clients round the wall clock (see freeton_utils.getNowTimestamp), the extra half second makes
+    # "getNow" equal to that rounding plus the block delay, so "dtStart = getNowTimestamp() + 1" is never in the chain's future
+    def getTime(self):
+        return time.time() + 0.5 + LOCAL_BLOCK_DELAY + self.TIME_SHIFT
+
+    def getNow(self):
+        return int(self.getTime())
+
+    def advance(self, seconds: int):
+        with self.LOCK:
+            self.TIME_SHIFT += seconds
+            self._newBlock(self.getNow())
+            self.CHANGED.notify_all()
+        return self.getNow()
+
+    # Fast-forward, never back; the new block is what "gen_utime" waiters see
+    def advanceTo(self, timestamp: int):
+        with self.LOCK:
+            return self.advance(max(0, timestamp - self.getNow()))
+
+    # The SDK stamps "time"/"expire" headers from the local clock, a fast-forwarded chain would take them for expired
+    def stampHeader(self, params: ParamsOfEncodeMessage):
+        if params.call_set is None:
+            return params
+        header = params.call_set.header or FunctionHeader()
+        if header.time is not None and header.expire is not None:
+            return params
+        now    = self.getTime()
+        params = copy.copy(params)
+        params.call_set = copy.copy(params.call_set)
+        params.call_set.header = FunctionHeader(expire=int(now) + LOCAL_MESSAGE_TTL if header.expire is None else header.expire,
+            time=int(now * 1000) if header.time is None else header.time, pubkey=header.pubkey)
+        return params
+
+    def getStats(self):
+        with self.LOCK:
+            return dict(self.STATS, accounts=len(self.COLLECTIONS["accounts"]), messages=len(self.COLLECTIONS["messages"]))
+
+    # ========================================
+    # Storage
+    def _store(self, collection: str, doc):
+        self.COLLECTIONS[collection][doc["id"]] = doc
+        for (handle, (subCollection, subFilter, fields, callback, loop)) in list(self.SUBSCRIPTIONS.items()):
+            if subCollection == collection and callback is not None and matchesFilter(doc, subFilter):
+                callback({"result": self._project(collection, doc, fields)}, SubscriptionResponseType.OK, loop)
+
+    def _newBlock(self, now: int):
+        self.SEQNO += 1
+        self.STATS["blocks"] += 1
+        block = {"id": hashlib.sha256("{}:{}".format(self.NAME, self.SEQNO).encode()).hexdigest(), "seqno": self.SEQNO, "gen_utime": now,
+            "workchain_id": 0, "shard": "8000000000000000", "status": 2}
+        self._store("blocks", block)
+        return block["id"]
+
+    def _parseMessage(self, boc: str, now: int):
+        message = self.TONCLIENT.boc.parse_message(params=ParamsOfParse(boc=boc)).parsed
+        message["boc"] = boc
+        message.setdefault("created_at", now)
+        return message
+
+    def _storeAccount(self, address: str, boc: str, endStatus: int):
+        if endStatus == ACCOUNT_NON_EXIST or not boc:
+            self.COLLECTIONS["accounts"].pop(address, None)
+            return
+        account = self.TONCLIENT.boc.parse_account(params=ParamsOfParse(boc=boc)).parsed
+        account["boc"] = boc
+        self._store("accounts", account)
+
+    # ========================================
+    # Execution
+    def _execute(self, message, now: int, abi = None):
+        account  = self.COLLECTIONS["accounts"].get(message["dst"])
+        lt       = next(self.LT)
+        params   = ParamsOfRunExecutor(message=message["boc"], abi=abi, skip_transaction_check=True, return_updated_account=True,
+            account=AccountForExecutor.NoAccount() if account is None else AccountForExecutor.Account(boc=account["boc"]),
+            execution_options=ExecutionOptions(block_time=now, block_lt=lt, transaction_lt=lt + 1))
+        result   = self.TONCLIENT.tvm.run_executor(params=params)
+
+        transaction = result.transaction
+        transaction.setdefault("now", now)
+        self._storeAccount(message["dst"], result.account, transaction.get("end_status"))
+        self._storeTransaction(message, transaction, result.out_messages, now)
+        return ResultOfProcessMessage(transaction=transaction, out_messages=result.out_messages, fees=result.fees, decoded=result.decoded)
+
+    def _storeTransaction(self, inMessage, transaction, outMessages, now: int):
+        outMessages = [self._parseMessage(boc, now) for boc in outMessages]
+        transaction.setdefault("out_msgs", [message["id"] for message in outMessages])
+        self.STATS["transactions"] += 1
+        self._store("messages", inMessage)
+        self._store("transactions", transaction)
+        self.TX_BY_IN_MSG[inMessage["id"]] = transaction["id"]
+        for message in outMessages:
+            self.TX_BY_OUT_MSG[message["id"]] = transaction["id"]
+            self._store("messages", message)
+            if message["msg_type"] == MSG_TYPE_INTERNAL:
+                self.QUEUE.append(message)
+
+    # "sendGrams" of the SE giver becomes a plain internal transfer, anything sent to the giver just disappears
+    def _executeGiver(self, message, now: int):
+        if self.GIVER_ABI is None:
+            with open(LOCAL_GIVER_ABI, "r") as fp:
+                self.GIVER_ABI = Abi.Json(value=fp.read())
+
+        outMessages = []
+        if message["msg_type"] != MSG_TYPE_INTERNAL:
+            decoded = self.TONCLIENT.abi.decode_message(params=ParamsOfDecodeMessage(abi=self.GIVER_ABI, message=message["boc"]))
+            params  = ParamsOfEncodeInternalMessage(value=str(decoded.value["amount"]), address=decoded.value["dest"], src_address=LOCAL_GIVER_ADDRESS, bounce=False)
+            outMessages.append(self.TONCLIENT.abi.encode_internal_message(params=params).message)
+
+        lt          = next(self.LT)
+        transaction = {"id": hashlib.sha256("giver:{}".format(message["id"]).encode()).hexdigest(), "account_addr": LOCAL_GIVER_ADDRESS, "in_msg": message["id"],
+            "outmsg_cnt": len(outMessages), "aborted": False, "now": now, "lt": hex(lt), "status": 3, "end_status": 1, "total_fees": "0x0",
+            "compute": {"exit_code": 0, "success": True, "gas_fees": "0x0"}}
+        self._storeTransaction(message, transaction, outMessages, now)
+        fees = TransactionFees(in_msg_fwd_fee=0, storage_fee=0, gas_fee=0, out_msgs_fwd_fee=0, total_account_fees=0, total_output=0, ext_in_msg_fee=0,
+            total_fwd_fees=0, account_fees=0)
+        return ResultOfProcessMessage(transaction=transaction, out_messages=outMessages, fees=fees)
+
+    def _process(self, message, now: int, abi = None):
+        if message["dst"] == LOCAL_GIVER_ADDRESS:
+            return self._executeGiver(message, now)
+        return self._execute(message, now, abi)
+
+    # External message in, the whole tree out; an external message the contract did not accept leaves no trace, like on chain
+    def sendExternal(self, boc: str, abi = None):
+        with self.LOCK:
+            now         = self.getNow()
+            blockID     = self._newBlock(now)
+            message     = self._parseMessage(boc, now)
+            try:
+                result = self._process(message, now, abi)
+                if result.transaction.get("aborted"):
+                    exitCode = result.transaction.get("compute", {}).get("exit_code")
+                    result   = _localError(TvmErrorCode.CONTRACT_EXECUTION_ERROR, "Contract execution was terminated with error: {}".format(exitCode),
+                        {"exit_code": exitCode, "transaction_id": result.transaction["id"], "account_address": message["dst"], "phase": "computeVm"})
+            except TonException as ton:
+                self.STATS["rejected"] += 1
+                result = ton
+
+            while self.QUEUE:
+                internal = self.QUEUE.popleft()
+                try:
+                    self._process(internal, now)
+                except TonException:
+                    self.STATS["rejected"] += 1 # executor could not build a transaction, the message is lost
+
+            self.RESULTS[message["id"]] = result
+            self.CHANGED.notify_all()
+            return blockID
+
+    def getResult(self, messageID: str):
+        with self.LOCK:
+            result = self.RESULTS.get(messageID)
+        if result is None:
+            raise _localError(ProcessingErrorCode.TRANSACTION_WAIT_TIMEOUT, "Message {} was never sent to {}".format(messageID, self.NAME))
+        if isinstance(result, TonException):
+            raise result
+        return result
+
+    # ========================================
+    # Queries
+    def _join(self, collection: str, doc, name: str):
+        target = JOINS.get((collection, name))
+        if target is None:
+            return None
+        if name == "dst_transaction":
+            return self.COLLECTIONS[target].get(self.TX_BY_IN_MSG.get(doc["id"]))
+        if name == "src_transaction":
+            return self.COLLECTIONS[target].get(self.TX_BY_OUT_MSG.get(doc["id"]))
+        if name == "in_message":
+            return self.COLLECTIONS[target].get(doc.get("in_msg"))
+        if name == "out_messages":
+            return [self.COLLECTIONS[target][messageID] for messageID in doc.get("out_msgs", []) if messageID in self.COLLECTIONS[target]]
+        return self.COLLECTIONS[target].get(doc.get("account_addr"))
+
+    def _project(self, collection: str, doc, fields):
+        result = {}
+        for (name, (decimal, subfields)) in fields.items():
+            value = doc.get(name) if name in doc else self._join(collection, doc, name)
+            if subfields is not None and value is not None:
+                subCollection = JOINS.get((collection, name))
+                value = [self._project(subCollection, item, subfields) for item in value] if isinstance(value, list) else self._project(subCollection, value, subfields)
+            result[name] = _toDecimal(value) if decimal else value
+        return result
+
+    def query(self, collection: str, docFilter, fields: str, order = None, limit: int = None):
+        with self.LOCK:
+            docs = [doc for doc in self.COLLECTIONS[collection].values() if matchesFilter(doc, docFilter)]
+            docs = _sortDocs(docs, order)[:limit] if limit else _sortDocs(docs, order)
+            parsedFields = parseFields(fields)
+            return [self._project(collection, doc, parsedFields) for doc in docs]
+
+    def waitFor(self, collection: str, docFilter, fields: str, timeout: int = None):
+        deadline = time.monotonic() + (LOCAL_WAIT_TIMEOUT if timeout is None else timeout) / 1000
+        with self.CHANGED:
+            while True:
+                found = self.query(collection, docFilter, fields, limit=1)
+                if found:
+                    return found[0]
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.CHANGED.wait(remaining):
+                    raise _localError(NetErrorCode.WAIT_FOR_TIMEOUT, "wait_for_collection timed out on {}".format(self.NAME))
+
+    def getTransactionTree(self, inMessageID: str, abiRegistry = None):
+        with self.LOCK:
+            (messages, transactions) = ([], [])
+            pending = deque([inMessageID])
+            while pending:
+                messageID = pending.popleft()
+                message   = self.COLLECTIONS["messages"].get(messageID)
+                if message is None:
+                    continue
+                txID = self.TX_BY_IN_MSG.get(messageID)
+                messages.append(MessageNode(id=messageID, bounce=message.get("bounce", False), src_transaction_id=self.TX_BY_OUT_MSG.get(messageID),
+                    dst_transaction_id=txID, src=message.get("src"), dst=message.get("dst"), value=_toDecimal(message.get("value")),
+                    decoded_body=self._decodeBody(message, abiRegistry)))
+                if txID is None:
+                    continue
+                transaction = self.COLLECTIONS["transactions"][txID]
+                transactions.append(TransactionNode(id=txID, in_msg=messageID, out_msgs=transaction.get("out_msgs", []), account_addr=transaction.get("account_addr"),
+                    total_fees=_toDecimal(transaction.get("total_fees")), aborted=transaction.get("aborted", False), exit_code=transaction.get("compute", {}).get("exit_code")))
+                pending.extend(transaction.get("out_msgs", []))
+            return ResultOfQueryTransactionTree(messages=messages, transactions=transactions)
+
+    def _decodeBody(self, message, abiRegistry):
+        if not message.get("body"):
+            return None
+        for abi in abiRegistry or []:
+            try:
+                params = ParamsOfDecodeMessageBody(abi=abi, body=message["body"], is_internal=(message["msg_type"] == MSG_TYPE_INTERNAL))
+                return self.TONCLIENT.abi.decode_message_body(params=params)
+            except TonException:
+                continue
+        return None
+
+    def subscribe(self, collection: str, docFilter, fields: str, callback, loop = None):
+        with self.LOCK:
+            handle = next(self.HANDLES)
+            self.SUBSCRIPTIONS[handle] = (collection, docFilter, parseFields(fields), callback, loop)
+            return handle
+
+    def unsubscribe(self, handle: int):
+        with self.LOCK:
+            self.SUBSCRIPTIONS.pop(handle, None)
+
+LOCAL_CHAINS      = {}
+LOCAL_CHAINS_LOCK = threading.Lock()
+
+# One chain per URL, sync and async clients of the same URL see the same state
+def getLocalBlockchain(serverAddress: str):
+    with LOCAL_CHAINS_LOCK:
+        chain = LOCAL_CHAINS.get(serverAddress)
+        if chain is None:
+            chain = LOCAL_CHAINS[serverAddress] = LocalBlockchain(serverAddress[len(LOCAL_URL_PREFIX):])
+        return chain
+
+# ==============================================================================
+# The SDK module surface the repo uses
+class LocalNet(object):
+    LOOP_AWARE = ("subscribe_collection",)
+
+    def __init__(self, chain: LocalBlockchain):
+        self.CHAIN = chain
+
+    def query_collection(self, params: ParamsOfQueryCollection):
+        return ResultOfQueryCollection(result=self.CHAIN.query(params.collection, params.filter, params.result, params.order, params.limit))
+
+    def wait_for_collection(self, params: ParamsOfWaitForCollection):
+        return ResultOfWaitForCollection(result=self.CHAIN.waitFor(params.collection, params.filter, params.result, params.timeout))
+
+    def query_transaction_tree(self, params: ParamsOfQueryTransactionTree):
+        return self.CHAIN.getTransactionTree(params.in_msg, params.abi_registry)
+
+    def subscribe_collection(self, params: ParamsOfSubscribeCollection, callback = None, loop = None):
+        return ResultOfSubscribeCollection(handle=self.CHAIN.subscribe(params.collection, params.filter, params.result, callback, loop))
+
+    def unsubscribe(self, params: ResultOfSubscribeCollection):
+        self.CHAIN.unsubscribe(params.handle)
+
+class LocalProcessing(object):
+    LOOP_AWARE = ()
+
+    def __init__(self, chain: LocalBlockchain):
+        self.CHAIN = chain
+
+    def send_message(self, params: ParamsOfSendMessage):
+        blockID = self.CHAIN.sendExternal(params.message, params.abi)
+        return ResultOfSendMessage(shard_block_id=blockID, sending_endpoints=[LOCAL_URL_PREFIX + self.CHAIN.NAME])
+
+    def wait_for_transaction(self, params: ParamsOfWaitForTransaction):
+        messageID = self.CHAIN.TONCLIENT.boc.get_boc_hash(params=ParamsOfGetBocHash(boc=params.message)).hash
+        return self.CHAIN.getResult(messageID)
+
+    def process_message(self, params: ParamsOfProcessMessage):
+        encoded = self.CHAIN.TONCLIENT.abi.encode_message(params=self.CHAIN.stampHeader(params.message_encode_params))
+        self.CHAIN.sendExternal(encoded.message, params.message_encode_params.abi)
+        return self.CHAIN.getResult(encoded.message_id)
+
+# Getters run at chain time rather than at the local clock, unless the caller set the time itself;
+# everything else is the offline "tvm" as is (sync or async)
+class LocalTvm(object):
+    def __init__(self, chain: LocalBlockchain, tvm):
+        self.CHAIN = chain
+        self.TVM   = tvm
+
+    def run_tvm(self, params: ParamsOfRunTvm):
+        if params.execution_options is None:
+            params = copy.copy(params)
+            params.execution_options = ExecutionOptions(block_time=self.CHAIN.getNow())
+        return self.TVM.run_tvm(params=params)
+
+    def __getattr__(self, name: str):
+        return getattr(self.TVM, name)
+
+# External messages are stamped with chain time
+class LocalAbi(object):
+    def __init__(self, chain: LocalBlockchain, abi):
+        self.CHAIN = chain
+        self.ABI   = abi
+
+    def encode_message(self, params: ParamsOfEncodeMessage):
+        return self.ABI.encode_message(params=self.CHAIN.stampHeader(params))
+
+    def __getattr__(self, name: str):
+        return getattr(self.ABI, name)
+
+# Same methods as coroutines, run in the default executor so blocking waits do not stall the loop
+class _AsyncModule(object):
+    def __init__(self, module):
+        self.MODULE = module
+
+    def __getattr__(self, name: str):
+        method = getattr(self.MODULE, name)
+
+        async def _call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            if name in self.MODULE.LOOP_AWARE:
+                kwargs["loop"] = loop
+            return await loop.run_in_executor(None, functools.partial(method, *args, **kwargs))
+        return _call
+
+# ==============================================================================
+# Usage:
+#     freeton_utils.SERVER_ADDRESS = "local://tests"
+#     tonClient = getClient()
+#
+class LocalTonClient(object):
+    def __init__(self, serverAddress: str, isAsync: bool = False):
+        self.CHAIN      = getLocalBlockchain(serverAddress)
+        self.OFFLINE    = TonClient(config=getOfflineClientConfig(), is_async=isAsync)
+        self.is_async   = isAsync
+        self.net        = _AsyncModule(LocalNet(self.CHAIN))        if isAsync else LocalNet(self.CHAIN)
+        self.processing = _AsyncModule(LocalProcessing(self.CHAIN)) if isAsync else LocalProcessing(self.CHAIN)
+        self.tvm        = LocalTvm(self.CHAIN, self.OFFLINE.tvm)
+        self.abi        = LocalAbi(self.CHAIN, self.OFFLINE.abi)
+
+    # boc, crypto, utils and the rest are the offline context itself
+    def __getattr__(self, name: str):
+        if name == "OFFLINE":
+            raise AttributeError(name)
+        return getattr(self.OFFLINE, name)
+
+    def destroy_context(self):
+        self.OFFLINE.destroy_context()
+
+# ==============================================================================
+#
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+
+# ==============================================================================
+# Typed getter results: decoded SDK dicts (string-encoded integers, hex bytes) are parsed once
+# into slotted objects; "SnapshotTable" keeps many snapshots column by column in "array" buffers,
+# addresses are interned, wide integers are split into 64-bit words;
+#
+from array           import array
+from enum            import IntEnum
+from freeton_pricing import AUCTION_ENGLISH_FORWARD, AUCTION_ENGLISH_BLIND, AUCTION_DUTCH_FORWARD, AUCTION_PUBLIC_BUY, AUCTION_PRIVATE_BUY, PriceSnapshot
+
+# ==============================================================================
+#
+class AuctionType(IntEnum):
+    ENGLISH_FORWARD = AUCTION_ENGLISH_FORWARD
+    ENGLISH_BLIND   = AUCTION_ENGLISH_BLIND
+    DUTCH_FORWARD   = AUCTION_DUTCH_FORWARD
+    PUBLIC_BUY      = AUCTION_PUBLIC_BUY
+    PRIVATE_BUY     = AUCTION_PRIVATE_BUY
+
+# ABI type -> "array" typecode; everything not listed here is stored differently (see SnapshotTable)
+TYPECODES = {"bool": "B", "uint8": "B", "uint16": "H", "uint32": "L", "auctionType": "B"}
+WORDS     = {"uint128": 2, "uint256": 4}
+WORD_MASK = 2**64 - 1
+
+def _parseValue(kind: str, value):
+    if kind == "address":
+        return str(value)
+    if kind == "bytes":
+        return bytes.fromhex(value).decode("utf-8", "replace")
+    if kind == "bool":
+        return bool(value)
+    number = value if isinstance(value, int) else int(str(value), 0)
+    return AuctionType(number) if kind == "auctionType" else number
+
+# ==============================================================================
+# FIELDS is a list of (name, kind) in getter output order, "address" is the contract the getter ran on
+class Model(object):
+    __slots__ = ("address",)
+    FIELDS    = []
+
+    def __init__(self, address: str = "", **values):
+        self.address = address
+        for (name, _) in self.FIELDS:
+            setattr(self, name, values[name])
+
+    # "runFunction" returns "" for accounts without state, that gives None
+    @classmethod
+    def fromDecoded(cls, decoded, address: str = ""):
+        if decoded == "":
+            return None
+        return cls(address=address, **{name: _parseValue(kind, decoded[name]) for (name, kind) in cls.FIELDS})
+
+    # dict-like read access keeps code written against the decoded dicts working
+    def __getitem__(self, name: str):
+        return getattr(self, name)
+
+    def toDict(self):
+        return {name: getattr(self, name) for (name, _) in self.FIELDS}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.address == other.address and self.toDict() == other.toDict()
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, ", ".join("{}={!r}".format(name, getattr(self, name)) for name in ["address"] + [name for (name, _) in self.FIELDS]))
+
+class AuctionInfo(Model):
+    FIELDS = [
+        ("escrowAddress",    "address"), ("escrowPercent",    "uint16"),  ("sellerAddress",   "address"), ("buyerAddress", "address"),
+        ("assetAddress",     "address"), ("auctionType",      "auctionType"),
+        ("minBid",           "uint128"), ("minPriceStep",     "uint128"), ("buyNowPrice",     "uint128"),
+        ("dtStart",          "uint32"),  ("dtEnd",            "uint32"),  ("dtRevealEnd",     "uint32"),  ("dutchCycle",   "uint32"),
+        ("assetReceived",    "bool"),    ("auctionStarted",   "bool"),    ("auctionSucceeded", "bool"),   ("moneySentOut", "bool"), ("assetDelivered", "bool"),
+        ("currentBuyer",     "address"), ("currentBuyPrice",  "uint128"), ("currentBuyDT",    "uint32"),  ("currentBlindBets", "uint128")]
+    __slots__ = tuple(name for (name, _) in FIELDS)
+
+    def toPriceSnapshot(self):
+        return PriceSnapshot(**{name: int(getattr(self, name)) for name in PriceSnapshot.__slots__})
+
+class BidInfo(Model):
+    FIELDS = [
+        ("auctionAddress", "address"), ("bidderAddress", "address"), ("feeValue", "uint128"), ("priceHash", "uint256"), ("dt", "uint32")]
+    __slots__ = tuple(name for (name, _) in FIELDS)
+
+class DnsWhois(Model):
+    FIELDS = [
+        ("endpointAddress",      "address"), ("segmentsCount",        "uint8"),   ("domainName",         "bytes"),  ("parentDomainName", "bytes"),
+        ("parentDomainAddress",  "address"), ("ownerAddress",         "address"), ("dtLastProlongation", "uint32"), ("dtExpires",        "uint32"),
+        ("registrationPrice",    "uint128"), ("registrationType",     "uint8"),   ("lastRegResult",      "uint8"),  ("comment",          "bytes"),
+        ("dtCreated",            "uint32"),  ("totalOwnersNum",       "uint128"), ("subdomainRegAccepted", "uint128"), ("subdomainRegDenied", "uint128"),
+        ("totalFeesCollected",   "uint128")]
+    __slots__ = tuple(name for (name, _) in FIELDS)
+
+# ==============================================================================
+# Columnar storage of one Model class; rows are materialized on access only.
+# Usage:
+#     table = SnapshotTable(AuctionInfo)
+#     table.extend(decodedDicts, addresses)
+#     ends  = table.getColumn("dtEnd")
+#
+class SnapshotTable(object):
+    def __init__(self, modelClass = AuctionInfo, rows = ()):
+        self.MODEL     = modelClass
+        self.ADDRESSES = []     # interned address strings
+        self.INTERNED  = {}     # address -> index in ADDRESSES
+        self.COLUMNS   = {"address": array("L")}
+        for (name, kind) in self.MODEL.FIELDS:
+            if kind in TYPECODES:
+                self.COLUMNS[name] = array(TYPECODES[kind])
+            elif kind in WORDS:
+                self.COLUMNS[name] = [array("Q") for _ in range(WORDS[kind])]
+            elif kind == "address":
+                self.COLUMNS[name] = array("L")
+            else:
+                self.COLUMNS[name] = []
+        for row in rows:
+            self.append(row)
+
+    def _intern(self, address: str):
+        index = self.INTERNED.get(address)
+        if index is None:
+            index = len(self.ADDRESSES)
+            self.INTERNED[address] = index
+            self.ADDRESSES.append(address)
+        return index
+
+    # "row" is a Model or a decoded getter dict
+    def append(self, row, address: str = None):
+        if not isinstance(row, self.MODEL):
+            row = self.MODEL.fromDecoded(row, address="" if address is None else address)
+        self.COLUMNS["address"].append(self._intern(row.address if address is None else address))
+        for (name, kind) in self.MODEL.FIELDS:
+            value = getattr(row, name)
+            if kind in WORDS:
+                for (word, column) in enumerate(self.COLUMNS[name]):
+                    column.append((value >> (64 * word)) & WORD_MASK)
+            elif kind == "address":
+                self.COLUMNS[name].append(self._intern(value))
+            else:
+                self.COLUMNS[name].append(value)
+
+    def extend(self, rows, addresses = None):
+        for (index, row) in enumerate(rows):
+            self.append(row, None if addresses is None else addresses[index])
+
+    def __len__(self):
+        return len(self.COLUMNS["address"])
+
+    # ========================================
+    #
+    def _getValue(self, name: str, kind: str, index: int):
+        column = self.COLUMNS[name]
+        if kind in WORDS:
+            return sum(words[index] << (64 * word) for (word, words) in enumerate(column))
+        if kind == "address":
+            return self.ADDRESSES[column[index]]
+        if kind == "bool":
+            return bool(column[index])
+        if kind == "auctionType":
+            return AuctionType(column[index])
+        return column[index]
+
+    def getRow(self, index: int):
+        values = {name: self._getValue(name, kind, index) for (name, kind) in self.MODEL.FIELDS}
+        return self.MODEL(address=self._getValue("address", "address", index), **values)
+
+    def __getitem__(self, index: int):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("SnapshotTable index out of range")
+        return self.getRow(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.getRow(index)
+
+    # Plain "array" for narrow integer columns (no copy), a list otherwise
+    def getColumn(self, name: str):
+        if name == "address":
+            return [self.ADDRESSES[index] for index in self.COLUMNS["address"]]
+        kind = dict(self.MODEL.FIELDS)[name]
+        if kind in TYPECODES and kind not in ("bool", "auctionType"):
+            return self.COLUMNS[name]
+        return [self._getValue(name, kind, index) for index in range(len(self))]
+
+    def getIndexes(self, name: str, value):
+        return [index for (index, item) in enumerate(self.getColumn(name)) if item == value]
+
+    def getPriceSnapshots(self):
+        columns = [self.getColumn(name) for name in PriceSnapshot.__slots__]
+        return [PriceSnapshot(*map(int, values)) for values in zip(*columns)]
+
+    # Bytes held by the column buffers and the interned strings, without Python object overhead
+    def getMemoryUsage(self):
+        result = self.COLUMNS["address"].buffer_info()[1] * self.COLUMNS["address"].itemsize
+        for (name, kind) in self.MODEL.FIELDS:
+            column = self.COLUMNS[name]
+            if kind in WORDS:
+                result += sum(words.buffer_info()[1] * words.itemsize for words in column)
+            elif kind == "bytes":
+                result += sum(len(item) for item in column)
+            else:
+                result += column.buffer_info()[1] * column.itemsize
+        return result + sum(len(address) for address in self.ADDRESSES)
+
+# ==============================================================================
+#
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+
+# ==============================================================================
+# Local mirror of IAuction.getDesiredPrice, evaluated from a "getInfo" snapshot;
+# PRICE_UNAVAILABLE (-1) is returned where the getter would throw:
+# "now" before dtStart, zero dutchCycle or uint128 overflow;
+# NumPy is optional, PriceTable falls back to the scalar function without it;
+#
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# ==============================================================================
+#
+AUCTION_ENGLISH_FORWARD = 0
+AUCTION_ENGLISH_BLIND   = 1
+AUCTION_DUTCH_FORWARD   = 2
+AUCTION_PUBLIC_BUY      = 3
+AUCTION_PRIVATE_BUY     = 4
+
+UINT128_MAX       = 2**128 - 1
+PRICE_UNAVAILABLE = -1
+
+# values below this keep every intermediate result inside int64, otherwise NumPy works on Python ints
+SAFE_INT64        = 2**61
+
+# ==============================================================================
+#
+def _toInt(value):
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, int):
+        return value
+    return int(str(value), 0)
+
+class PriceSnapshot(object):
+    __slots__ = ("auctionType", "minBid", "minPriceStep", "buyNowPrice", "dtStart", "dutchCycle", "currentBuyPrice")
+
+    def __init__(self, auctionType: int, minBid: int, minPriceStep: int, buyNowPrice: int, dtStart: int, dutchCycle: int, currentBuyPrice: int = 0):
+        self.auctionType     = auctionType
+        self.minBid          = minBid
+        self.minPriceStep    = minPriceStep
+        self.buyNowPrice     = buyNowPrice
+        self.dtStart         = dtStart
+        self.dutchCycle      = dutchCycle
+        self.currentBuyPrice = currentBuyPrice
+
+    # "info" is the decoded "getInfo" output
+    @staticmethod
+    def fromInfo(info):
+        return PriceSnapshot(**{name: _toInt(info[name]) for name in PriceSnapshot.__slots__})
+
+def _getSnapshot(snapshot):
+    return snapshot if isinstance(snapshot, PriceSnapshot) else PriceSnapshot.fromInfo(snapshot)
+
+# ==============================================================================
+#
+def getDesiredPrice(snapshot, now: int):
+
+    snapshot = _getSnapshot(snapshot)
+    if snapshot.auctionType == AUCTION_ENGLISH_FORWARD:
+        if snapshot.currentBuyPrice == 0:
+            return snapshot.minBid
+        price = snapshot.currentBuyPrice + snapshot.minPriceStep
+        if price > UINT128_MAX:
+            return PRICE_UNAVAILABLE
+        return min(price, snapshot.buyNowPrice) if snapshot.buyNowPrice > 0 else price
+
+    if snapshot.auctionType == AUCTION_ENGLISH_BLIND:
+        return 0
+
+    if snapshot.auctionType in (AUCTION_PUBLIC_BUY, AUCTION_PRIVATE_BUY):
+        return snapshot.buyNowPrice
+
+    if snapshot.auctionType == AUCTION_DUTCH_FORWARD:
+        if now < snapshot.dtStart or snapshot.dutchCycle == 0:
+            return PRICE_UNAVAILABLE
+        subtract = (now - snapshot.dtStart) // snapshot.dutchCycle * snapshot.minPriceStep
+        if subtract > UINT128_MAX:
+            return PRICE_UNAVAILABLE
+        if subtract >= snapshot.minBid:
+            return snapshot.buyNowPrice
+        return max(snapshot.minBid - subtract, snapshot.buyNowPrice)
+
+    return 0
+
+# ==============================================================================
+# Vectorized version: columns are built once per set of snapshots,
+# scalar "timestamps" give one price per snapshot, an array gives a (snapshots x timestamps) table;
+# without NumPy the same shapes are returned as lists;
+class PriceTable(object):
+    def __init__(self, snapshots):
+        self.SNAPSHOTS = [_getSnapshot(snapshot) for snapshot in snapshots]
+        self.COLUMNS   = {}
+        self.DTYPE     = None
+        if numpy is None:
+            return
+
+        maximum    = max([max(s.minBid, s.minPriceStep, s.buyNowPrice, s.currentBuyPrice) for s in self.SNAPSHOTS], default=0)
+        self.DTYPE = numpy.int64 if maximum < SAFE_INT64 else object
+        for name in PriceSnapshot.__slots__:
+            self.COLUMNS[name] = numpy.array([getattr(s, name) for s in self.SNAPSHOTS], dtype=numpy.int64 if name in ("auctionType", "dtStart", "dutchCycle") else self.DTYPE)
+
+        # time independent part
+        auctionType  = self.COLUMNS["auctionType"]
+        minBid       = self.COLUMNS["minBid"]
+        minPriceStep = self.COLUMNS["minPriceStep"]
+        buyNowPrice  = self.COLUMNS["buyNowPrice"]
+        currentPrice = self.COLUMNS["currentBuyPrice"]
+
+        english             = currentPrice + minPriceStep
+        self.ENGLISH_FAILED = (currentPrice != 0) & (english > UINT128_MAX) if self.DTYPE is object else numpy.zeros(len(self.SNAPSHOTS), dtype=bool)
+        english             = numpy.where(buyNowPrice > 0, numpy.minimum(english, buyNowPrice), english)
+        self.ENGLISH        = numpy.where(currentPrice == 0, minBid, english)
+        self.STEPPED        = minPriceStep > 0
+        self.THRESHOLD      = -(-minBid // numpy.where(self.STEPPED, minPriceStep, 1))
+        self.IS_ENGLISH     = auctionType == AUCTION_ENGLISH_FORWARD
+        self.IS_DUTCH       = auctionType == AUCTION_DUTCH_FORWARD
+        self.IS_BUY         = (auctionType == AUCTION_PUBLIC_BUY) | (auctionType == AUCTION_PRIVATE_BUY)
+
+    def getDesiredPrices(self, timestamps):
+        isScalar = not hasattr(timestamps, "__len__")
+        if numpy is None:
+            if isScalar:
+                return [getDesiredPrice(snapshot, timestamps) for snapshot in self.SNAPSHOTS]
+            return [[getDesiredPrice(snapshot, now) for now in timestamps] for snapshot in self.SNAPSHOTS]
+
+        # snapshots go along the first axis, timestamps along the second one
+        column = (lambda value: value) if isScalar else (lambda value: value[:, None])
+        now    = numpy.asarray(timestamps, dtype=numpy.int64)
+        if not isScalar:
+            now = now[None, :]
+
+        minBid       = column(self.COLUMNS["minBid"])
+        minPriceStep = column(self.COLUMNS["minPriceStep"])
+        buyNowPrice  = column(self.COLUMNS["buyNowPrice"])
+        dutchCycle   = column(self.COLUMNS["dutchCycle"])
+        stepped      = column(self.STEPPED)
+        isDutch      = column(self.IS_DUTCH)
+
+        # DUTCH_FORWARD; cycles are clipped where the price has already reached the bottom so that products stay small
+        passed      = now - column(self.COLUMNS["dtStart"])
+        dutchFailed = (passed < 0) | (dutchCycle == 0)
+        cycles      = numpy.where(dutchFailed, 0, passed) // numpy.where(dutchCycle == 0, 1, dutchCycle)
+        threshold   = column(self.THRESHOLD)
+        reached     = numpy.where(stepped, cycles >= threshold, minBid == 0)
+        if self.DTYPE is object:
+            dutchFailed = dutchFailed | (cycles * minPriceStep > UINT128_MAX)
+        subtract    = numpy.where(stepped, numpy.minimum(cycles, threshold), 0) * minPriceStep
+        dutch       = numpy.where(reached, buyNowPrice, numpy.maximum(minBid - subtract, buyNowPrice))
+
+        shape  = numpy.broadcast(isDutch, dutch).shape
+        prices = numpy.select([column(self.IS_ENGLISH), isDutch, column(self.IS_BUY)], [column(self.ENGLISH), dutch, buyNowPrice], default=0)
+        prices = numpy.broadcast_to(prices, shape).astype(self.DTYPE)
+        failed = (column(self.IS_ENGLISH) & column(self.ENGLISH_FAILED)) | (isDutch & dutchFailed)
+        prices[numpy.broadcast_to(failed, shape)] = PRICE_UNAVAILABLE
+        return prices
+
+def getDesiredPrices(snapshots, timestamps):
+    return PriceTable(snapshots).getDesiredPrices(timestamps)
+
+# ==============================================================================
+# Price steps between "fromTime" and "toTime" as [(dt, price), ...]: the price is valid from "dt"
+# until the next step; only Dutch auctions have more than one step
+def getPriceLadder(snapshot, fromTime: int, toTime: int):
+
+    snapshot = _getSnapshot(snapshot)
+    times    = [fromTime]
+    if snapshot.auctionType == AUCTION_DUTCH_FORWARD and snapshot.dutchCycle > 0:
+        first  = max(fromTime, snapshot.dtStart)
+        times  = [first] + list(range(snapshot.dtStart + ((first - snapshot.dtStart) // snapshot.dutchCycle + 1) * snapshot.dutchCycle, toTime + 1, snapshot.dutchCycle))
+
+    result = []
+    for dt in times:
+        price = getDesiredPrice(snapshot, dt)
+        if price != PRICE_UNAVAILABLE and (not result or result[-1][1] != price):
+            result.append((dt, price))
+    return result
+
+# ==============================================================================
+#
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+
+# ==============================================================================
+# Blind auction commit/reveal scheduler:
+# secrets are written to SQLite before "bidBlind" is sent, "revealBidBlind" and "finalize"
+# are fired from a hashed timer wheel at dtEnd/dtRevealEnd, pending work is resumed after restart;
+#
+import math
+import sqlite3
+import threading
+import time
+import freeton_utils
+from   freeton_utils import *
+from   freeton_events import BidReceived, getAuctionEvents
+
+# ==============================================================================
+# Hashed timer wheel: one thread advances the wheel every "tick" seconds of "clock",
+# due callbacks are handed over to an executor so that slow network calls never delay the wheel;
+# a clock that jumps ahead (see freeton_utils.getChainClock) makes the wheel catch up tick by tick without sleeping;
+class TimerWheel(object):
+    def __init__(self, tick: float = 1.0, slotsCount: int = 512, maxWorkers: int = PIPELINE_WORKERS, clock = time.time):
+        self.TICK       = tick
+        self.CLOCK      = clock
+        self.SLOTS      = [[] for _ in range(slotsCount)]
+        self.START      = clock()
+        self.CURRENT    = 0 # last processed tick
+        self.LOCK       = threading.Lock()
+        self.STOP       = threading.Event()
+        self.EXECUTOR   = ThreadPoolExecutor(max_workers=maxWorkers)
+        self.THREAD     = threading.Thread(target=self._run, name="TimerWheel", daemon=True)
+        self.THREAD.start()
+
+    # "when" is a unix timestamp
+    def schedule(self, when: float, callback, *args):
+        tickNumber = math.ceil((when - self.START) / self.TICK)
+        with self.LOCK:
+            if tickNumber > self.CURRENT:
+                self.SLOTS[tickNumber % len(self.SLOTS)].append((tickNumber, callback, args))
+                return
+        self.EXECUTOR.submit(callback, *args)
+
+    def getPendingCount(self):
+        with self.LOCK:
+            return sum(len(slot) for slot in self.SLOTS)
+
+    def _run(self):
+        while not self.STOP.wait(max(0, self.START + (self.CURRENT + 1) * self.TICK - self.CLOCK())):
+            with self.LOCK:
+                self.CURRENT += 1
+                index   = self.CURRENT % len(self.SLOTS)
+                due     = [entry for entry in self.SLOTS[index] if entry[0] <= self.CURRENT]
+                self.SLOTS[index] = [entry for entry in self.SLOTS[index] if entry[0] > self.CURRENT]
+            for (_, callback, args) in due:
+                self.EXECUTOR.submit(callback, *args)
+
+    def stop(self):
+        self.STOP.set()
+        self.THREAD.join()
+        self.EXECUTOR.shutdown(wait=True)
+
+# ==============================================================================
+# Durable storage of blind bid secrets and of the auctions that still need "finalize";
+# every write is committed right away (WAL, synchronous=FULL);
+class SecretStore(object):
+    def __init__(self, path: str):
+        self.LOCK = threading.Lock()
+        self.DB   = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.DB.execute("PRAGMA journal_mode=WAL")
+        self.DB.execute("PRAGMA synchronous=FULL")
+        self.DB.execute("""CREATE TABLE IF NOT EXISTS auctions (
+            auction_address TEXT PRIMARY KEY, abi_path TEXT, dt_end INTEGER, dt_reveal_end INTEGER,
+            finalizer_address TEXT, finalize_value TEXT, finalized INTEGER DEFAULT 0)""")
+        self.DB.execute("""CREATE TABLE IF NOT EXISTS bids (
+            auction_address TEXT, bidder_address TEXT, bid_address TEXT, price TEXT, salt TEXT, price_hash TEXT,
+            reveal_value TEXT, status TEXT, attempts INTEGER DEFAULT 0, error TEXT DEFAULT '',
+            PRIMARY KEY (auction_address, bidder_address))""")
+
+    def _execute(self, query: str, params = ()):
+        with self.LOCK:
+            return self.DB.execute(query, params).fetchall()
+
+    def addAuction(self, auctionAddress: str, abiPath: str, dtEnd: int, dtRevealEnd: int, finalizerAddress: str, finalizeValue: int):
+        self._execute("INSERT OR IGNORE INTO auctions (auction_address, abi_path, dt_end, dt_reveal_end, finalizer_address, finalize_value) VALUES (?, ?, ?, ?, ?, ?)",
+            (auctionAddress, abiPath, dtEnd, dtRevealEnd, finalizerAddress, str(finalizeValue)))
+
+    def addBid(self, auctionAddress: str, bidderAddress: str, bidAddress: str, price: int, salt: str, priceHash: str, revealValue: int):
+        self._execute("INSERT OR REPLACE INTO bids (auction_address, bidder_address, bid_address, price, salt, price_hash, reveal_value, status) VALUES (?, ?, ?, ?, ?, ?, ?, 'new')",
+            (auctionAddress, bidderAddress, bidAddress, str(price), salt, priceHash, str(revealValue)))
+
+    def setBidStatus(self, auctionAddress: str, bidderAddress: str, status: str, error: str = ""):
+        self._execute("UPDATE bids SET status = ?, error = ?, attempts = attempts + 1 WHERE auction_address = ? AND bidder_address = ?", (status, error, auctionAddress, bidderAddress))
+
+    def setAuctionFinalized(self, auctionAddress: str, finalized: int):
+        self._execute("UPDATE auctions SET finalized = ? WHERE auction_address = ?", (finalized, auctionAddress))
+
+    def getBid(self, auctionAddress: str, bidderAddress: str):
+        rows = self._execute("SELECT b.price, b.salt, b.reveal_value, b.status, a.abi_path, a.dt_end, a.dt_reveal_end FROM bids b JOIN auctions a USING (auction_address) WHERE b.auction_address = ? AND b.bidder_address = ?",
+            (auctionAddress, bidderAddress))
+        if not rows:
+            return None
+        (price, salt, revealValue, status, abiPath, dtEnd, dtRevealEnd) = rows[0]
+        return {"price":int(price), "salt":salt, "revealValue":int(revealValue), "status":status, "abiPath":abiPath, "dtEnd":dtEnd, "dtRevealEnd":dtRevealEnd}
+
+    def getAuction(self, auctionAddress: str):
+        rows = self._execute("SELECT abi_path, dt_end, dt_reveal_end, finalizer_address, finalize_value, finalized FROM auctions WHERE auction_address = ?", (auctionAddress,))
+        if not rows:
+            return None
+        (abiPath, dtEnd, dtRevealEnd, finalizerAddress, finalizeValue, finalized) = rows[0]
+        return {"abiPath":abiPath, "dtEnd":dtEnd, "dtRevealEnd":dtRevealEnd, "finalizerAddress":finalizerAddress, "finalizeValue":int(finalizeValue), "finalized":finalized}
+
+    # bids still waiting for their reveal and auctions still waiting for "finalize"
+    def getPendingBids(self):
+        return self._execute("SELECT auction_address, bidder_address FROM bids WHERE status IN ('new', 'committed', 'sent')")
+
+    def getPendingAuctions(self):
+        return [row[0] for row in self._execute("SELECT auction_address FROM auctions WHERE finalized = 0")]
+
+    def close(self):
+        with self.LOCK:
+            self.DB.close()
+
+# ==============================================================================
+# Bid statuses: "new" (secret stored) -> "committed" (bidBlind sent) -> "sent" (revealBidBlind sent) -> "revealed" | "failed";
+# "revealed" means the auction emitted "bidReceived" for the bid, a reveal it bounced (wrong hash, price not above the current one) is "failed";
+# auctions: finalized 0 -> 1 (asset delivered and money sent out) | -1 (gave up);
+# the store keeps no keys: a reveal or finalize whose multisig is not registered waits for "registerMultisig" instead of failing;
+class BlindBidScheduler(object):
+    def __init__(self, storePath: str, wheel: TimerWheel = None, delay: int = 2, retryDelay: int = 5, maxAttempts: int = 5):
+        self.STORE        = SecretStore(storePath)
+        self.WHEEL        = TimerWheel() if wheel is None else wheel
+        self.DELAY        = delay # seconds after dtEnd/dtRevealEnd, blockchain time is a bit behind local clock
+        self.RETRY_DELAY  = retryDelay
+        self.MAX_ATTEMPTS = maxAttempts
+        self.MSIGS        = {}
+        self.DEFERRED     = {} # multisig address -> [(callback, args)] waiting for "registerMultisig"
+        self.FINALIZING   = set()
+        self.CONDITION    = threading.Condition()
+
+    # Multisigs that sign reveals and finalizes, needed again after restart; work deferred for "msig" is scheduled right away
+    def registerMultisig(self, msig: SetcodeMultisig):
+        with self.CONDITION:
+            self.MSIGS[msig.ADDRESS] = msig
+            deferred = self.DEFERRED.pop(msig.ADDRESS, [])
+        for (callback, args) in deferred:
+            self.WHEEL.schedule(self.WHEEL.CLOCK(), callback, *args)
+
+    # Addresses of the multisigs that deferred work is waiting for
+    def getWaitingMultisigs(self):
+        with self.CONDITION:
+            return sorted(self.DEFERRED)
+
+    # "None" means "callback" was parked until "address" is registered
+    def _getMultisigOrDefer(self, address: str, callback, *args):
+        with self.CONDITION:
+            msig = self.MSIGS.get(address)
+            if msig is None:
+                self.DEFERRED.setdefault(address, []).append((callback, args))
+            return msig
+
+    def _notify(self):
+        with self.CONDITION:
+            self.CONDITION.notify_all()
+
+    # ========================================
+    # "auction" is an AuctionDnsRecord wrapper; "revealValue" has to be above "price", the change is returned
+    def commit(self, auction, msig: SetcodeMultisig, price: int, bidValue: int, revealValue: int, finalizeValue: int = TON, salt: str = None):
+        self.registerMultisig(msig)
+        salt      = generateSalt() if salt is None else salt
+        priceHash = getHashFromPrice(price=price, salt=salt)
+        dtEnd     = auction.CONSTRUCTOR["dtEnd"]
+
+        self.STORE.addAuction(auctionAddress=auction.ADDRESS, abiPath=auction.ABI, dtEnd=dtEnd, dtRevealEnd=auction.CONSTRUCTOR["dtRevealEnd"], finalizerAddress=msig.ADDRESS, finalizeValue=finalizeValue)
+        self.STORE.addBid(auctionAddress=auction.ADDRESS, bidderAddress=msig.ADDRESS, bidAddress=auction.calculateBidAddress(msig.ADDRESS),
+            price=price, salt=salt, priceHash=priceHash, revealValue=revealValue)
+
+        result = auction.bidBlind(msig=msig, value=bidValue, priceHash=priceHash)
+        if result[1]["errorCode"] != 0:
+            self.STORE.setBidStatus(auction.ADDRESS, msig.ADDRESS, "failed", str(result[1]))
+            self._notify()
+            return result
+
+        self.STORE.setBidStatus(auction.ADDRESS, msig.ADDRESS, "committed")
+        self.WHEEL.schedule(dtEnd + self.DELAY, self._reveal, auction.ADDRESS, msig.ADDRESS)
+        self._scheduleFinalize(auction.ADDRESS)
+        return result
+
+    # Reschedules everything that was pending when the previous process stopped;
+    # reveals and finalizes go out once their multisigs are registered (see getWaitingMultisigs)
+    def resume(self):
+        for (auctionAddress, bidderAddress) in self.STORE.getPendingBids():
+            bid = self.STORE.getBid(auctionAddress, bidderAddress)
+            if bid["status"] == "sent":
+                self.WHEEL.schedule(self.WHEEL.CLOCK(), self._confirmReveal, auctionAddress, bidderAddress, 1)
+            else:
+                self.WHEEL.schedule(bid["dtEnd"] + self.DELAY, self._reveal, auctionAddress, bidderAddress)
+        for auctionAddress in self.STORE.getPendingAuctions():
+            self._scheduleFinalize(auctionAddress)
+
+    # one "finalize" chain per auction no matter how many bids were committed
+    def _scheduleFinalize(self, auctionAddress: str):
+        with self.CONDITION:
+            if auctionAddress in self.FINALIZING:
+                return
+            self.FINALIZING.add(auctionAddress)
+        auction = self.STORE.getAuction(auctionAddress)
+        self.WHEEL.schedule(auction["dtRevealEnd"] + self.DELAY, self._finalize, auctionAddress, 1)
+
+    # ========================================
+    #
+    def _reveal(self, auctionAddress: str, bidderAddress: str):
+        bid = self.STORE.getBid(auctionAddress, bidderAddress)
+        # "new" bids come from a restart that happened around "bidBlind", revealing a bid that does not exist only costs a bounce
+        if bid is None or bid["status"] not in ("new", "committed"):
+            return
+        msig = self._getMultisigOrDefer(bidderAddress, self._reveal, auctionAddress, bidderAddress)
+        if msig is None:
+            return
+
+        payload = prepareMessageBoc(abiPath=bid["abiPath"], functionName="revealBidBlind", functionParams={"price":bid["price"], "salt":bid["salt"]})
+        result  = msig.callTransfer(addressDest=auctionAddress, value=bid["revealValue"], payload=payload, flags=1)
+        if result[1]["errorCode"] == 0:
+            self.STORE.setBidStatus(auctionAddress, bidderAddress, "sent")
+            self._confirmReveal(auctionAddress, bidderAddress, 1)
+            return
+
+        if isRetryableError(result[1]) and self.WHEEL.CLOCK() + self.RETRY_DELAY < bid["dtRevealEnd"]:
+            self.STORE.setBidStatus(auctionAddress, bidderAddress, "committed", str(result[1]))
+            self.WHEEL.schedule(self.WHEEL.CLOCK() + self.RETRY_DELAY, self._reveal, auctionAddress, bidderAddress)
+        else:
+            self.STORE.setBidStatus(auctionAddress, bidderAddress, "failed", str(result[1]))
+        self._notify()
+
+    # the multisig transaction only says that the reveal left; the auction's answer arrives a few messages later
+    def _confirmReveal(self, auctionAddress: str, bidderAddress: str, attempt: int):
+        bid = self.STORE.getBid(auctionAddress, bidderAddress)
+        if bid is None or bid["status"] != "sent":
+            return
+
+        msig   = self.MSIGS.get(bidderAddress)
+        events = getAuctionEvents(tonClient=getClient() if msig is None else msig.TONCLIENT, auctionAddress=auctionAddress, abiFilesArray=[bid["abiPath"]])
+        if any(isinstance(event, BidReceived) and event.bidderAddress == bidderAddress and event.amount == bid["price"] for event in events):
+            self.STORE.setBidStatus(auctionAddress, bidderAddress, "revealed")
+        elif attempt < self.MAX_ATTEMPTS:
+            self.WHEEL.schedule(self.WHEEL.CLOCK() + self.RETRY_DELAY, self._confirmReveal, auctionAddress, bidderAddress, attempt + 1)
+            return
+        else:
+            self.STORE.setBidStatus(auctionAddress, bidderAddress, "failed", "the auction did not accept the reveal (no bidReceived event)")
+        self._notify()
+
+    def _finalize(self, auctionAddress: str, attempt: int):
+        auction = self.STORE.getAuction(auctionAddress)
+        if auction["finalized"] != 0:
+            return
+        msig = self._getMultisigOrDefer(auction["finalizerAddress"], self._finalize, auctionAddress, attempt)
+        if msig is None:
+            return
+
+        payload = prepareMessageBoc(abiPath=auction["abiPath"], functionName="finalize", functionParams={})
+        msig.callTransfer(addressDest=auctionAddress, value=auction["finalizeValue"], payload=payload, flags=1)
+        info    = runFunction(tonClient=msig.TONCLIENT, abiPath=auction["abiPath"], contractAddress=auctionAddress, functionName="getInfo", functionParams={})
+        if info != "" and info["assetDelivered"] and info["moneySentOut"]:
+            self.STORE.setAuctionFinalized(auctionAddress, 1)
+            self._notify()
+            return
+
+        # finalizing may take more than one call (asset delivery is confirmed asynchronously)
+        if attempt < self.MAX_ATTEMPTS:
+            self.WHEEL.schedule(self.WHEEL.CLOCK() + self.RETRY_DELAY, self._finalize, auctionAddress, attempt + 1)
+        else:
+            self.STORE.setAuctionFinalized(auctionAddress, -1)
+            self._notify()
+
+    # ========================================
+    # Blocks until every bid and auction of "auctionAddresses" (all by default) is settled,
+    # "revealsOnly" leaves pending "finalize" out
+    def wait(self, auctionAddresses = None, timeout: float = None, revealsOnly: bool = False):
+        def _isSettled():
+            pendingBids     = [row[0] for row in self.STORE.getPendingBids()]
+            pendingAuctions = [] if revealsOnly else self.STORE.getPendingAuctions()
+            return not any(address in pendingBids or address in pendingAuctions for address in (auctionAddresses or pendingBids + pendingAuctions))
+
+        with self.CONDITION:
+            return self.CONDITION.wait_for(_isSettled, timeout=timeout)
+
+    def getBid(self, auctionAddress: str, bidderAddress: str):
+        return self.STORE.getBid(auctionAddress, bidderAddress)
+
+    def getAuction(self, auctionAddress: str):
+        return self.STORE.getAuction(auctionAddress)
+
+    def stop(self):
+        self.WHEEL.stop()
+        self.STORE.close()
+
+# ==============================================================================
+#
@@ -0,0 +1,614 @@
+#!/usr/bin/env python3
+
+# ==============================================================================
+# Deterministic in-process model of AuctionDnsRecord, AuctionBid and DnsRecord for offline backtesting;
+# messages are processed in order on a virtual clock, "require" failures roll the transaction back
+# with the contract exit code (200-212 etc.) and bounce the value if the message asked for it,
+# rawReserve/flags 0, 1, 64, 128, +32 follow the action phase so balances move like on chain;
+# gas and forward fees are flat and zero by default, TVM cells and signatures are not modelled;
+#
+import hashlib
+from   collections     import deque
+from   operator        import attrgetter
+from   freeton_boc     import CellBuilder
+from   freeton_pricing import AUCTION_ENGLISH_FORWARD, AUCTION_ENGLISH_BLIND, AUCTION_DUTCH_FORWARD, AUCTION_PUBLIC_BUY, AUCTION_PRIVATE_BUY, \
+                              UINT128_MAX, PRICE_UNAVAILABLE, PriceSnapshot, getDesiredPrice
+
+# ==============================================================================
+#
+ZERO_ADDRESS  = "0:0000000000000000000000000000000000000000000000000000000000000000"
+GAS_PRICE     = 1000               # nanotons per gas unit in workchain 0
+MIN_BALANCE   = 10000 * GAS_PRICE  # gasToValue(10000), what "_reserve()" keeps
+AUCTION_TYPES = 5                  # AUCTION_TYPE.NUM
+
+EXIT_OK                  = 0
+EXIT_INTEGER_OVERFLOW    = 4
+EXIT_CONSTRUCTOR_CALLED  = 51
+EXIT_WRONG_FUNCTION      = 60
+ACTION_NOT_ENOUGH_FUNDS  = 37
+EXIT_NO_ACCOUNT          = -1     # destination has no code, compute phase skipped
+
+# AuctionDnsRecord / AuctionBid / DnsRecord "require" codes, same numbers as freeton_errors.AuctionError
+ERROR_MESSAGE_SENDER_IS_NOT_MY_OWNER = 100
+ERROR_MESSAGE_SENDER_IS_NOT_MY_BID   = 101
+ERROR_AUCTION_NOT_RUNNING            = 200
+ERROR_AUCTION_ENDED                  = 201
+ERROR_AUCTION_IN_PROCESS             = 203
+ERROR_PRICE_REVEAL_IN_PROCESS        = 204
+ERROR_NOT_ENOUGH_MONEY               = 205
+ERROR_DO_NOT_BEAT_YOURSELF           = 206
+ERROR_MESSAGE_SENDER_IS_NOT_SELLER   = 207
+ERROR_MESSAGE_SENDER_IS_NOT_ASSET    = 208
+ERROR_INVALID_AUCTION_TYPE           = 209
+ERROR_INVALID_BUYER_ADDRESS          = 210
+ERROR_INVALID_END_DATE               = 212
+ERROR_BID_NOT_ENOUGH_MONEY           = 200 # AuctionBid has its own numbering
+
+# Actions
+ACTION_RESERVE = 0
+ACTION_SEND    = 1
+ACTION_EMIT    = 2
+
+# Message fields, messages are plain tuples for speed
+(M_SRC, M_DST, M_VALUE, M_BOUNCE, M_BOUNCED, M_FUNCTION, M_ARGS, M_CALLBACK, M_INIT) = range(9)
+
+# ==============================================================================
+#
+class SimulatedError(Exception):
+    def __init__(self, exitCode: int):
+        super().__init__("Contract exited with code {}".format(exitCode))
+        self.exitCode = exitCode
+
+def require(condition, exitCode: int):
+    if not condition:
+        raise SimulatedError(exitCode)
+
+def getPriceHash(price: int, salt: int):
+    return int(CellBuilder().storeUint(price, 128).storeUint(salt, 256).endCell().getHashHex(), 16)
+
+def _toInt(value):
+    return value if isinstance(value, int) else int(str(value), 0)
+
+# ==============================================================================
+#
+class VirtualClock(object):
+    def __init__(self, now: int = 0):
+        self.now = now
+
+    def advance(self, seconds: int):
+        self.now += seconds
+        return self.now
+
+    def set(self, now: int):
+        self.now = now
+        return self.now
+
+class SimTransaction(object):
+    __slots__ = ("now", "address", "src", "function", "value", "exitCode", "bounced", "aborted")
+
+    def __init__(self, now, address, src, function, value, exitCode, bounced, aborted):
+        (self.now, self.address, self.src, self.function, self.value, self.exitCode, self.bounced, self.aborted) = (now, address, src, function, value, exitCode, bounced, aborted)
+
+    def __repr__(self):
+        return "SimTransaction(now={}, {} -> {}.{}, value={}, exitCode={}{})".format(self.now, self.src, self.address, self.function, self.value, self.exitCode,
+            ", bounced" if self.bounced else "")
+
+# ==============================================================================
+# Account without code (uninit or a wallet that accepts everything)
+class SimAccount(object):
+    HAS_CODE  = False
+    FUNCTIONS = frozenset()
+    STATE     = ()
+
+    def __init__(self, network, address: str, balance: int = 0):
+        self.NET     = network
+        self.ADDRESS = address
+        self.balance = balance
+
+    def __repr__(self):
+        return "{}({}, balance={})".format(self.__class__.__name__, self.ADDRESS, self.balance)
+
+class SimWallet(SimAccount):
+    pass
+
+# ==============================================================================
+# Handlers read MSG_SENDER/MSG_VALUE/NOW and queue actions, the network applies them after the handler returns;
+# every name in FUNCTIONS is callable by an internal message, STATE lists what is rolled back on failure
+class SimContract(SimAccount):
+    HAS_CODE = True
+
+    def __init__(self, network, address: str, balance: int = 0):
+        super().__init__(network, address, balance)
+        self.ACTIONS         = []
+        self.MSG_SENDER      = ZERO_ADDRESS
+        self.MSG_VALUE       = 0
+        self.MSG_CALLBACK    = None
+        self.NOW             = 0
+        self.constructorDone = False
+
+    def _getState(self):
+        return self._STATE_GETTER(self) if self.STATE else ()
+
+    def _setState(self, state):
+        for (name, value) in zip(self.STATE, state):
+            setattr(self, name, value)
+
+    def onBounce(self, function: str):
+        pass
+
+    # ========================================
+    #
+    def _reserve(self, amount: int = MIN_BALANCE):
+        self.ACTIONS.append((ACTION_RESERVE, amount))
+
+    def _transfer(self, dst: str, value: int, bounce: bool, flag: int):
+        self.ACTIONS.append((ACTION_SEND, (self.ADDRESS, dst, value, bounce, False, None, None, None, None), flag))
+
+    def _call(self, dst: str, function: str, value: int, flag: int, bounce: bool = True, callback: str = None, init = None, **args):
+        self.ACTIONS.append((ACTION_SEND, (self.ADDRESS, dst, value, bounce, False, function, args, callback, init), flag))
+
+    # "return {value, flag, bounce}(...)" of a responsible function
+    def _respond(self, value: int, flag: int, bounce: bool = True, **args):
+        self._call(self.MSG_SENDER, self.MSG_CALLBACK, value, flag, bounce=bounce, **args)
+
+    def _emit(self, name: str, **values):
+        self.ACTIONS.append((ACTION_EMIT, name, values))
+
+def _withStateGetter(cls):
+    cls._STATE_GETTER = attrgetter(*cls.STATE) if len(cls.STATE) > 1 else staticmethod(lambda account: (getattr(account, cls.STATE[0]),))
+    return cls
+
+# ==============================================================================
+# DnsRecord: only ownership matters to the auction
+@_withStateGetter
+class SimDnsRecord(SimContract):
+    FUNCTIONS = frozenset(["changeOwner", "callWhois"])
+    STATE     = ("ownerAddress",)
+
+    def __init__(self, network, address: str, ownerAddress: str, domainName: str = "", balance: int = 0):
+        super().__init__(network, address, balance)
+        self.ownerAddress = ownerAddress
+        self.domainName   = domainName
+
+    def changeOwner(self, newOwnerAddress: str):
+        require(self.ownerAddress != ZERO_ADDRESS and self.ownerAddress == self.MSG_SENDER, ERROR_MESSAGE_SENDER_IS_NOT_MY_OWNER)
+        self._reserve()
+        self.ownerAddress = newOwnerAddress
+        self._transfer(self.MSG_SENDER, 0, True, 128)
+
+    def callWhois(self):
+        self._reserve()
+        self._respond(0, 128, whois=self.getWhois())
+
+    def getWhois(self):
+        return {"ownerAddress":self.ownerAddress, "domainName":self.domainName}
+
+# ==============================================================================
+#
+@_withStateGetter
+class SimAuctionBid(SimContract):
+    FUNCTIONS = frozenset(["constructor", "setPriceHash", "revealPriceHash"])
+    STATE     = ("feeValue", "priceHash", "dt", "constructorDone")
+
+    def __init__(self, network, address: str, auctionAddress: str, bidderAddress: str):
+        super().__init__(network, address)
+        self.auctionAddress = auctionAddress
+        self.bidderAddress  = bidderAddress
+        self.feeValue       = 0
+        self.priceHash      = 0
+        self.dt             = 0
+
+    def _onlyAuction(self):
+        require(self.MSG_SENDER == self.auctionAddress, ERROR_MESSAGE_SENDER_IS_NOT_MY_OWNER)
+
+    def constructor(self, feeValue: int):
+        require(not self.constructorDone, EXIT_CONSTRUCTOR_CALLED)
+        self._onlyAuction()
+        self._reserve()
+        self.constructorDone = True
+        self.feeValue        = feeValue
+        self.dt              = self.NOW
+        self._transfer(self.bidderAddress, 0, True, 128)
+
+    def setPriceHash(self, priceHash: int):
+        self._onlyAuction()
+        self._reserve()
+        require(self.balance > self.feeValue, ERROR_BID_NOT_ENOUGH_MONEY)
+        self.priceHash = priceHash
+        self._transfer(self.bidderAddress, 0, True, 128)
+
+    def revealPriceHash(self, price: int, salt: int):
+        self._onlyAuction()
+        newHash = getPriceHash(price, salt)
+        if newHash != self.priceHash:
+            self._reserve()
+        self._respond(0, 128 + 32 if newHash == self.priceHash else 128, bounce=False,
+            revealedPrice=price, revealedSalt=salt, revealedHash=newHash, actualHash=self.priceHash, bidderAddress=self.bidderAddress)
+
+    def getInfo(self):
+        return {"auctionAddress":self.auctionAddress, "bidderAddress":self.bidderAddress, "feeValue":self.feeValue, "priceHash":self.priceHash, "dt":self.dt}
+
+# ==============================================================================
+# Mirrors IAuction.sol + AuctionDnsRecord.sol, including their quirks (e.g. an English auction ended by time
+# goes through the "no bids" branch of "finalize": the asset still goes to the buyer, the whole balance to the seller)
+@_withStateGetter
+class SimAuctionDnsRecord(SimContract):
+    FUNCTIONS = frozenset(["bid", "bidBlind", "revealBidBlind", "callbackRevealBidBlind", "finalize", "cancelAuction",
+                           "receiveAsset", "callbackOnReceiveAsset", "callbackOnCheckAssetDelivered"])
+    STATE     = ("assetReceived", "auctionStarted", "auctionSucceeded", "moneySentOut", "assetDelivered",
+                 "currentBuyer", "currentBuyPrice", "currentBuyDT", "currentBlindBets")
+
+    def __init__(self, network, address: str, sellerAddress: str, assetAddress: str, auctionType: int, dtStart: int, escrowAddress: str, escrowPercent: int,
+                 feeValue: int, minBid: int, minPriceStep: int, buyNowPrice: int, dtEnd: int, dtRevealEnd: int, dutchCycle: int,
+                 buyerAddress: str = ZERO_ADDRESS, balance: int = 0):
+        super().__init__(network, address, balance)
+        require(dtStart < dtEnd, ERROR_INVALID_END_DATE)
+        # "_dtEnd <= now + 60 days" is checked before "_dtEnd" is assigned, so it always passes on chain too
+        if auctionType == AUCTION_ENGLISH_BLIND:
+            require(dtEnd < dtRevealEnd, ERROR_INVALID_END_DATE)
+
+        self.escrowAddress    = escrowAddress
+        self.escrowPercent    = escrowPercent
+        self.sellerAddress    = sellerAddress
+        self.buyerAddress     = buyerAddress
+        self.assetAddress     = assetAddress
+        self.auctionType      = auctionType
+        self.feeValue         = feeValue
+        self.minBid           = minBid
+        self.minPriceStep     = minPriceStep
+        self.buyNowPrice      = buyNowPrice
+        self.dtStart          = dtStart
+        self.dtEnd            = dtEnd
+        self.dtRevealEnd      = dtRevealEnd
+        self.dutchCycle       = dutchCycle
+        self.assetReceived    = False
+        self.auctionStarted   = False
+        self.auctionSucceeded = False
+        self.moneySentOut     = False
+        self.assetDelivered   = False
+        self.currentBuyer     = ZERO_ADDRESS
+        self.currentBuyPrice  = 0
+        self.currentBuyDT     = 0
+        self.currentBlindBets = 0
+        self.BID_ADDRESSES    = {}
+
+    # ========================================
+    # Bid addresses are synthetic (no bid code), stable for the same auction and bidder
+    def calculateBidAddress(self, bidderAddress: str):
+        address = self.BID_ADDRESSES.get(bidderAddress)
+        if address is None:
+            address = "0:" + hashlib.sha256((self.ADDRESS + bidderAddress).encode()).hexdigest()
+            self.BID_ADDRESSES[bidderAddress] = address
+        return address
+
+    def getDesiredPrice(self, now: int = None):
+        snapshot = PriceSnapshot(self.auctionType, self.minBid, self.minPriceStep, self.buyNowPrice, self.dtStart, self.dutchCycle, self.currentBuyPrice)
+        price    = getDesiredPrice(snapshot, self.NOW if now is None else now)
+        require(price != PRICE_UNAVAILABLE, EXIT_INTEGER_OVERFLOW)
+        return price
+
+    # Same shape as the decoded "getInfo", freeton_models.AuctionInfo.fromDecoded accepts it
+    def getInfo(self):
+        return {"escrowAddress":self.escrowAddress, "escrowPercent":self.escrowPercent, "sellerAddress":self.sellerAddress, "buyerAddress":self.buyerAddress,
+            "assetAddress":self.assetAddress, "auctionType":self.auctionType, "minBid":self.minBid, "minPriceStep":self.minPriceStep, "buyNowPrice":self.buyNowPrice,
+            "dtStart":self.dtStart, "dtEnd":self.dtEnd, "dtRevealEnd":self.dtRevealEnd, "dutchCycle":self.dutchCycle,
+            "assetReceived":self.assetReceived, "auctionStarted":self.auctionStarted, "auctionSucceeded":self.auctionSucceeded,
+            "moneySentOut":self.moneySentOut, "assetDelivered":self.assetDelivered,
+            "currentBuyer":self.currentBuyer, "currentBuyPrice":self.currentBuyPrice, "currentBuyDT":self.currentBuyDT, "currentBlindBets":self.currentBlindBets}
+
+    def _onlySeller(self):
+        require(self.sellerAddress != ZERO_ADDRESS and self.sellerAddress == self.MSG_SENDER, ERROR_MESSAGE_SENDER_IS_NOT_SELLER)
+
+    def _onlyAsset(self):
+        require(self.assetAddress != ZERO_ADDRESS and self.assetAddress == self.MSG_SENDER, ERROR_MESSAGE_SENDER_IS_NOT_ASSET)
+
+    # ========================================
+    #
+    def bid(self):
+        require(self.auctionType <  AUCTION_TYPES,         ERROR_INVALID_AUCTION_TYPE)
+        require(self.auctionType != AUCTION_ENGLISH_BLIND, ERROR_INVALID_AUCTION_TYPE)
+        if self.auctionType == AUCTION_PRIVATE_BUY:
+            require(self.MSG_SENDER == self.buyerAddress and self.buyerAddress != ZERO_ADDRESS, ERROR_INVALID_BUYER_ADDRESS)
+
+        (now, value) = (self.NOW, self.MSG_VALUE)
+        desiredPrice = self.getDesiredPrice()
+        require(now >= self.dtStart and now <= self.dtEnd,   ERROR_AUCTION_NOT_RUNNING)
+        require(self.auctionStarted,                         ERROR_AUCTION_NOT_RUNNING)
+        require(not self.auctionSucceeded,                   ERROR_AUCTION_ENDED)
+        require(self.MSG_SENDER != self.currentBuyer,        ERROR_DO_NOT_BEAT_YOURSELF)
+        require(desiredPrice + self.feeValue <= UINT128_MAX, EXIT_INTEGER_OVERFLOW)
+        require(value >= desiredPrice + self.feeValue,       ERROR_NOT_ENOUGH_MONEY)
+        self._reserve()
+
+        if self.auctionType == AUCTION_ENGLISH_FORWARD:
+            if self.buyNowPrice == 0 or value - self.feeValue < self.buyNowPrice:
+                self._reserve(value - self.feeValue)
+            else:
+                self._reserve(self.buyNowPrice)
+                self.auctionSucceeded = True
+            if self.currentBuyer != ZERO_ADDRESS:
+                self._transfer(self.currentBuyer, self.currentBuyPrice, True, 0)
+            self._emit("bidReceived", bidderAddress=self.MSG_SENDER, amount=value - self.feeValue)
+            (self.currentBuyer, self.currentBuyPrice, self.currentBuyDT) = (self.MSG_SENDER, value - self.feeValue, now)
+        else:
+            self._reserve(desiredPrice)
+            self.auctionSucceeded = True
+            self._emit("bidReceived", bidderAddress=self.MSG_SENDER, amount=desiredPrice)
+            (self.currentBuyer, self.currentBuyPrice, self.currentBuyDT) = (self.MSG_SENDER, desiredPrice, now)
+
+        self._transfer(self.MSG_SENDER, 0, True, 128)
+
+    def bidBlind(self, priceHash: int):
+        now = self.NOW
+        require(self.auctionType == AUCTION_ENGLISH_BLIND,   ERROR_INVALID_AUCTION_TYPE)
+        require(self.MSG_VALUE > self.feeValue,              ERROR_NOT_ENOUGH_MONEY)
+        require(now >= self.dtStart and now <= self.dtEnd,   ERROR_AUCTION_NOT_RUNNING)
+        require(self.auctionStarted,                         ERROR_AUCTION_NOT_RUNNING)
+        require(not self.auctionSucceeded,                   ERROR_AUCTION_ENDED)
+
+        (bidder, bidAddress) = (self.MSG_SENDER, self.calculateBidAddress(self.MSG_SENDER))
+        init = lambda network, address: SimAuctionBid(network, address, self.ADDRESS, bidder)
+        self._call(bidAddress, "constructor", self.MSG_VALUE // 2, 0, bounce=False, init=init, feeValue=self.feeValue)
+        self._call(bidAddress, "setPriceHash", 0, 128, priceHash=_toInt(priceHash))
+        self.currentBlindBets += 1
+
+    def revealBidBlind(self, price: int, salt: int):
+        now = self.NOW
+        require(now >= self.dtEnd and now <= self.dtRevealEnd, ERROR_AUCTION_NOT_RUNNING)
+        require(self.MSG_VALUE > price,                        ERROR_NOT_ENOUGH_MONEY)
+        self._reserve()
+        if self.currentBuyPrice > 0:
+            self._reserve(self.currentBuyPrice)
+        self._call(self.calculateBidAddress(self.MSG_SENDER), "revealPriceHash", 0, 128, callback="callbackRevealBidBlind", price=price, salt=_toInt(salt))
+
+    def callbackRevealBidBlind(self, revealedPrice: int, revealedSalt: int, revealedHash: int, actualHash: int, bidderAddress: str):
+        require(self.MSG_SENDER == self.calculateBidAddress(bidderAddress), ERROR_MESSAGE_SENDER_IS_NOT_MY_BID)
+        self._reserve()
+        if revealedHash != actualHash or revealedPrice <= self.currentBuyPrice:
+            self._reserve(self.currentBuyPrice)
+            self._transfer(bidderAddress, 0, True, 128)
+            return
+
+        if self.currentBuyer != ZERO_ADDRESS:
+            self._transfer(self.currentBuyer, self.currentBuyPrice, True, 0)
+        self._emit("bidReceived", bidderAddress=bidderAddress, amount=revealedPrice)
+        (self.currentBuyer, self.currentBuyPrice, self.currentBuyDT) = (bidderAddress, revealedPrice, self.NOW)
+        self._reserve(self.currentBuyPrice)
+        self._transfer(bidderAddress, 0, True, 128)
+
+    def cancelAuction(self):
+        self._onlySeller()
+        require(self.currentBuyer == ZERO_ADDRESS and self.currentBlindBets == 0, ERROR_AUCTION_IN_PROCESS)
+        self._reserve()
+        self.auctionSucceeded = True
+        self._emit("auctionCancelled")
+        self._transfer(self.MSG_SENDER, 0, True, 128)
+
+    # ========================================
+    #
+    def _sendOutTheMoney(self):
+        if self.moneySentOut:
+            return
+        escrowFees = self.currentBuyPrice // 10000 * self.escrowPercent
+        self._transfer(self.sellerAddress, self.currentBuyPrice - escrowFees, True, 0)
+        self._transfer(self.escrowAddress, escrowFees, True, 1)
+        self.moneySentOut = True
+
+    def finalize(self):
+        require(self.NOW >= self.dtEnd or self.auctionSucceeded, ERROR_AUCTION_IN_PROCESS)
+        require(self.MSG_VALUE >= self.feeValue,                 ERROR_NOT_ENOUGH_MONEY)
+        if self.auctionType == AUCTION_ENGLISH_BLIND:
+            require(self.NOW >= self.dtRevealEnd, ERROR_PRICE_REVEAL_IN_PROCESS)
+        self._reserve()
+
+        if not self.assetReceived:
+            self._transfer(self.MSG_SENDER, 0, True, 128)
+            return
+        if self.currentBuyer == ZERO_ADDRESS or not self.auctionSucceeded:
+            self.moneySentOut = True
+            self._checkAssetDelivered()
+            return
+
+        self._sendOutTheMoney()
+        if not self.assetDelivered:
+            self._checkAssetDelivered()
+        elif self.moneySentOut:
+            self._transfer(self.MSG_SENDER, 0, True, 128)
+
+    def _deliverAsset(self, receiver: str):
+        if self.assetDelivered:
+            return
+        self._call(self.assetAddress, "changeOwner", 0, 128, newOwnerAddress=receiver)
+
+    def _checkAssetDelivered(self):
+        self._reserve()
+        if self.assetDelivered:
+            return
+        self._call(self.assetAddress, "callWhois", 0, 128, callback="callbackOnCheckAssetDelivered")
+
+    def callbackOnCheckAssetDelivered(self, whois: dict):
+        self._onlyAsset()
+        self._reserve()
+        desiredOwner        = self.sellerAddress if self.currentBuyer == ZERO_ADDRESS else self.currentBuyer
+        self.assetDelivered = (whois["ownerAddress"] == desiredOwner)
+        if self.assetDelivered:
+            self._transfer(self.sellerAddress, 0, True, 128)
+        else:
+            self._deliverAsset(desiredOwner)
+
+    def receiveAsset(self):
+        self._onlySeller()
+        self._reserve()
+        self._call(self.assetAddress, "callWhois", 0, 128, callback="callbackOnReceiveAsset")
+
+    def callbackOnReceiveAsset(self, whois: dict):
+        self._onlyAsset()
+        self._reserve()
+        self.assetReceived  = (whois["ownerAddress"] == self.ADDRESS)
+        self.auctionStarted = (whois["ownerAddress"] == self.ADDRESS)
+        self._transfer(self.sellerAddress, 0, True, 128)
+
+# ==============================================================================
+# Usage:
+#     network = SimulatedNetwork(VirtualClock(now=1600000000))
+#     seller  = network.addWallet(100 * TON)
+#     asset   = network.addDnsRecord(ownerAddress=seller.ADDRESS, domainName="kek")
+#     auction = network.addAuction(seller.ADDRESS, asset.ADDRESS, AUCTION_ENGLISH_FORWARD, dtStart=..., dtEnd=..., ...)
+#     network.send(seller.ADDRESS, asset.ADDRESS, "changeOwner", TON, newOwnerAddress=auction.ADDRESS)
+#     network.send(seller.ADDRESS, auction.ADDRESS, "receiveAsset", TON)
+#     exitCode = network.send(bidder.ADDRESS, auction.ADDRESS, "bid", 5 * TON)
+#
+class SimulatedNetwork(object):
+    def __init__(self, clock: VirtualClock = None, gasFee: int = 0, fwdFee: int = 0, recordEvents: bool = True, trace: bool = False):
+        self.CLOCK        = VirtualClock() if clock is None else clock
+        self.GAS_FEE      = gasFee
+        self.FWD_FEE      = fwdFee
+        self.ACCOUNTS     = {}
+        self.QUEUE        = deque()
+        self.EVENTS       = [] if recordEvents else None # (now, address, name, values)
+        self.TRANSACTIONS = [] if trace        else None
+        self.COUNTER      = 0
+
+    def _getNewAddress(self):
+        self.COUNTER += 1
+        return "0:{:064x}".format(self.COUNTER)
+
+    def _addAccount(self, account):
+        self.ACCOUNTS[account.ADDRESS] = account
+        return account
+
+    def addWallet(self, balance: int = 0, address: str = None):
+        return self._addAccount(SimWallet(self, self._getNewAddress() if address is None else address, balance))
+
+    def addDnsRecord(self, ownerAddress: str, domainName: str = "", balance: int = MIN_BALANCE, address: str = None):
+        return self._addAccount(SimDnsRecord(self, self._getNewAddress() if address is None else address, ownerAddress, domainName, balance))
+
+    # Raises SimulatedError(212) like a failed deploy
+    def addAuction(self, sellerAddress: str, assetAddress: str, auctionType: int, dtStart: int, dtEnd: int, escrowAddress: str = ZERO_ADDRESS, escrowPercent: int = 0,
+                   feeValue: int = 0, minBid: int = 0, minPriceStep: int = 0, buyNowPrice: int = 0, dtRevealEnd: int = 0, dutchCycle: int = 0,
+                   buyerAddress: str = ZERO_ADDRESS, balance: int = MIN_BALANCE, address: str = None):
+        auction = SimAuctionDnsRecord(self, self._getNewAddress() if address is None else address, sellerAddress=sellerAddress, assetAddress=assetAddress,
+            auctionType=auctionType, dtStart=dtStart, escrowAddress=escrowAddress, escrowPercent=escrowPercent, feeValue=feeValue, minBid=minBid,
+            minPriceStep=minPriceStep, buyNowPrice=buyNowPrice, dtEnd=dtEnd, dtRevealEnd=dtRevealEnd, dutchCycle=dutchCycle, buyerAddress=buyerAddress, balance=balance)
+        return self._addAccount(auction)
+
+    def getAccount(self, address: str):
+        return self.ACCOUNTS.get(address)
+
+    def getBalance(self, address: str):
+        account = self.ACCOUNTS.get(address)
+        return 0 if account is None else account.balance
+
+    def advance(self, seconds: int):
+        return self.CLOCK.advance(seconds)
+
+    # ========================================
+    # Message from a wallet, processed together with everything it causes;
+    # "bounce" defaults to False like SetcodeMultisig.callTransfer, returns the exit code of the first transaction
+    def send(self, src: str, dst: str, function: str = None, value: int = 0, bounce: bool = False, flag: int = 1, **args):
+        wallet = self.ACCOUNTS[src]
+        cost   = value + (self.FWD_FEE if flag & 1 else 0)
+        if cost > wallet.balance:
+            return ACTION_NOT_ENOUGH_FUNDS
+        wallet.balance -= cost
+
+        exitCode = self._execute((src, dst, value - (0 if flag & 1 else self.FWD_FEE), bounce, False, function, args, None, None))
+        self.run()
+        return exitCode
+
+    def run(self):
+        queue = self.QUEUE
+        while queue:
+            self._execute(queue.popleft())
+
+    # Returns False when nothing is left to send back
+    def _bounce(self, message, value: int):
+        if value <= self.FWD_FEE:
+            return False
+        self.QUEUE.append((message[M_DST], message[M_SRC], value - self.FWD_FEE, False, True, message[M_FUNCTION], None, None, None))
+        return True
+
+    def _record(self, account, message, exitCode: int, aborted: bool):
+        if self.TRANSACTIONS is not None:
+            self.TRANSACTIONS.append(SimTransaction(self.CLOCK.now, message[M_DST], message[M_SRC], message[M_FUNCTION], message[M_VALUE], exitCode,
+                message[M_BOUNCED], aborted))
+
+    def _execute(self, message):
+        (src, dst, value, bounce, bounced, function, args, callback, init) = message
+        account = self.ACCOUNTS.get(dst)
+        if account is None and init is not None:
+            account = self.ACCOUNTS[dst] = init(self, dst)
+        if account is None:
+            if not (bounce and not bounced and self._bounce(message, value)):
+                self.ACCOUNTS[dst] = SimAccount(self, dst, value)
+            self._record(None, message, EXIT_NO_ACCOUNT, bounce)
+            return EXIT_NO_ACCOUNT
+
+        account.balance += value
+        if not account.HAS_CODE or (function is None and not bounced):
+            self._record(account, message, EXIT_OK, False)
+            return EXIT_OK
+
+        gas             = min(self.GAS_FEE, account.balance)
+        account.balance -= gas
+        state           = account._getState()
+        account.ACTIONS = []
+        (account.MSG_SENDER, account.MSG_VALUE, account.MSG_CALLBACK, account.NOW) = (src, value, callback, self.CLOCK.now)
+        try:
+            if bounced:
+                account.onBounce(function)
+            else:
+                require(function in account.FUNCTIONS, EXIT_WRONG_FUNCTION)
+                getattr(account, function)(**args)
+            exitCode = self._applyActions(account, value - gas)
+        except SimulatedError as error:
+            exitCode = error.exitCode
+
+        if exitCode != EXIT_OK:
+            account._setState(state)
+            if bounce and not bounced and self._bounce(message, value - gas):
+                account.balance -= value - gas
+        self._record(account, message, exitCode, exitCode != EXIT_OK)
+        return exitCode
+
+    # Action phase: everything or nothing
+    def _applyActions(self, account, inboundValue: int):
+        remaining = account.balance
+        reserved  = 0
+        outbound  = []
+        events    = []
+        destroy   = False
+        for action in account.ACTIONS:
+            if action[0] == ACTION_RESERVE:
+                if action[1] > remaining - reserved:
+                    return ACTION_NOT_ENOUGH_FUNDS
+                reserved += action[1]
+            elif action[0] == ACTION_SEND:
+                (message, flag) = (action[1], action[2])
+                value = message[M_VALUE]
+                if flag & 128:
+                    value = remaining - reserved
+                elif flag & 64:
+                    value += inboundValue
+                fee  = self.FWD_FEE if flag & 1 and not flag & 128 else 0
+                if value + fee > remaining - reserved or value < (0 if fee else self.FWD_FEE):
+                    if flag & 2:
+                        continue
+                    return ACTION_NOT_ENOUGH_FUNDS
+                remaining -= value + fee
+                destroy   |= bool(flag & 32)
+                outbound.append(message if value - (0 if fee else self.FWD_FEE) == message[M_VALUE] else
+                    message[:M_VALUE] + (value - (0 if fee else self.FWD_FEE),) + message[M_VALUE + 1:])
+            else:
+                events.append((self.CLOCK.now, account.ADDRESS, action[1], action[2]))
+
+        account.balance = remaining
+        if destroy and remaining == 0:
+            del self.ACCOUNTS[account.ADDRESS]
+        self.QUEUE.extend(outbound)
+        if self.EVENTS is not None:
+            self.EVENTS.extend(events)
+        return EXIT_OK
+
+# ==============================================================================
+#
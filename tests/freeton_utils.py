@@ -10,13 +10,25 @@
 #import logging
 import base64
 import time
+import atexit
+import contextlib
+import threading
+import hashlib
+import os
+import json
+import secrets
+import itertools
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tonclient.client import *
 from tonclient.types  import *
 #from binascii import unhexlify
 #import pathlib
-import ast
 from datetime import datetime
 from pprint import pprint
+from freeton_errors import TonError, AuctionError, classifyError, isRetryableError
+from freeton_boc import CellBuilder, bocToCell, bocToCellCached, getStateInitFromTvc, buildInitialData, buildStateInit, getAddressFromStateInit
+from freeton_local import LocalTonClient, LOCAL_GIVER_ADDRESS, isLocalAddress
 
 # ==============================================================================
 # 
@@ -27,19 +39,162 @@ DIME          =  100000000
 MSIG_GIVER    = ""
 USE_GIVER     = True
 THROW         = False
+USE_BOC_CACHE = False
+SERVER_ADDRESS = ""
+
+# ==============================================================================
+# Shared TonClient contexts, one per network config and mode (sync/async);
+# by default SERVER_ADDRESS is used, "" is an offline context (abi/boc/crypto only),
+# "local://<name>" is an in-memory chain (see freeton_local);
+# a plain "getClient" borrows (helpers and wrappers do), owners take a reference with "acquire" or "ownedClient"
+# and give it back with "releaseClient"; the last owner to release destroys the context, so borrowers must not outlive it;
+# contexts nobody owns live until exit (see releaseAllClients);
+CLIENT_POOL       = {}
+CLIENT_POOL_REFS  = {}
+CLIENT_POOL_LOCK  = threading.Lock()
+CLIENT_POOL_STATS = {"created": 0, "reused": 0, "released": 0}
+
+def getClient(serverAddress: str = None, isAsync: bool = False, acquire: bool = False):
+    if serverAddress is None:
+        serverAddress = SERVER_ADDRESS
+
+    with CLIENT_POOL_LOCK:
+        tonClient = CLIENT_POOL.get((serverAddress, isAsync))
+        if tonClient is not None:
+            if acquire:
+                CLIENT_POOL_REFS[(serverAddress, isAsync)] += 1
+            CLIENT_POOL_STATS["reused"] += 1
+            return tonClient
+
+        if isLocalAddress(serverAddress):
+            tonClient = LocalTonClient(serverAddress=serverAddress, isAsync=isAsync)
+        else:
+            if serverAddress == "":
+                config = ClientConfig()
+            else:
+                config = ClientConfig(network=NetworkConfig(server_address=serverAddress))
+            tonClient = TonClient(config=config, is_async=isAsync)
+        CLIENT_POOL[(serverAddress, isAsync)]      = tonClient
+        CLIENT_POOL_REFS[(serverAddress, isAsync)] = 1 if acquire else 0
+        CLIENT_POOL_STATS["created"] += 1
+        return tonClient
+
+def releaseClient(serverAddress: str = None, isAsync: bool = False):
+    if serverAddress is None:
+        serverAddress = SERVER_ADDRESS
+
+    with CLIENT_POOL_LOCK:
+        key = (serverAddress, isAsync)
+        if CLIENT_POOL_REFS.get(key, 0) == 0:
+            return
+        CLIENT_POOL_REFS[key] -= 1
+        if CLIENT_POOL_REFS[key] > 0:
+            return
+        tonClient = CLIENT_POOL.pop(key)
+        del CLIENT_POOL_REFS[key]
+        CLIENT_POOL_STATS["released"] += 1
+    tonClient.destroy_context()
+
+@contextlib.contextmanager
+def ownedClient(serverAddress: str = None, isAsync: bool = False):
+    serverAddress = SERVER_ADDRESS if serverAddress is None else serverAddress
+    tonClient     = getClient(serverAddress=serverAddress, isAsync=isAsync, acquire=True)
+    try:
+        yield tonClient
+    finally:
+        releaseClient(serverAddress=serverAddress, isAsync=isAsync)
+
+# At exit, whoever still holds a context
+def releaseAllClients():
+    with CLIENT_POOL_LOCK:
+        clients = list(CLIENT_POOL.values())
+        CLIENT_POOL.clear()
+        CLIENT_POOL_REFS.clear()
+        CLIENT_POOL_STATS["released"] += len(clients)
+    for tonClient in clients:
+        tonClient.destroy_context()
+
+def getLiveClientsCount():
+    with CLIENT_POOL_LOCK:
+        return len(CLIENT_POOL)
+
+def getClientPoolStats():
+    with CLIENT_POOL_LOCK:
+        return dict(CLIENT_POOL_STATS, live=len(CLIENT_POOL))
+
+atexit.register(releaseAllClients)
+
+# ==============================================================================
+# In-memory ABI/TVC/code artifacts keyed by path;
+# entries are validated by (mtime, size) and, if those changed, by content hash;
+class ArtifactCache(object):
+    def __init__(self, maxSize: int = 64):
+        self.MAX_SIZE = maxSize
+        self.ENTRIES  = OrderedDict()
+        self.LOCK     = threading.Lock()
+        self.HITS     = 0
+        self.MISSES   = 0
+
+    def get(self, kind: str, path: str, loader):
+        fileStat = os.stat(path)
+        stamp    = (fileStat.st_mtime_ns, fileStat.st_size)
+        key      = (kind, os.path.abspath(path))
+
+        with self.LOCK:
+            entry = self.ENTRIES.get(key)
+            if entry is not None and entry["stamp"] == stamp:
+                self.ENTRIES.move_to_end(key)
+                self.HITS += 1
+                return entry["value"]
+
+        with open(path, "rb") as fp:
+            content = fp.read()
+        digest = hashlib.sha256(content).hexdigest()
+
+        with self.LOCK:
+            if entry is not None and entry["digest"] == digest:
+                entry["stamp"] = stamp
+                self.ENTRIES.move_to_end(key)
+                self.HITS += 1
+                return entry["value"]
+            self.MISSES += 1
+
+        value = loader(content)
+
+        with self.LOCK:
+            self.ENTRIES[key] = {"stamp": stamp, "digest": digest, "value": value}
+            self.ENTRIES.move_to_end(key)
+            while len(self.ENTRIES) > self.MAX_SIZE:
+                self.ENTRIES.popitem(last=False)
+
+        return value
+
+    def clear(self):
+        with self.LOCK:
+            self.ENTRIES.clear()
+            self.HITS   = 0
+            self.MISSES = 0
+
+    def getStats(self):
+        with self.LOCK:
+            return {"hits": self.HITS, "misses": self.MISSES, "size": len(self.ENTRIES), "maxSize": self.MAX_SIZE}
+
+ARTIFACT_CACHE = ArtifactCache()
 
 # ==============================================================================
 # 
 def getAbi(abiPath):
-    abi = Abi.from_path(path=abiPath)
+    abi = ARTIFACT_CACHE.get("abi", abiPath, lambda content: Abi.Json(value=content.decode("utf-8")))
     return abi
 
 def getTvc(tvcPath):
-    fp  = open(tvcPath, 'rb')
-    tvc = base64.b64encode(fp.read()).decode()
-    fp.close()
+    tvc = ARTIFACT_CACHE.get("tvc", tvcPath, lambda content: base64.b64encode(content).decode())
     return tvc
 
+def getAbiJson(abiPath):
+    abiJson = ARTIFACT_CACHE.get("abijson", abiPath, lambda content: json.loads(content))
+    return abiJson
+
 def getAbiTvc(abiPath, tvcPath):
     return (getAbi(abiPath), getTvc(tvcPath))
 
@@ -64,51 +219,53 @@ def getNowTimestamp():
     return unixtime
 
 # ==============================================================================
-#
-def getValuesFromException(tonException):
-    arg    = tonException.args[0]
-    error  = arg[arg.find("(Data:") + 7 : -1]
-    result = ast.literal_eval(error)
+# Chain time is "gen_utime" of the newest block, local clock is only an estimate of it;
+# "local://" chains are fast-forwarded instead of waited for;
+CHAIN_TIME_MARGIN = 60 # seconds "waitForChainTime" waits on top of the expected time
+
+def getChainTime(tonClient: TonClient):
+    params = ParamsOfQueryCollection(collection="blocks", result="gen_utime", order=[OrderBy(path="gen_utime", direction=SortDirection.DESC)], limit=1)
+    result = tonClient.net.query_collection(params=params).result
+    return result[0]["gen_utime"] if result else 0
+
+# Returns "gen_utime" of the first block at or after "timestamp" as soon as it appears
+def waitForChainTime(tonClient: TonClient, timestamp: int, timeout: int = None):
+    if isinstance(tonClient, LocalTonClient):
+        tonClient.CHAIN.advanceTo(timestamp)
+    if timeout is None:
+        timeout = max(0, timestamp - getNowTimestamp()) + CHAIN_TIME_MARGIN
+
+    params = ParamsOfWaitForCollection(collection="blocks", filter={"gen_utime": {"ge": timestamp}}, result="gen_utime", timeout=timeout * 1000)
+    result = tonClient.net.wait_for_collection(params=params).result
+    return result["gen_utime"]
+
+# The clock local getters run at: chain time of a "local://" chain, local clock otherwise
+def getChainClock(tonClient: TonClient):
+    if isinstance(tonClient, LocalTonClient):
+        return tonClient.CHAIN.getTime
+    return time.time
 
-    try:
-        errorCode = result["exit_code"]
-    except KeyError:
-        try:
-            errorCode = result["local_error"]["data"]["exit_code"]
-        except KeyError:
-            errorCode = ""
-
-    try:
-        errorDesc = result["description"]
-    except KeyError:
-        errorDesc = ""
-
-    try:
-        transID = result["transaction_id"]
-    except KeyError:
-        transID = ""
-
-    try:
-        message = result["message"]
-    except KeyError:
-        try:
-            message = result["local_error"]["message"]
-        except KeyError:
-            message = ""
-
-    return {"errorCode":errorCode, "errorMessage":message, "transactionID": transID, "errorDesc": errorDesc}
+# ==============================================================================
+#
+# "errorDetails" dict of a TonException (see freeton_errors.TonError for the structured version)
+NO_ERROR = {"errorCode":0, "errorMessage":"", "transactionID": "", "errorDesc": "", "sdkCode": 0}
 
+def getValuesFromException(tonException):
+    return TonError.fromException(tonException).toDict()
 
 # ==============================================================================
 #
-def getCodeFromTvc(tvcPath):
+def _getCodeFromTvcContent(content):
 
-    tonClient     = TonClient(config=ClientConfig())
-    tvc           = getTvc(tvcPath)
+    tonClient     = getClient()
+    tvc           = base64.b64encode(content).decode()
     tvcCodeParams = ParamsOfGetCodeFromTvc(tvc=tvc)
     tvcCodeResult = tonClient.boc.get_code_from_tvc(params=tvcCodeParams).code
     return tvcCodeResult
 
+def getCodeFromTvc(tvcPath):
+    return ARTIFACT_CACHE.get("code", tvcPath, _getCodeFromTvcContent)
+
 # ==============================================================================
 #
 def loadSigner(keysFile):
@@ -119,7 +276,7 @@ def loadSigner(keysFile):
     return signer
 
 def generateSigner():
-    keypair = TonClient(config=ClientConfig()).crypto.generate_random_sign_keys()
+    keypair = getClient().crypto.generate_random_sign_keys()
     signer  = Signer.Keys(keys=keypair)
     return signer
 
@@ -127,7 +284,34 @@ def generateSigner():
 #
 def getAddress(abiPath, tvcPath, signer, initialPubkey, initialData):
 
-    tonClient  = TonClient(config=ClientConfig())
+    # Same as "abi.encode_message" with DeploySet, but without SDK round-trip;
+    # a signing box keeps its public key to itself, only the SDK can ask it
+    if initialPubkey is None or initialPubkey == "":
+        if isinstance(signer, Signer.Keys):
+            initialPubkey = signer.keys.public
+        elif isinstance(signer, Signer.External):
+            initialPubkey = signer.public_key
+        elif isinstance(signer, Signer.SigningBox):
+            return getAddressFromSdk(abiPath=abiPath, tvcPath=tvcPath, signer=signer, initialPubkey=None, initialData=initialData)
+        else:
+            initialPubkey = None
+
+    return getAddressWithCode(abiPath=abiPath, tvcPath=tvcPath, code=None, initialPubkey=initialPubkey, initialData=initialData)
+
+def getAddressWithCode(abiPath, tvcPath, code, initialPubkey, initialData):
+
+    # Mirrors "tvm.buildStateInit" with custom "code" (base64 BOC), data template is taken from TVC
+    (tvcCode, data) = ARTIFACT_CACHE.get("stateinit", tvcPath, getStateInitFromTvc)
+    abiData         = getAbiJson(abiPath).get("data", [])
+    codeCell        = tvcCode if code is None else bocToCellCached(code)
+    dataCell        = buildInitialData(data=data, abiData=abiData, initialPubkey=initialPubkey, initialData=initialData)
+    stateInit       = buildStateInit(code=codeCell, data=dataCell)
+
+    return getAddressFromStateInit(stateInit)
+
+def getAddressFromSdk(abiPath, tvcPath, signer, initialPubkey, initialData):
+
+    tonClient  = getClient()
     (abi, tvc) = getAbiTvc(abiPath, tvcPath)
     deploySet  = DeploySet(tvc=tvc, initial_pubkey=initialPubkey, initial_data=initialData)
 
@@ -144,11 +328,24 @@ def getAddressZeroPubkey(abiPath, tvcPath, initialData):
     signer = Signer.Keys(keys)
     return getAddress(abiPath, tvcPath, signer, ZERO_PUBKEY, initialData)
 
+# ==============================================================================
+# Offline versions of IAuctionManager.getHashFromPrice: representation hash of a cell with (uint128 price, uint256 salt),
+# the same construction AuctionBid.revealPriceHash checks; salts and hashes are "0x" + 64 hex digits;
+def generateSalt():
+    return "0x%064x" % secrets.randbits(256)
+
+def getHashFromPrice(price, salt):
+    cell = CellBuilder().storeUint(int(str(price), 0), 128).storeUint(int(str(salt), 0), 256).endCell()
+    return "0x" + cell.getHashHex()
+
+def getHashesFromPrices(pricesAndSalts):
+    return [getHashFromPrice(price, salt) for (price, salt) in pricesAndSalts]
+
 # ==============================================================================
 #
 def prepareMessageBoc(abiPath, functionName, functionParams):
 
-    tonClient = TonClient(config=ClientConfig())
+    tonClient = getClient()
     callSet   = CallSet(function_name=functionName, input=functionParams)
     params    = ParamsOfEncodeMessageBody(abi=getAbi(abiPath), signer=Signer.NoSigner(), is_internal=True, call_set=callSet)
     encoded   = tonClient.abi.encode_message_body(params=params)
@@ -170,7 +367,7 @@ def deployContract(tonClient: TonClient, abiPath, tvcPath, constructorInput, ini
         waitParams    = ParamsOfWaitForTransaction(message=encoded.message, shard_block_id=messageResult.shard_block_id, send_events=False, abi=abi)
         result        = tonClient.processing.wait_for_transaction(params=waitParams)
 
-        return (result, {"errorCode":0, "errorMessage":"", "transactionID": "", "errorDesc": ""})
+        return (result, dict(NO_ERROR))
 
     except TonException as ton:
         if THROW:
@@ -202,13 +399,82 @@ def runFunctionInternal(tonClient: TonClient, boc: str, abiPath: str, contractAd
 
 def runFunction(tonClient: TonClient, abiPath, contractAddress, functionName, functionParams):
 
-    result = getAccountGraphQL(tonClient, contractAddress, "boc")
-    if result == "":
-        return ""
-    if result["boc"] is None:
+    if USE_BOC_CACHE:
+        boc = BOC_CACHE.getBoc(tonClient, contractAddress)
+    else:
+        result = getAccountsLoader(tonClient, "id, boc").load(contractAddress)
+        boc    = "" if result == "" or result["boc"] is None else result["boc"]
+
+    if boc == "":
         return ""
 
-    return (runFunctionInternal(tonClient=tonClient, boc=result["boc"], abiPath=abiPath, contractAddress=contractAddress, functionName=functionName, functionParams=functionParams))
+    return (runFunctionInternal(tonClient=tonClient, boc=boc, abiPath=abiPath, contractAddress=contractAddress, functionName=functionName, functionParams=functionParams))
+
+def runFunctionMany(tonClient: TonClient, abiPath, contractAddresses, functionName, functionParams):
+
+    # one batched accounts query for all contracts, then local execution; returns {address: result}
+    if USE_BOC_CACHE:
+        bocs = BOC_CACHE.getBocs(tonClient, contractAddresses)
+    else:
+        accounts = getAccountsGraphQL(tonClient=tonClient, accountIDsArray=contractAddresses, fields="id, boc")
+        bocs     = {address: account["boc"] for address, account in accounts.items() if account["boc"] is not None}
+
+    result = {}
+    for address in contractAddresses:
+        if address not in bocs:
+            result[address] = ""
+        else:
+            result[address] = runFunctionInternal(tonClient=tonClient, boc=bocs[address], abiPath=abiPath, contractAddress=address, functionName=functionName, functionParams=functionParams)
+    return result
+
+# ==============================================================================
+# Several getters on one account state: the BOC goes into the SDK cache once (pinned)
+# and every "run_tvm" refers to it; the output comes back decoded from "run_tvm" itself.
+# "calls" is a list of (abiPath, functionName, functionParams);
+# returns [(result, errorDetails), ...] in the same order, a failed getter does not stop the others;
+GETTERS_PIN = itertools.count()
+
+def _unwrapOutput(value):
+    if len(value) == 1 and list(value.keys())[0] == "value0":
+        return value["value0"]
+    return value
+
+def runFunctionsInternal(tonClient: TonClient, boc: str, contractAddress: str, calls):
+
+    pin    = "getters-{}".format(next(GETTERS_PIN))
+    bocRef = tonClient.boc.cache_set(params=ParamsOfBocCacheSet(boc=boc, cache_type=BocCacheType.Pinned(pin=pin))).boc_ref
+    result = []
+    try:
+        for (abiPath, functionName, functionParams) in calls:
+            try:
+                abi       = getAbi(abiPath)
+                callSet   = CallSet(function_name=functionName, input=functionParams)
+                params    = ParamsOfEncodeMessage(abi=abi, address=contractAddress, signer=Signer.NoSigner(), call_set=callSet)
+                encoded   = tonClient.abi.encode_message(params=params)
+                paramsRun = ParamsOfRunTvm(message=encoded.message, account=bocRef, abi=abi, return_updated_account=False)
+                output    = tonClient.tvm.run_tvm(params=paramsRun).decoded.output
+                result.append((_unwrapOutput(output), dict(NO_ERROR)))
+            except TonException as ton:
+                result.append(({}, getValuesFromException(ton)))
+    finally:
+        tonClient.boc.cache_unpin(params=ParamsOfBocCacheUnpin(pin=pin))
+
+    return result
+
+# Same getters on many accounts, one batched accounts query; returns {address: [(result, errorDetails), ...]},
+# accounts without state get an empty list
+def runFunctionsMany(tonClient: TonClient, contractAddresses, calls):
+
+    if USE_BOC_CACHE:
+        bocs = BOC_CACHE.getBocs(tonClient, contractAddresses)
+    else:
+        accounts = getAccountsGraphQL(tonClient=tonClient, accountIDsArray=contractAddresses, fields="id, boc")
+        bocs     = {address: account["boc"] for address, account in accounts.items() if account["boc"] is not None}
+
+    result = {}
+    for address in contractAddresses:
+        result[address] = runFunctionsInternal(tonClient=tonClient, boc=bocs[address], contractAddress=address, calls=calls) if address in bocs else []
+    return result
 
 # ==============================================================================
 #
@@ -222,6 +488,7 @@ def callFunction(tonClient: TonClient, abiPath, contractAddress, functionName, f
 
         messageParams = ParamsOfSendMessage(message=encoded.message, send_events=False, abi=abi)
         messageResult = tonClient.processing.send_message(params=messageParams)
+        BOC_CACHE.invalidate(contractAddress)
 
         if waitForTransaction:
             waitParams    = ParamsOfWaitForTransaction(message=encoded.message, shard_block_id=messageResult.shard_block_id, send_events=False, abi=abi)
@@ -229,34 +496,270 @@ def callFunction(tonClient: TonClient, abiPath, contractAddress, functionName, f
         else:
             result = ""
 
-        return (result, {"errorCode":0, "errorMessage":"", "transactionID": "", "errorDesc": ""})
+        return (result, dict(NO_ERROR))
 
     except TonException as ton:
         if THROW:
             raise ton
-        (errorCode, errorDesc, transID) = getValuesFromException(ton)
-        return ({}, errorCode, errorDesc, transID)
+        exceptionDetails = getValuesFromException(ton)
+        return ({}, exceptionDetails)
 
 # ==============================================================================
-#
-def decodeMessageBody(boc, possibleAbiFiles):
+# Pipelined calls: the whole batch is encoded and sent back-to-back,
+# then transactions are awaited concurrently and yielded as they land;
+# "calls" is a list of dicts with "callFunction" arguments except "tonClient",
+# every item yielded is (index in "calls", result, errorDetails);
+PIPELINE_WORKERS = 16
 
-    tonClient = TonClient(config=ClientConfig())
+def sendFunctionMessage(tonClient: TonClient, abiPath, contractAddress, functionName, functionParams, signer):
 
-    # EXTERNAL
-    for abi in possibleAbiFiles:
-        try:
-            params = ParamsOfDecodeMessageBody(abi=getAbi(abi), body=boc, is_internal=False)
-            result = tonClient.abi.decode_message_body(params=params)
-            return (abi, result)
+    abi           = getAbi(abiPath)
+    callSet       = CallSet(function_name=functionName, input=functionParams)
+    params        = ParamsOfEncodeMessage(abi=abi, address=contractAddress, signer=signer, call_set=callSet)
+    encoded       = tonClient.abi.encode_message(params=params)
+
+    messageParams = ParamsOfSendMessage(message=encoded.message, send_events=False, abi=abi)
+    messageResult = tonClient.processing.send_message(params=messageParams)
+    BOC_CACHE.invalidate(contractAddress)
+
+    return ParamsOfWaitForTransaction(message=encoded.message, shard_block_id=messageResult.shard_block_id, send_events=False, abi=abi)
+
+def callFunctionPipelined(tonClient: TonClient, calls, maxWorkers: int = PIPELINE_WORKERS):
 
+    waiting = {}
+    for index, call in enumerate(calls):
+        try:
+            waiting[index] = sendFunctionMessage(tonClient=tonClient, **call)
         except TonException as ton:
-            pass
+            if THROW:
+                raise ton
+            yield (index, {}, getValuesFromException(ton))
+
+    if not waiting:
+        return
+
+    with ThreadPoolExecutor(max_workers=min(maxWorkers, len(waiting))) as executor:
+        futures = {executor.submit(tonClient.processing.wait_for_transaction, params=waitParams): index for index, waitParams in waiting.items()}
+        for future in as_completed(futures):
+            try:
+                yield (futures[future], future.result(), dict(NO_ERROR))
+            except TonException as ton:
+                if THROW:
+                    for pending in futures:
+                        pending.cancel()
+                    raise ton
+                yield (futures[future], {}, getValuesFromException(ton))
 
-    # INTERNAL
-    for abi in possibleAbiFiles:
+# ==============================================================================
+# Messages encoded and signed ahead of time, sent later with no encoding on the hot path;
+# "time" header is the prebuild moment by the chain clock (unique per message), "expire" is given explicitly.
+# Replay protection of the wallet accepts only "time" newer than the last accepted one,
+# so a prebuilt message is void once anything built later was sent from the same wallet;
+PREBUILD_LOCK      = threading.Lock()
+PREBUILD_LAST_TIME = 0
+
+def _getPrebuildTime(tonClient: TonClient):
+    global PREBUILD_LAST_TIME
+    with PREBUILD_LOCK:
+        PREBUILD_LAST_TIME = max(PREBUILD_LAST_TIME + 1, int(getChainClock(tonClient)() * 1000))
+        return PREBUILD_LAST_TIME
+
+class PrebuiltMessage(object):
+    __slots__ = ("abiPath", "contractAddress", "functionName", "functionParams", "message", "messageID", "expire")
+
+    def __init__(self, abiPath: str, contractAddress: str, functionName: str, functionParams: dict, message: str, messageID: str, expire: int):
+        self.abiPath         = abiPath
+        self.contractAddress = contractAddress
+        self.functionName    = functionName
+        self.functionParams  = functionParams
+        self.message         = message
+        self.messageID       = messageID
+        self.expire          = expire
+
+    # "now" is chain time (see getChainClock), "expire" is checked against it and not against the local clock
+    def isExpired(self, now: int):
+        return now >= self.expire
+
+def prebuildMessage(tonClient: TonClient, abiPath, contractAddress, functionName, functionParams, signer, expire: int):
+
+    header  = FunctionHeader(expire=expire, time=_getPrebuildTime(tonClient))
+    callSet = CallSet(function_name=functionName, header=header, input=functionParams)
+    params  = ParamsOfEncodeMessage(abi=getAbi(abiPath), address=contractAddress, signer=signer, call_set=callSet)
+    encoded = tonClient.abi.encode_message(params=params)
+    return PrebuiltMessage(abiPath=abiPath, contractAddress=contractAddress, functionName=functionName, functionParams=functionParams,
+        message=encoded.message, messageID=encoded.message_id, expire=expire)
+
+def sendPrebuiltMessage(tonClient: TonClient, prebuilt: PrebuiltMessage, waitForTransaction: bool = True):
+
+    try:
+        abi           = getAbi(prebuilt.abiPath)
+        messageParams = ParamsOfSendMessage(message=prebuilt.message, send_events=False, abi=abi)
+        messageResult = tonClient.processing.send_message(params=messageParams)
+        BOC_CACHE.invalidate(prebuilt.contractAddress)
+        if not waitForTransaction:
+            return (messageResult, dict(NO_ERROR))
+
+        waitParams    = ParamsOfWaitForTransaction(message=prebuilt.message, shard_block_id=messageResult.shard_block_id, send_events=False, abi=abi)
+        result        = tonClient.processing.wait_for_transaction(params=waitParams)
+        return (result, dict(NO_ERROR))
+
+    except TonException as ton:
+        if THROW:
+            raise ton
+        exceptionDetails = getValuesFromException(ton)
+        return ({}, exceptionDetails)
+
+# Prebuilt messages by key (e.g. bid value of every step of a price ladder)
+NO_PREBUILT_MESSAGE = dict(NO_ERROR, errorCode=-1, errorMessage="No prebuilt message or it is expired", sdkCode=ProcessingErrorCode.MESSAGE_ALREADY_EXPIRED)
+
+class PrebuiltQueue(object):
+    def __init__(self, tonClient: TonClient):
+        self.TONCLIENT = tonClient
+        self.MESSAGES  = OrderedDict()
+        self.LOCK      = threading.Lock()
+
+    def put(self, key, prebuilt: PrebuiltMessage):
+        with self.LOCK:
+            self.MESSAGES[key] = prebuilt
+
+    def pop(self, key):
+        with self.LOCK:
+            return self.MESSAGES.pop(key, None)
+
+    def getKeys(self):
+        with self.LOCK:
+            return list(self.MESSAGES.keys())
+
+    def __len__(self):
+        with self.LOCK:
+            return len(self.MESSAGES)
+
+    def _getNow(self):
+        return int(getChainClock(self.TONCLIENT)())
+
+    # The message for the key if it is still usable, forgotten either way
+    def _take(self, key):
+        prebuilt = self.pop(key)
+        return None if prebuilt is None or prebuilt.isExpired(self._getNow()) else prebuilt
+
+    # Sends and forgets the message; ({}, errorDetails) with errorCode -1 if there is no usable message for the key
+    def send(self, key, waitForTransaction: bool = True):
+        prebuilt = self._take(key)
+        if prebuilt is None:
+            return ({}, dict(NO_PREBUILT_MESSAGE))
+        return sendPrebuiltMessage(tonClient=self.TONCLIENT, prebuilt=prebuilt, waitForTransaction=waitForTransaction)
+
+    def removeExpired(self, now: int = None):
+        now = self._getNow() if now is None else now
+        with self.LOCK:
+            expired = [key for (key, prebuilt) in self.MESSAGES.items() if prebuilt.isExpired(now)]
+            for key in expired:
+                del self.MESSAGES[key]
+        return expired
+
+# ==============================================================================
+#
+def _getAbiParamSignature(param):
+    paramType = param["type"]
+    if "tuple" in paramType:
+        paramType = paramType.replace("tuple", "(" + ",".join([_getAbiParamSignature(component) for component in param["components"]]) + ")")
+    return paramType
+
+def _getAbiId(signature: str):
+    return int.from_bytes(hashlib.sha256(signature.encode()).digest()[0:4], "big") & 0x7FFFFFFF
+
+# ==============================================================================
+# 32-bit function/event id -> [(abiPath, isInternal)] for a set of ABI files;
+# external bodies have signature and headers before the id, internal ones and
+# function outputs/events start with it;
+class AbiIndex(object):
+    def __init__(self, abiFilesArray):
+        self.ABI_FILES = list(abiFilesArray)
+        self.ABI_JSONS = [getAbiJson(abiPath) for abiPath in self.ABI_FILES]
+        self.INTERNAL  = {}
+        self.EXTERNAL  = {}
+        self.HEADERS   = set()
+
+        for (abiPath, abiJson) in zip(self.ABI_FILES, self.ABI_JSONS):
+            version = str(abiJson.get("ABI version", 2)).split(".")[0]
+            for function in abiJson.get("functions", []):
+                inputs  = ",".join([_getAbiParamSignature(param) for param in function.get("inputs",  [])])
+                outputs = ",".join([_getAbiParamSignature(param) for param in function.get("outputs", [])])
+                if "id" in function:
+                    inputID = int(function["id"], 16) & 0x7FFFFFFF
+                else:
+                    inputID = _getAbiId("{}({})({})v{}".format(function["name"], inputs, outputs, version))
+
+                self.INTERNAL.setdefault(inputID,              []).append((abiPath, True))
+                self.INTERNAL.setdefault(inputID | 0x80000000, []).append((abiPath, False))
+                self.EXTERNAL.setdefault(inputID,              []).append((abiPath, False))
+
+            for event in abiJson.get("events", []):
+                inputs  = ",".join([_getAbiParamSignature(param) for param in event.get("inputs", [])])
+                eventID = int(event["id"], 16) if "id" in event else _getAbiId("{}({})v{}".format(event["name"], inputs, version))
+                self.INTERNAL.setdefault(eventID, []).append((abiPath, False))
+
+            if version != "1":
+                # since 2.2 the header may be laid out with fixed size, try both
+                minor = tuple(int(part) for part in str(abiJson.get("version", "2.0")).split("."))
+                self.HEADERS.add((tuple(abiJson.get("header", [])), False))
+                if minor >= (2, 2):
+                    self.HEADERS.add((tuple(abiJson.get("header", [])), True))
+
+    def isUpToDate(self):
+        return all(getAbiJson(abiPath) is abiJson for (abiPath, abiJson) in zip(self.ABI_FILES, self.ABI_JSONS))
+
+    def _getExternalID(self, cell, header, fixedLayout):
+        slice = cell.beginParse()
+        if slice.loadBit() or fixedLayout:
+            slice.skipBits(512)
+        for field in header:
+            if field == "pubkey":
+                if slice.loadBit() or fixedLayout:
+                    slice.skipBits(256)
+            elif field == "time":
+                slice.skipBits(64)
+            elif field == "expire":
+                slice.skipBits(32)
+        return slice.loadUint(32)
+
+    def lookup(self, boc):
+        # candidates in the same order the old trial decoding used: external first
+        cell       = bocToCell(boc)
+        candidates = []
+        for (header, fixedLayout) in self.HEADERS:
+            try:
+                functionID = self._getExternalID(cell, header, fixedLayout)
+            except ValueError:
+                continue
+            candidates += self.EXTERNAL.get(functionID, [])
+        if cell.bitsLen >= 32:
+            candidates += self.INTERNAL.get(cell.beginParse().preloadUint(32), [])
+        return list(dict.fromkeys(candidates))
+
+ABI_INDEXES      = {}
+ABI_INDEXES_LOCK = threading.Lock()
+
+def getAbiIndex(abiFilesArray):
+    key = tuple(abiFilesArray)
+    with ABI_INDEXES_LOCK:
+        index = ABI_INDEXES.get(key)
+        if index is None or not index.isUpToDate():
+            index = AbiIndex(abiFilesArray)
+            ABI_INDEXES[key] = index
+        return index
+
+# ==============================================================================
+#
+def decodeMessageBody(boc, possibleAbiFiles):
+
+    if boc is None or boc == "":
+        return ("", "")
+
+    tonClient = getClient()
+    for (abi, isInternal) in getAbiIndex(possibleAbiFiles).lookup(boc):
         try:
-            params = ParamsOfDecodeMessageBody(abi=getAbi(abi), body=boc, is_internal=True)
+            params = ParamsOfDecodeMessageBody(abi=getAbi(abi), body=boc, is_internal=isInternal)
             result = tonClient.abi.decode_message_body(params=params)
             return (abi, result)
 
@@ -285,6 +788,195 @@ def getAccountGraphQL(tonClient: TonClient, accountID, fields):
     else:
         return ""
 
+# ==============================================================================
+# Many accounts in chunks of "limit" ids per query, returns {id: account};
+# missing accounts are not present in the result;
+ACCOUNTS_QUERY_LIMIT = 50
+
+def queryCollectionIn(tonClient: TonClient, collection: str, keyField: str, keysArray, fields: str, limit: int = ACCOUNTS_QUERY_LIMIT):
+
+    # {key: object} for every object whose "keyField" is in "keysArray", "limit" keys per query
+    if keyField not in [field.strip() for field in fields.split(",")]:
+        fields = keyField + ", " + fields
+
+    result     = {}
+    uniqueKeys = list(dict.fromkeys(keysArray))
+    for start in range(0, len(uniqueKeys), limit):
+        chunk   = uniqueKeys[start : start + limit]
+        lastKey = ""
+        while True:
+            keyFilter = {"in":chunk} if lastKey == "" else {"in":chunk, "gt":lastKey}
+            paramsCollection = ParamsOfQueryCollection(
+            collection=collection, result=fields, limit=limit,
+            filter={keyField:keyFilter},
+            order=[OrderBy(path=keyField, direction=SortDirection.ASC)])
+
+            page = tonClient.net.query_collection(params=paramsCollection).result
+            for item in page:
+                result[item[keyField]] = item
+
+            # next page only when server cut the result
+            if len(page) < limit or all(key in result for key in chunk):
+                break
+            lastKey = page[-1][keyField]
+
+    return result
+
+def getAccountsGraphQL(tonClient: TonClient, accountIDsArray, fields: str, limit: int = ACCOUNTS_QUERY_LIMIT):
+    return queryCollectionIn(tonClient=tonClient, collection="accounts", keyField="id", keysArray=accountIDsArray, fields=fields, limit=limit)
+
+# ==============================================================================
+# Coalesces concurrent single-account requests into batched "accounts" queries;
+# only one query is in flight per loader, requests that arrive meanwhile go to the next batch;
+class AccountsLoader(object):
+    def __init__(self, tonClient: TonClient, fields: str, limit: int = ACCOUNTS_QUERY_LIMIT, delay: float = 0):
+        self.TONCLIENT   = tonClient
+        self.FIELDS      = fields
+        self.LIMIT       = limit
+        self.DELAY       = delay
+        self.LOCK        = threading.Lock()
+        self.FLIGHT_LOCK = threading.Lock()
+        self.PENDING     = None
+
+    def _flush(self, batch):
+        with self.FLIGHT_LOCK:
+            if self.DELAY > 0:
+                time.sleep(self.DELAY)
+            with self.LOCK:
+                if self.PENDING is batch:
+                    self.PENDING = None
+            try:
+                batch["result"] = getAccountsGraphQL(tonClient=self.TONCLIENT, accountIDsArray=list(batch["ids"]), fields=self.FIELDS, limit=self.LIMIT)
+            except Exception as e:
+                batch["error"] = e
+            finally:
+                batch["event"].set()
+
+    def loadMany(self, accountIDsArray):
+        with self.LOCK:
+            batch  = self.PENDING
+            leader = batch is None
+            if leader:
+                batch = {"ids": set(), "event": threading.Event(), "result": {}, "error": None}
+                self.PENDING = batch
+            batch["ids"].update(accountIDsArray)
+
+        if leader:
+            self._flush(batch)
+        else:
+            batch["event"].wait()
+
+        if batch["error"] is not None:
+            raise batch["error"]
+        return {accountID: batch["result"][accountID] for accountID in accountIDsArray if accountID in batch["result"]}
+
+    def load(self, accountID):
+        result = self.loadMany([accountID])
+        return result.get(accountID, "")
+
+ACCOUNTS_LOADERS      = {}
+ACCOUNTS_LOADERS_LOCK = threading.Lock()
+
+def getAccountsLoader(tonClient: TonClient, fields: str):
+    with ACCOUNTS_LOADERS_LOCK:
+        key    = (id(tonClient), fields)
+        loader = ACCOUNTS_LOADERS.get(key)
+        if loader is None or loader.TONCLIENT is not tonClient:
+            loader = AccountsLoader(tonClient=tonClient, fields=fields)
+            ACCOUNTS_LOADERS[key] = loader
+        return loader
+
+# ==============================================================================
+# Account BOCs keyed by address and validated by "last_trans_lt";
+# within TTL a BOC is served without any query, after TTL a cheap lt probe decides
+# if the full BOC has to be downloaded again; TTL = 0 means "always probe";
+class AccountBocCache(object):
+    def __init__(self, ttl: float = 0, maxSize: int = 10000):
+        self.TTL      = ttl
+        self.MAX_SIZE = maxSize
+        self.ENTRIES  = OrderedDict()
+        self.LOCK     = threading.Lock()
+        self.HITS     = 0
+        self.MISSES   = 0
+        self.PROBES   = 0
+
+    def _store(self, address, lt, boc, checked):
+        self.ENTRIES[address] = {"lt": lt, "boc": boc, "checked": checked}
+        self.ENTRIES.move_to_end(address)
+        while len(self.ENTRIES) > self.MAX_SIZE:
+            self.ENTRIES.popitem(last=False)
+
+    def getBocs(self, tonClient: TonClient, addresses):
+        now     = time.monotonic()
+        result  = {}
+        known   = {}
+        unknown = []
+
+        with self.LOCK:
+            for address in dict.fromkeys(addresses):
+                entry = self.ENTRIES.get(address)
+                if entry is None:
+                    unknown.append(address)
+                elif self.TTL > 0 and now - entry["checked"] < self.TTL:
+                    self.ENTRIES.move_to_end(address)
+                    self.HITS += 1
+                    result[address] = entry["boc"]
+                else:
+                    known[address] = entry["lt"]
+
+        toFetch = unknown
+        if len(known) > 0:
+            probes = getAccountsGraphQL(tonClient=tonClient, accountIDsArray=list(known.keys()), fields="id, last_trans_lt")
+            with self.LOCK:
+                self.PROBES += len(known)
+                for address, lt in known.items():
+                    probe = probes.get(address)
+                    entry = self.ENTRIES.get(address)
+                    if probe is not None and entry is not None and probe["last_trans_lt"] == lt:
+                        entry["checked"] = now
+                        self.ENTRIES.move_to_end(address)
+                        self.HITS += 1
+                        result[address] = entry["boc"]
+                    else:
+                        toFetch.append(address)
+
+        if len(toFetch) > 0:
+            accounts = getAccountsGraphQL(tonClient=tonClient, accountIDsArray=toFetch, fields="id, boc, last_trans_lt")
+            with self.LOCK:
+                self.MISSES += len(toFetch)
+                for address in toFetch:
+                    account = accounts.get(address)
+                    if account is None or account["boc"] is None:
+                        self.ENTRIES.pop(address, None)
+                        continue
+                    self._store(address, account["last_trans_lt"], account["boc"], now)
+                    result[address] = account["boc"]
+
+        return result
+
+    def getBoc(self, tonClient: TonClient, address):
+        result = self.getBocs(tonClient, [address])
+        return result.get(address, "")
+
+    def invalidate(self, address: str = None):
+        with self.LOCK:
+            if address is None:
+                self.ENTRIES.clear()
+            else:
+                self.ENTRIES.pop(address, None)
+
+    def getStats(self):
+        with self.LOCK:
+            return {"hits": self.HITS, "misses": self.MISSES, "probes": self.PROBES, "size": len(self.ENTRIES), "maxSize": self.MAX_SIZE}
+
+BOC_CACHE = AccountBocCache()
+
+# ==============================================================================
+#
+def getBalances(tonClient: TonClient, accountIDsArray):
+    result = getAccountsGraphQL(tonClient=tonClient, accountIDsArray=accountIDsArray, fields="id, balance(format:DEC)")
+    return {accountID: int(account["balance"]) for accountID, account in result.items()}
+
 # ==============================================================================
 #
 def getMessageGraphQL(tonClient: TonClient, messageID, fields):
@@ -340,6 +1032,7 @@ def unwrapMessages(tonClient: TonClient, messageIdArray, abiFilesArray):
 
     arrayMsg    = []
     abiRegistry = []
+    treeMsgs    = []
     msgFilters  = "id, src, dst, body, dst_transaction{id}, value(format:DEC), ihr_fee(format:DEC), import_fee(format:DEC), fwd_fee(format:DEC)"
     txFilters   = "id, status, status_name, end_status, out_msgs, outmsg_cnt, aborted, compute{exit_arg, exit_code, skipped_reason, skipped_reason_name, gas_fees(format:DEC)}, total_fees(format:DEC), storage{storage_fees_collected(format:DEC)}"
 
@@ -349,44 +1042,142 @@ def unwrapMessages(tonClient: TonClient, messageIdArray, abiFilesArray):
     for initialMsg in messageIdArray:
         treeParams = ParamsOfQueryTransactionTree(in_msg=initialMsg, abi_registry=abiRegistry)
         treeResult = tonClient.net.query_transaction_tree(params=treeParams)
-
-        for msg in treeResult.messages:
-            resultMsg            = getMessageGraphQL(tonClient, msg.id, msgFilters)
-            resultTx             = getTransactionGraphQL(tonClient, msg.id, txFilters)
-            (abi, resultMsgBody) = decodeMessageBody(resultMsg["body"], abiFilesArray)
-
-            elm = [{
-                "SOURCE":             resultMsg["src"],
-                "DEST":               resultMsg["dst"] if resultMsg["dst"] != "" else "---",
-                "VALUE":              resultMsg["value"],
-                "FEES":               {"ihr_fee":resultMsg["ihr_fee"], "import_fee":resultMsg["import_fee"], "fwd_fee":resultMsg["fwd_fee"]},
-                "MESSAGE_ID:":        msg.id,
-                "PARENT_TX_ID:":      msg.src_transaction_id,
-                "TARGET_ABI":         abi,
-                "CALL_TYPE":          resultMsgBody.body_type if resultMsgBody != "" else "---",
-                "FUNCTION_NAME":      resultMsgBody.name      if resultMsgBody != "" else "---",
-                "FUNCTION_PARAMS":    resultMsgBody.value     if resultMsgBody != "" else "---",
-                "MSG_HEADER":         resultMsgBody.header    if resultMsgBody != "" else "---",
-                "OUT_MSGS":           resultTx["out_msgs"]    if resultTx      != "" else [],
-                "OUT_MSG_CNT":        resultTx["outmsg_cnt"]  if resultTx      != "" else 0,
-                "TX_DETAILS":         resultTx                if resultTx      != "" else "---"
-            }]
-            arrayMsg += elm
+        treeMsgs  += treeResult.messages
+
+    # two bulk queries for the whole tree instead of two queries per message
+    messageIDs = [msg.id for msg in treeMsgs]
+    messages   = queryCollectionIn(tonClient=tonClient, collection="messages",     keyField="id",     keysArray=messageIDs, fields=msgFilters)
+    txs        = queryCollectionIn(tonClient=tonClient, collection="transactions", keyField="in_msg", keysArray=messageIDs, fields="in_msg, " + txFilters)
+
+    for msg in treeMsgs:
+        resultMsg            = messages[msg.id]
+        resultTx             = dict(txs[msg.id]) if msg.id in txs else ""
+        (abi, resultMsgBody) = decodeMessageBody(resultMsg["body"], abiFilesArray)
+        if resultTx != "":
+            del resultTx["in_msg"]
+
+        elm = [{
+            "SOURCE":             resultMsg["src"],
+            "DEST":               resultMsg["dst"] if resultMsg["dst"] != "" else "---",
+            "VALUE":              resultMsg["value"],
+            "FEES":               {"ihr_fee":resultMsg["ihr_fee"], "import_fee":resultMsg["import_fee"], "fwd_fee":resultMsg["fwd_fee"]},
+            "MESSAGE_ID:":        msg.id,
+            "PARENT_TX_ID:":      msg.src_transaction_id,
+            "TARGET_ABI":         abi,
+            "CALL_TYPE":          resultMsgBody.body_type if resultMsgBody != "" else "---",
+            "FUNCTION_NAME":      resultMsgBody.name      if resultMsgBody != "" else "---",
+            "FUNCTION_PARAMS":    resultMsgBody.value     if resultMsgBody != "" else "---",
+            "MSG_HEADER":         resultMsgBody.header    if resultMsgBody != "" else "---",
+            "OUT_MSGS":           resultTx["out_msgs"]    if resultTx      != "" else [],
+            "OUT_MSG_CNT":        resultTx["outmsg_cnt"]  if resultTx      != "" else 0,
+            "TX_DETAILS":         resultTx                if resultTx      != "" else "---"
+        }]
+        arrayMsg += elm
 
     return arrayMsg
 
+# ==============================================================================
+# Wrapper attribute that is computed on first access and then kept on the instance (assigning it still works);
+# with "memoKey" the value is shared by every instance with the same key, e.g. same contract and static vars;
+# memo is LRU, values are computed outside the lock (two threads may both compute the same one);
+# time spent is collected per (wrapper, attribute), see "getWrapperProfile";
+WRAPPER_MEMO         = OrderedDict()
+WRAPPER_MEMO_SIZE    = 4096
+WRAPPER_MEMO_LOCK    = threading.Lock()
+WRAPPER_PROFILE      = {}
+WRAPPER_PROFILE_LOCK = threading.Lock()
+
+def freezeValue(value):
+    if isinstance(value, dict):
+        return tuple(sorted((key, freezeValue(item)) for (key, item) in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freezeValue(item) for item in value)
+    return value
+
+class LazyAttribute(object):
+    def __init__(self, compute, memoKey = None):
+        self.COMPUTE  = compute
+        self.MEMO_KEY = memoKey
+        self.NAME     = None
+
+    def __set_name__(self, owner, name):
+        self.NAME = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        started = time.perf_counter()
+        key     = None if self.MEMO_KEY is None else (self.NAME, self.MEMO_KEY(instance))
+        value   = None
+        if key is not None:
+            with WRAPPER_MEMO_LOCK:
+                value = WRAPPER_MEMO.get(key)
+                if value is not None:
+                    WRAPPER_MEMO.move_to_end(key)
+        memoHit = value is not None
+        if not memoHit:
+            value = self.COMPUTE(instance)
+            if key is not None:
+                with WRAPPER_MEMO_LOCK:
+                    WRAPPER_MEMO[key] = value
+                    WRAPPER_MEMO.move_to_end(key)
+                    while len(WRAPPER_MEMO) > WRAPPER_MEMO_SIZE:
+                        WRAPPER_MEMO.popitem(last=False)
+
+        instance.__dict__[self.NAME] = value
+        with WRAPPER_PROFILE_LOCK:
+            entry = WRAPPER_PROFILE.setdefault((type(instance).__name__, self.NAME), {"computed": 0, "memoHits": 0, "seconds": 0.0})
+            entry["memoHits" if memoHit else "computed"] += 1
+            entry["seconds"] += time.perf_counter() - started
+        return value
+
+def getWrapperProfile():
+    with WRAPPER_PROFILE_LOCK:
+        return {key: dict(entry) for (key, entry) in WRAPPER_PROFILE.items()}
+
+def clearWrapperProfile():
+    with WRAPPER_PROFILE_LOCK:
+        WRAPPER_PROFILE.clear()
+    with WRAPPER_MEMO_LOCK:
+        WRAPPER_MEMO.clear()
+
+# One line per (wrapper, attribute) and a total per wrapper, slowest wrapper first
+def formatWrapperProfile():
+    profile = getWrapperProfile()
+    totals  = {}
+    for ((wrapper, _), entry) in profile.items():
+        totals[wrapper] = totals.get(wrapper, 0.0) + entry["seconds"]
+
+    lines = ["{:<32} {:<12} {:>8} {:>9} {:>9}".format("Wrapper", "Attribute", "Computed", "MemoHits", "Seconds")]
+    for wrapper in sorted(totals, key=lambda name: -totals[name]):
+        for ((name, attribute), entry) in sorted(profile.items()):
+            if name == wrapper:
+                lines.append("{:<32} {:<12} {:>8} {:>9} {:>9.3f}".format(wrapper, attribute, entry["computed"], entry["memoHits"], entry["seconds"]))
+        lines.append("{:<32} {:<12} {:>8} {:>9} {:>9.3f}".format(wrapper, "(total)", "", "", totals[wrapper]))
+    return "\n".join(lines)
+
+# Address derivation memoized per (contract, pubkey, static vars)
+def lazyAddress():
+    return LazyAttribute(lambda self: getAddressWithCode(abiPath=self.ABI, tvcPath=self.TVC, code=None, initialPubkey=self.PUBKEY, initialData=self.INITDATA),
+                         memoKey=lambda self: (os.path.abspath(self.TVC), self.PUBKEY, freezeValue(self.INITDATA)))
+
+def lazySigner():
+    return LazyAttribute(lambda self: generateSigner())
+
 # ==============================================================================
 #
 class BaseContract(object):
+    ADDRESS = lazyAddress()
+
     def __init__(self, tonClient: TonClient, contractName: str, signer: Signer, pubkey: str = ZERO_PUBKEY):
         self.SIGNER      = signer
-        self.TONCLIENT   = tonClient
+        self.TONCLIENT   = getClient() if tonClient is None else tonClient
         self.ABI         = "../bin/" + contractName + ".abi.json"
         self.TVC         = "../bin/" + contractName + ".tvc"
         self.CONSTRUCTOR = {}
         self.INITDATA    = {}
         self.PUBKEY      = pubkey
-        self.ADDRESS     = getAddress(abiPath=self.ABI, tvcPath=self.TVC, signer=self.SIGNER, initialPubkey=self.PUBKEY, initialData=self.INITDATA)
     
     # ========================================
     #
@@ -403,7 +1194,7 @@ class BaseContract(object):
         return result
 
     def getBalance(self):
-        result = getAccountGraphQL(tonClient=self.TONCLIENT, accountID=self.ADDRESS, fields="balance(format:DEC)")
+        result = getAccountsLoader(tonClient=self.TONCLIENT, fields="id, balance(format:DEC)").load(self.ADDRESS)
         return int(result["balance"])
 
 # ==============================================================================
@@ -414,7 +1205,6 @@ class SetcodeMultisigNew(BaseContract):
 
         BaseContract.__init__(self, tonClient=tonClient, contractName="SetcodeMultisigWallet", pubkey=msigSigner.keys.public, signer=msigSigner)
         self.CONSTRUCTOR = {"owners":["0x" + self.SIGNER.keys.public],"reqConfirms":"1"}
-        self.ADDRESS     = getAddress(abiPath=self.ABI, tvcPath=self.TVC, signer=self.SIGNER, initialPubkey=self.PUBKEY, initialData=self.INITDATA)
 
     def callTransfer(self, addressDest, value, payload, flags):
         result = self._call(functionName="sendTransaction", functionParams={"dest":addressDest, "value":value, "bounce":False, "flags":flags, "payload":payload})
@@ -425,15 +1215,18 @@ class SetcodeMultisigNew(BaseContract):
 #
 
 class SetcodeMultisig(object):
+    SIGNER      = lazySigner()
+    CONSTRUCTOR = LazyAttribute(lambda self: {"owners":["0x" + self.SIGNER.keys.public],"reqConfirms":"1"})
+    PUBKEY      = LazyAttribute(lambda self: self.SIGNER.keys.public)
+    ADDRESS     = lazyAddress()
+
     def __init__(self, tonClient: TonClient, signer: Signer = None):
-        self.SIGNER      = generateSigner() if signer is None else signer
-        self.TONCLIENT   = tonClient
+        if signer is not None:
+            self.SIGNER  = signer
+        self.TONCLIENT   = getClient() if tonClient is None else tonClient
         self.ABI         = "../bin/SetcodeMultisigWallet.abi.json"
         self.TVC         = "../bin/SetcodeMultisigWallet.tvc"
-        self.CONSTRUCTOR = {"owners":["0x" + self.SIGNER.keys.public],"reqConfirms":"1"}
         self.INITDATA    = {}
-        self.PUBKEY      = self.SIGNER.keys.public
-        self.ADDRESS     = getAddress(abiPath=self.ABI, tvcPath=self.TVC, signer=self.SIGNER, initialPubkey=self.SIGNER.keys.public, initialData=self.INITDATA)
 
     def deploy(self):
         result = deployContract(tonClient=self.TONCLIENT, abiPath=self.ABI, tvcPath=self.TVC, constructorInput=self.CONSTRUCTOR, initialData=self.INITDATA, signer=self.SIGNER, initialPubkey=self.PUBKEY)
@@ -447,6 +1240,17 @@ class SetcodeMultisig(object):
         result = self.call(functionName="sendTransaction", functionParams={"dest":addressDest, "value":value, "bounce":False, "flags":flags, "payload":payload})
         return result
 
+    # "callFunctionPipelined" item for a transfer, plain arguments that suit the async one as well
+    def getTransferCall(self, addressDest, value, payload, flags):
+        return {"abiPath":self.ABI, "contractAddress":self.ADDRESS, "functionName":"sendTransaction", "signer":self.SIGNER,
+            "functionParams":{"dest":addressDest, "value":value, "bounce":False, "flags":flags, "payload":payload}}
+
+    # Signed "sendTransaction" ready to be sent with sendPrebuiltMessage
+    def prebuildTransfer(self, addressDest, value, payload, flags, expire: int):
+        result = prebuildMessage(tonClient=self.TONCLIENT, abiPath=self.ABI, contractAddress=self.ADDRESS, functionName="sendTransaction",
+            functionParams={"dest":addressDest, "value":value, "bounce":False, "flags":flags, "payload":payload}, signer=self.SIGNER, expire=expire)
+        return result
+
     def run(self, functionName, functionParams):
         result = runFunction(tonClient=self.TONCLIENT, abiPath=self.ABI, contractAddress=self.ADDRESS, functionName=functionName, functionParams=functionParams)
         return result
@@ -463,10 +1267,10 @@ def giverGetAddress():
     global MSIG_GIVER
 
     if MSIG_GIVER == "":
-        return "0:841288ed3b55d9cdafa806807f02a0ae0c169aa5edfe88a789a6482429756a94"
+        return LOCAL_GIVER_ADDRESS
     else:
         signer = loadSigner(MSIG_GIVER)
-        msig   = SetcodeMultisig(tonClient=TonClient(config=ClientConfig()), signer=signer)
+        msig   = SetcodeMultisig(tonClient=getClient(), signer=signer)
         return msig.ADDRESS
 
 def giverGive(tonClient: TonClient, contractAddress, amountTons):
@@ -482,7 +1286,7 @@ def giverGive(tonClient: TonClient, contractAddress, amountTons):
         callFunction(tonClient, "../bin/local_giver.abi.json", giverAddress, "sendGrams", {"dest":contractAddress,"amount":amountTons}, Signer.NoSigner())
     else:
         signer = loadSigner(MSIG_GIVER)
-        msig   = SetcodeMultisig(signer=signer)
+        msig   = SetcodeMultisig(tonClient=tonClient, signer=signer)
         msig.callTransfer(addressDest=contractAddress, value=amountTons, payload="", flags=1)
 
 # ==============================================================================
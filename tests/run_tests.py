@@ -4,25 +4,46 @@
 # 
 import freeton_utils
 from   freeton_utils import *
+import atexit
 import binascii
+import io
 import unittest
 import time
 import sys
+import os
+import asyncio
+import tempfile
+import threading
 from   pathlib import Path
 from   pprint import pprint
-from   contract_AuctionManagerDnsRecord import AuctionManagerDnsRecord
-from   contract_AuctionDnsRecord        import AuctionDnsRecord
+from   concurrent.futures import ThreadPoolExecutor
+from   contract_AuctionManagerDnsRecord import AuctionManagerDnsRecord, AsyncAuctionManagerDnsRecord
+from   contract_AuctionDnsRecord        import AuctionDnsRecord, AsyncAuctionDnsRecord
+from   async_freeton_utils              import AsyncSetcodeMultisig, getAsyncClient
 from   contract_AuctionDebot            import AuctionDebot
 from   contract_DnsRecordTEST           import DnsRecordTEST
+from   freeton_scheduler                import BlindBidScheduler, TimerWheel
+from   freeton_events                   import EventStream, LocalEventClient, BidReceived, AuctionCancelled
+from   freeton_models                   import AuctionInfo, AuctionType, BidInfo, DnsWhois, SnapshotTable
+from   freeton_simulator                import SimulatedNetwork, VirtualClock, getPriceHash
+from   freeton_local                    import LOCAL_BLOCK_DELAY
+from   freeton_indexer                  import AuctionIndexer
+from   freeton_codec                    import CodecService
+import freeton_pricing
+from   freeton_pricing                  import PriceSnapshot, PriceTable, getDesiredPrice, getDesiredPrices, UINT128_MAX, PRICE_UNAVAILABLE
+from   freeton_boc                      import CellBuilder, cellToBoc
+from   freeton_errors                   import TonError, AuctionError, classifyError, ERROR_CLASS_NONE, ERROR_CLASS_TRANSIENT, ERROR_CLASS_EXPIRED, ERROR_CLASS_CONTRACT, ERROR_CLASS_PERMANENT
 
 #TON  = 1000000000
 #DIME =  100000000
 SERVER_ADDRESS = "https://net.ton.dev"
+freeton_utils.SERVER_ADDRESS = SERVER_ADDRESS
+PARALLEL_WORKERS = 0 # 0 is the plain serial unittest run
 
 # ==============================================================================
 #
 def getClient():
-    return TonClient(config=ClientConfig(network=NetworkConfig(server_address=SERVER_ADDRESS)))
+    return freeton_utils.getClient(SERVER_ADDRESS)
 
 # ==============================================================================
 # 
@@ -38,9 +59,16 @@ for _, arg in enumerate(sys.argv[1:]):
         freeton_utils.THROW = True
         sys.argv.remove(arg)
 
-    if arg.startswith("http"):
+    if arg == "--boc-cache":
+        
+        freeton_utils.USE_BOC_CACHE = True
+        sys.argv.remove(arg)
+
+    # "local://<name>" runs everything against the in-memory chain of freeton_local
+    if arg.startswith("http") or isLocalAddress(arg):
         
         SERVER_ADDRESS = arg
+        freeton_utils.SERVER_ADDRESS = arg
         sys.argv.remove(arg)
 
     if arg.startswith("--msig-giver"):
@@ -48,6 +76,18 @@ for _, arg in enumerate(sys.argv[1:]):
         freeton_utils.MSIG_GIVER = arg[13:]
         sys.argv.remove(arg)
 
+    # "--parallel" or "--parallel=<workers>"
+    if arg.startswith("--parallel"):
+        
+        PARALLEL_WORKERS = int(arg[11:]) if arg.startswith("--parallel=") else 8
+        sys.argv.remove(arg)
+
+    # time spent computing wrapper CODE/INITDATA/ADDRESS/..., printed at exit
+    if arg == "--startup-profile":
+
+        atexit.register(lambda: print(freeton_utils.formatWrapperProfile()))
+        sys.argv.remove(arg)
+
 # ==============================================================================
 # EXIT CODE FOR SINGLE-MESSAGE OPERATIONS
 # we know we have only 1 internal message, that's why this wrapper has no filters
@@ -72,36 +112,890 @@ def readBinaryFile(fileName):
 def chunkstring(string, length):
     return list(string[0+i:length+i] for i in range(0, len(string), length))
 
+# ==============================================================================
+# Funded and deployed multisigs, a domain owned by the first one and a manager, all on their own "local://<name>" chain;
+# returns (tonClient, msigs, domain, manager)
+def deployLocalFixture(name: str, msigsCount: int = 2):
+    tonClient = freeton_utils.getClient("local://" + name)
+    msigs     = [SetcodeMultisig(tonClient=tonClient) for _ in range(msigsCount)]
+    domain    = DnsRecordTEST(tonClient=tonClient, name=name)
+    manager   = AuctionManagerDnsRecord(tonClient=tonClient, ownerAddress=msigs[0].ADDRESS, bidCode=getCodeFromTvc("../bin/AuctionBid.tvc"), auctionCode=getCodeFromTvc("../bin/AuctionDnsRecord.tvc"))
+
+    for msig in msigs:
+        giverGive(tonClient, msig.ADDRESS, TON * 100)
+        msig.deploy()
+    for contract in [domain, manager]:
+        giverGive(tonClient, contract.ADDRESS, TON * 1)
+    domain.deploy(ownerAddress=msigs[0].ADDRESS)
+    manager.deploy()
+    return (tonClient, msigs, domain, manager)
+
+# "createAuctionDnsRecord" arguments of an English forward auction that starts right away
+def getEnglishAuctionSpec(sellerAddress: str, assetAddress: str, dtNow: int):
+    return {"sellerAddress":sellerAddress, "buyerAddress":ZERO_ADDRESS, "assetAddress":assetAddress, "auctionType":0, "dtStart":dtNow + 1,
+        "feeValue":DIME*5, "minBid":TON, "minPriceStep":TON, "buyNowPrice":TON*6, "dtEnd":dtNow + 170, "dtRevealEnd":0, "dutchCycle":0}
+
+# AuctionDnsRecord wrapper for "spec" (constructor values only matter for deploying it directly)
+def getAuctionForSpec(tonClient, spec, auctionClass = None):
+    return (AuctionDnsRecord if auctionClass is None else auctionClass)(tonClient, sellerAddress=spec["sellerAddress"], buyerAddress=spec["buyerAddress"],
+        assetAddress=spec["assetAddress"], auctionType=spec["auctionType"], dtStart=spec["dtStart"], escrowAddress=spec["sellerAddress"], escrowPercent=0,
+        feeValue=spec["feeValue"], minBid=spec["minBid"], minPriceStep=spec["minPriceStep"], buyNowPrice=spec["buyNowPrice"], dtEnd=spec["dtEnd"],
+        dtRevealEnd=spec["dtRevealEnd"], dutchCycle=spec["dutchCycle"])
+
+# ==============================================================================
+# Mixed in before unittest.TestCase by the offline scenarios that run against deployLocalFixture(FIXTURE, MSIGS)
+class LocalFixture(object):
+
+    FIXTURE = ""
+    MSIGS   = 2
+
+    @classmethod
+    def setUpClass(cls):
+        (cls.tonClient, cls.msigs, cls.domain, cls.manager) = deployLocalFixture(cls.FIXTURE, msigsCount=cls.MSIGS)
+        cls.msig  = cls.msigs[0]
+        cls.msig2 = cls.msigs[1] if len(cls.msigs) > 1 else None
+        cls.dtNow = getNowTimestamp()
+
+    # Auction for "spec" created by the first multisig, holding the fixture domain
+    @classmethod
+    def startAuction(cls, spec):
+        auction = getAuctionForSpec(cls.tonClient, spec)
+        cls.manager.createAuctionDnsRecord(msig=cls.msig, value=TON, **spec)
+        cls.domain.callFromMultisig(msig=cls.msig, functionName="changeOwner", functionParams={"newOwnerAddress": auction.ADDRESS}, value=DIME, flags=1)
+        auction.receiveAsset(msig=cls.msig, value=DIME)
+        return auction
+
 # ==============================================================================
 # 
+class Test_00_OfflineAddresses(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.msig    = SetcodeMultisig(tonClient=getClient())
+        cls.domain  = DnsRecordTEST(tonClient=getClient(), name="kek")
+        cls.dtNow   = getNowTimestamp()
+
+        cls.auction = AuctionDnsRecord(
+            tonClient     = getClient(), 
+            # statics
+            sellerAddress = cls.msig.ADDRESS, 
+            buyerAddress  = ZERO_ADDRESS,
+            assetAddress  = cls.domain.ADDRESS, 
+            auctionType   = 0, # ENGLISH_FORWARD 
+            dtStart       = cls.dtNow + 1,
+            # constructor
+            escrowAddress = cls.msig.ADDRESS, 
+            escrowPercent = 500,
+            feeValue      = DIME*5,
+            minBid        = TON,
+            minPriceStep  = TON, 
+            buyNowPrice   = TON*6, 
+            dtEnd         = cls.dtNow+170,
+            dtRevealEnd   = 0, # it is not blind auction
+            dutchCycle    = 0) # it is not dutch auction
+
+        cls.manager = AuctionManagerDnsRecord(tonClient=getClient(), ownerAddress=cls.msig.ADDRESS, bidCode=getCodeFromTvc(cls.auction.TVC_BID), auctionCode=getCodeFromTvc(cls.auction.TVC))
+
+    def test_0(self):
+        print("\n\n----------------------------------------------------------------------")
+        print("Running:", self.__class__.__name__)
+
+    # 1. Wrappers addresses are the same as SDK ones
+    def test_1(self):
+        for contract in [self.msig, self.domain, self.auction, self.manager]:
+            sdkAddress = getAddressFromSdk(abiPath=contract.ABI, tvcPath=contract.TVC, signer=contract.SIGNER, initialPubkey=contract.PUBKEY, initialData=contract.INITDATA)
+            self.assertEqual(contract.ADDRESS, sdkAddress)
+
+        # names longer than one cell are chained, first 127 bytes in the root
+        for length in [126, 127, 128, 129, 200, 254, 255, 300]:
+            contract   = DnsRecordTEST(tonClient=getClient(), name="k" * length)
+            sdkAddress = getAddressFromSdk(abiPath=contract.ABI, tvcPath=contract.TVC, signer=contract.SIGNER, initialPubkey=contract.PUBKEY, initialData=contract.INITDATA)
+            self.assertEqual(contract.ADDRESS, sdkAddress, "name of {} bytes".format(length))
+
+        # pubkey taken from the signer when there is no "initialPubkey"
+        keys = getClient().crypto.generate_random_sign_keys()
+        for signer in [Signer.Keys(keys), Signer.External(keys.public), Signer.NoSigner()]:
+            self.assertEqual(getAddress(abiPath=self.msig.ABI, tvcPath=self.msig.TVC, signer=signer, initialPubkey="", initialData={}),
+                getAddressFromSdk(abiPath=self.msig.ABI, tvcPath=self.msig.TVC, signer=signer, initialPubkey=None, initialData={}))
+
+    # 2. calculateAuctionInit and calculateBidInit
+    def test_2(self):
+        address = self.manager.calculateAuctionAddress(sellerAddress=self.msig.ADDRESS, buyerAddress=ZERO_ADDRESS, assetAddress=self.domain.ADDRESS, auctionType=0, dtStart=self.dtNow + 1)
+        self.assertEqual(address, self.auction.ADDRESS)
+
+        signer     = Signer.Keys(KeyPair(ZERO_PUBKEY, ZERO_PUBKEY))
+        sdkAddress = getAddressFromSdk(abiPath=self.auction.ABI_BID, tvcPath=self.auction.TVC_BID, signer=signer, initialPubkey=ZERO_PUBKEY, 
+            initialData={"_auctionAddress":self.auction.ADDRESS, "_bidderAddress":self.msig.ADDRESS})
+        self.assertEqual(self.auction.calculateBidAddress(self.msig.ADDRESS), sdkAddress)
+
+    # 3. Wrappers compute nothing until asked, addresses are memoized per (contract, static vars)
+    def test_3(self):
+        first  = DnsRecordTEST(tonClient=getClient(), name="lazy")
+        second = DnsRecordTEST(tonClient=getClient(), name="lazy")
+        self.assertNotIn("ADDRESS", vars(first))
+        self.assertNotIn("CODE",    vars(first))
+
+        self.assertEqual(first.ADDRESS, second.ADDRESS)
+        self.assertNotEqual(first.ADDRESS, DnsRecordTEST(tonClient=getClient(), name="lazy2").ADDRESS)
+        self.assertGreaterEqual(freeton_utils.getWrapperProfile()[("DnsRecordTEST", "ADDRESS")]["memoHits"], 1)
+
+    # 4. The memo is bounded and shared by threads
+    def test_4(self):
+        names = ["memo{}".format(index) for index in range(8)]
+        size  = freeton_utils.WRAPPER_MEMO_SIZE
+        freeton_utils.WRAPPER_MEMO_SIZE = 4
+        try:
+            expected = [DnsRecordTEST(tonClient=getClient(), name=name).ADDRESS for name in names]
+            self.assertEqual(len(freeton_utils.WRAPPER_MEMO), 4)
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                addresses = list(executor.map(lambda name: DnsRecordTEST(tonClient=getClient(), name=name).ADDRESS, names * 4))
+            self.assertEqual(addresses, expected * 4)
+            self.assertLessEqual(len(freeton_utils.WRAPPER_MEMO), 4)
+        finally:
+            freeton_utils.WRAPPER_MEMO_SIZE = size
+
+# ==============================================================================
+#
+class Test_00_OfflineEvents(unittest.TestCase):
+
+    auctions = [ZERO_ADDRESS[:-4] + "%04x" % index for index in range(1, 601)]
+    bidder   = "0:" + "7" * 64
+
+    def test_0(self):
+        print("\n\n----------------------------------------------------------------------")
+        print("Running:", self.__class__.__name__)
+
+    # 1. Events of many auctions through a small queue: nothing lost, nothing duplicated
+    def test_1(self):
+        async def _run():
+            client = LocalEventClient()
+            stream = EventStream(tonClient=client, addresses=self.auctions, maxSize=10)
+            await stream.start()
+            for index, address in enumerate(self.auctions):
+                client.net.publishEvent(auctionAddress=address, eventName="bidReceived", values={"bidderAddress":self.bidder, "amount":TON + index})
+            client.net.publishEvent(auctionAddress=self.auctions[0], eventName="auctionCancelled", values={})
+
+            events = [await asyncio.wait_for(stream.get(), 10) for _ in range(len(self.auctions) + 1)]
+            await stream.stop()
+            return (events, stream.getStats())
+
+        (events, stats) = asyncio.run(_run())
+        bids = [event for event in events if isinstance(event, BidReceived)]
+        self.assertEqual(sorted(event.amount for event in bids), [TON + index for index in range(len(self.auctions))])
+        self.assertEqual({event.bidderAddress for event in bids}, {self.bidder})
+        self.assertEqual(len([event for event in events if isinstance(event, AuctionCancelled)]), 1)
+        self.assertGreater(stats["pauses"], 0)
+
+# ==============================================================================
+# Process pool codec gives what the same calls give in-process, in the input order
+class Test_00_OfflineCodec(unittest.TestCase):
+
+    abis  = ["../bin/DnsRecord.abi.json", "../bin/AuctionDnsRecord.abi.json"]
+    calls = [("../bin/DnsRecord.abi.json", "changeOwner", {"newOwnerAddress": ZERO_ADDRESS[:-4] + "%04x" % index}) for index in range(1, 6)] + \
+            [("../bin/AuctionDnsRecord.abi.json", "bid", {})] * 2
+
+    @classmethod
+    def setUpClass(cls):
+        cls.codec = CodecService(maxWorkers=2, batchSize=3)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.codec.close()
+
+    def test_0(self):
+        print("\n\n----------------------------------------------------------------------")
+        print("Running:", self.__class__.__name__)
+
+    # 1. Bodies encode and decode as with prepareMessageBoc/decodeMessageBody
+    def test_1(self):
+        bodies = self.codec.encodeBodies(self.calls)
+        self.assertEqual(bodies, [prepareMessageBoc(abiPath=abiPath, functionName=functionName, functionParams=functionParams) for (abiPath, functionName, functionParams) in self.calls])
+
+        decoded  = self.codec.decodeBodies(bodies + [""], self.abis)
+        expected = [decodeMessageBody(body, self.abis) for body in bodies + [""]]
+        self.assertEqual([(abi, result.name, result.value) for (abi, result) in decoded[:-1]], [(abi, result.name, result.value) for (abi, result) in expected[:-1]])
+        self.assertEqual([(abi, result.name) for (abi, result) in decoded[:-1]], [(abiPath, functionName) for (abiPath, functionName, _) in self.calls])
+        self.assertEqual(decoded[-1], ("", ""))
+
+        stats = self.codec.getStats()
+        self.assertEqual((stats["encodeBody"]["items"], stats["encodeBody"]["batches"]), (7, 3))
+        self.assertEqual((stats["decode"]["items"],     stats["decode"]["batches"]),     (8, 3))
+
+    # 2. Signatures match the in-process ones
+    def test_2(self):
+        keys     = getClient().crypto.generate_random_sign_keys()
+        unsigned = [base64.b64encode(("message %d" % index).encode()).decode() for index in range(4)]
+        self.assertEqual(self.codec.sign(unsigned, keys), [getClient().crypto.sign(params=ParamsOfSign(unsigned=item, keys=keys)).signature for item in unsigned])
+
+# ==============================================================================
+#
+class Test_00_OfflineModels(LocalFixture, unittest.TestCase):
+
+    FIXTURE = "models"
+    decoded = {
+        "escrowAddress":ZERO_ADDRESS, "escrowPercent":"500",       "sellerAddress":ZERO_ADDRESS,  "buyerAddress":ZERO_ADDRESS, "assetAddress":ZERO_ADDRESS,
+        "auctionType":"2",            "minBid":"0x3b9aca00",       "minPriceStep":"100000000",    "buyNowPrice":str(2**127),   "dtStart":"1000",
+        "dtEnd":"2000",               "dtRevealEnd":"0",           "dutchCycle":"10",             "assetReceived":True,        "auctionStarted":True,
+        "auctionSucceeded":False,     "moneySentOut":False,        "assetDelivered":False,        "currentBuyer":ZERO_ADDRESS, "currentBuyPrice":"0",
+        "currentBuyDT":"0",           "currentBlindBets":"0"}
+
+    def test_0(self):
+        print("\n\n----------------------------------------------------------------------")
+        print("Running:", self.__class__.__name__)
+
+    # 1. Parsed once, typed values; columnar table gives back the same rows
+    def test_1(self):
+        info = AuctionInfo.fromDecoded(self.decoded, address=ZERO_ADDRESS)
+        self.assertEqual(info.auctionType, AuctionType.DUTCH_FORWARD)
+        self.assertEqual(info["minBid"], TON)
+        self.assertEqual(info.buyNowPrice, 2**127)
+
+        table = SnapshotTable(AuctionInfo, [info] * 1000)
+        self.assertEqual(len(table), 1000)
+        self.assertEqual(table[999], info)
+        self.assertEqual(list(table.getColumn("dtEnd")), [2000] * 1000)
+
+    # 2. Varied rows come back as they went in, wide integers are kept as 64-bit words and stay distinct above 2**64
+    def test_2(self):
+        prices    = [0, 2**64 - 1, 2**64, 2**64 + 1, 2**127 + 5, 2**128 - 1]
+        addresses = [ZERO_ADDRESS[:-4] + "%04x" % index for index in range(len(prices))]
+        rows      = [AuctionInfo.fromDecoded(dict(self.decoded, buyNowPrice=str(price), currentBuyer=addresses[index], auctionType=str(index % 5),
+            dtEnd=str(2000 + index), assetReceived=index % 2 == 0), address=addresses[-1 - index]) for (index, price) in enumerate(prices)]
+
+        table = SnapshotTable(AuctionInfo, rows)
+        self.assertEqual(list(table), rows)
+        self.assertEqual(table[-1], rows[-1])
+        self.assertEqual(table.getColumn("buyNowPrice"), prices)
+        self.assertEqual(table.getColumn("address"), addresses[::-1])
+        self.assertEqual(table.getColumn("auctionType"), [AuctionType(index % 5) for index in range(len(prices))])
+        self.assertEqual(table.getIndexes("buyNowPrice", 2**64), [2])
+        self.assertEqual([list(words) for words in table.COLUMNS["buyNowPrice"]], [[price & (2**64 - 1) for price in prices], [price >> 64 for price in prices]])
+
+        hashes = [2**256 - 1, 2**192, 2**192 + 1, 2**64, 1]
+        bids   = SnapshotTable(BidInfo, [BidInfo(address=ZERO_ADDRESS, auctionAddress=ZERO_ADDRESS, bidderAddress=addresses[0], feeValue=DIME, priceHash=value, dt=index)
+            for (index, value) in enumerate(hashes)])
+        self.assertEqual(len(bids.COLUMNS["priceHash"]), 4)
+        self.assertEqual(bids.getColumn("priceHash"), hashes)
+
+    # 3. An address is stored once whichever rows and columns it appears in
+    def test_3(self):
+        (first, second) = (ZERO_ADDRESS[:-4] + "aaaa", ZERO_ADDRESS[:-4] + "bbbb")
+        rows  = [dict(self.decoded, sellerAddress=first, currentBuyer=second), dict(self.decoded, sellerAddress=second, buyerAddress=first, currentBuyer=first)]
+        table = SnapshotTable(AuctionInfo)
+        table.extend(rows, [second, first])
+
+        self.assertEqual(sorted(table.ADDRESSES), sorted([ZERO_ADDRESS, first, second]))
+        self.assertEqual(table.COLUMNS["sellerAddress"][0], table.COLUMNS["currentBuyer"][1])
+        self.assertEqual(table.COLUMNS["sellerAddress"][1], table.COLUMNS["address"][0])
+        self.assertIs(table[0].sellerAddress, table[1].currentBuyer)
+        self.assertEqual((table[1].buyerAddress, table[1].address), (first, first))
+
+    # 4. Every model decodes what its getter returns on a local chain, and survives a SnapshotTable round trip
+    def test_4(self):
+        spec    = dict(getEnglishAuctionSpec(sellerAddress=self.msig.ADDRESS, assetAddress=self.domain.ADDRESS, dtNow=self.dtNow),
+            auctionType=1, minPriceStep=0, buyNowPrice=0, dtRevealEnd=self.dtNow + 340)
+        auction = self.startAuction(spec)
+        price   = TON*2
+        salt    = generateSalt()
+        self.assertEqual(auction.bidBlind(msig=self.msig2, value=TON*2, priceHash=getHashFromPrice(price=price, salt=salt))[1]["errorCode"], 0)
+
+        decoded = auction.getInfo()
+        info    = AuctionInfo.fromDecoded(decoded, address=auction.ADDRESS)
+        self.assertEqual((info.auctionType, info.sellerAddress, info.assetAddress, info.dtRevealEnd), (AuctionType.ENGLISH_BLIND, self.msig.ADDRESS, self.domain.ADDRESS, spec["dtRevealEnd"]))
+        self.assertEqual((info.minBid, info.assetReceived, info.currentBlindBets), (TON, True, 1))
+
+        bid = auction.getBidInfo(self.msig2.ADDRESS)
+        self.assertEqual((bid.address, bid.auctionAddress, bid.bidderAddress), (auction.calculateBidAddress(self.msig2.ADDRESS), auction.ADDRESS, self.msig2.ADDRESS))
+        self.assertEqual((bid.feeValue, bid.priceHash), (spec["feeValue"], int(getHashFromPrice(price=price, salt=salt), 0)))
+        self.assertGreater(bid.dt, 0)
+
+        whois = self.domain.getWhois()
+        self.assertEqual((whois.address, whois.ownerAddress, whois.domainName), (self.domain.ADDRESS, auction.ADDRESS, "models"))
+        self.assertIsInstance(whois.dtExpires, int)
+
+        for (model, row) in [(AuctionInfo, info), (BidInfo, bid), (DnsWhois, whois)]:
+            table = SnapshotTable(model, [row])
+            self.assertEqual(list(table), [row])
+        table = SnapshotTable(AuctionInfo)
+        table.append(decoded, address=auction.ADDRESS)
+        self.assertEqual(table[0], info)
+
+# ==============================================================================
+# Vectorized desired prices against the scalar mirror of the getter, with and without NumPy
+class Test_00_OfflinePricing(unittest.TestCase):
+
+    dtStart = 1000
+    small   = [PriceSnapshot(auctionType=0, minBid=TON, minPriceStep=DIME, buyNowPrice=TON*3, dtStart=dtStart, dutchCycle=0, currentBuyPrice=0),
+               PriceSnapshot(auctionType=0, minBid=TON, minPriceStep=DIME, buyNowPrice=TON*3, dtStart=dtStart, dutchCycle=0, currentBuyPrice=TON*2),
+               PriceSnapshot(auctionType=0, minBid=TON, minPriceStep=TON,  buyNowPrice=TON*3, dtStart=dtStart, dutchCycle=0, currentBuyPrice=TON*5//2),
+               PriceSnapshot(auctionType=0, minBid=TON, minPriceStep=DIME, buyNowPrice=0,     dtStart=dtStart, dutchCycle=0, currentBuyPrice=TON*7),
+               PriceSnapshot(auctionType=1, minBid=TON, minPriceStep=DIME, buyNowPrice=TON*3, dtStart=dtStart, dutchCycle=0),
+               PriceSnapshot(auctionType=2, minBid=TON*5, minPriceStep=TON, buyNowPrice=TON, dtStart=dtStart, dutchCycle=60),
+               PriceSnapshot(auctionType=2, minBid=TON*5, minPriceStep=0,   buyNowPrice=TON, dtStart=dtStart, dutchCycle=60),
+               PriceSnapshot(auctionType=2, minBid=0,     minPriceStep=0,   buyNowPrice=TON, dtStart=dtStart, dutchCycle=60),
+               PriceSnapshot(auctionType=2, minBid=TON*5, minPriceStep=TON, buyNowPrice=TON, dtStart=dtStart, dutchCycle=0),
+               PriceSnapshot(auctionType=3, minBid=0, minPriceStep=0, buyNowPrice=TON*4, dtStart=dtStart, dutchCycle=0),
+               PriceSnapshot(auctionType=4, minBid=0, minPriceStep=0, buyNowPrice=TON*4, dtStart=dtStart, dutchCycle=0)]
+    # values past int64 take the object dtype; English step and Dutch discount overflow uint128
+    large   = small + [
+               PriceSnapshot(auctionType=0, minBid=TON, minPriceStep=2**127, buyNowPrice=0, dtStart=dtStart, dutchCycle=0, currentBuyPrice=2**127),
+               PriceSnapshot(auctionType=0, minBid=TON, minPriceStep=2**126, buyNowPrice=0, dtStart=dtStart, dutchCycle=0, currentBuyPrice=2**126),
+               PriceSnapshot(auctionType=2, minBid=UINT128_MAX, minPriceStep=2**127, buyNowPrice=TON, dtStart=dtStart, dutchCycle=1),
+               PriceSnapshot(auctionType=2, minBid=2**100, minPriceStep=2**90, buyNowPrice=2**64 + 1, dtStart=dtStart, dutchCycle=30)]
+    times   = list(range(dtStart - 10, dtStart + 600, 7))
+
+    def test_0(self):
+        print("\n\n----------------------------------------------------------------------")
+        print("Running:", self.__class__.__name__)
+
+    def _checkTable(self, snapshots):
+        expected = [[getDesiredPrice(snapshot, now) for now in self.times] for snapshot in snapshots]
+        table    = PriceTable(snapshots)
+        self.assertEqual([[int(price) for price in row] for row in table.getDesiredPrices(self.times)], expected)
+        for (column, now) in enumerate(self.times[::9]):
+            self.assertEqual([int(price) for price in getDesiredPrices(snapshots, now)], [row[column * 9] for row in expected])
+        return (table, expected)
+
+    # 1. Same prices as the scalar function, int64 columns for small values and object columns past them
+    def test_1(self):
+        if freeton_pricing.numpy is None:
+            self.skipTest("NumPy is not installed")
+        (table, _) = self._checkTable(self.small)
+        self.assertIs(table.DTYPE, freeton_pricing.numpy.int64)
+
+        (table, expected) = self._checkTable(self.large)
+        self.assertIs(table.DTYPE, object)
+        self.assertEqual(set(expected[len(self.small)]), {PRICE_UNAVAILABLE})
+        self.assertNotIn(PRICE_UNAVAILABLE, expected[len(self.small) + 1])
+        self.assertIn(PRICE_UNAVAILABLE, expected[len(self.small) + 2][20:])
+        self.assertEqual(expected[5][0], PRICE_UNAVAILABLE)
+
+    # 2. Without NumPy the same values come back as lists
+    def test_2(self):
+        numpy = freeton_pricing.numpy
+        freeton_pricing.numpy = None
+        try:
+            (table, _) = self._checkTable(self.large)
+            self.assertIsNone(table.DTYPE)
+            self.assertIsInstance(table.getDesiredPrices(self.times), list)
+        finally:
+            freeton_pricing.numpy = numpy
+
+# ==============================================================================
+#
+class Test_00_OfflineSimulator(unittest.TestCase):
+
+    def test_0(self):
+        print("\n\n----------------------------------------------------------------------")
+        print("Running:", self.__class__.__name__)
+
+    # 1. Blind auction from hand-over to delivery, exit codes and balances without a node
+    def test_1(self):
+        network = SimulatedNetwork(VirtualClock(now=1000))
+        seller  = network.addWallet(100*TON)
+        bidders = [network.addWallet(100*TON) for _ in range(3)]
+        asset   = network.addDnsRecord(ownerAddress=seller.ADDRESS, domainName="kek")
+        auction = network.addAuction(seller.ADDRESS, asset.ADDRESS, AuctionType.ENGLISH_BLIND, dtStart=1000, dtEnd=2000, dtRevealEnd=3000, feeValue=TON//2)
+        total   = sum(account.balance for account in network.ACCOUNTS.values())
+
+        self.assertEqual(network.send(seller.ADDRESS, asset.ADDRESS, "changeOwner", TON, newOwnerAddress=auction.ADDRESS), 0)
+        self.assertEqual(network.send(seller.ADDRESS, auction.ADDRESS, "receiveAsset", TON), 0)
+        self.assertTrue(auction.auctionStarted)
+
+        for (index, bidder) in enumerate(bidders):
+            self.assertEqual(network.send(bidder.ADDRESS, auction.ADDRESS, "bidBlind", 2*TON, priceHash=getPriceHash((index + 1) * TON, 42)), 0)
+        self.assertEqual(network.send(seller.ADDRESS, auction.ADDRESS, "cancelAuction", TON), 203)
+
+        network.advance(1500)
+        for (index, bidder) in enumerate(bidders):
+            network.send(bidder.ADDRESS, auction.ADDRESS, "revealBidBlind", (index + 2) * TON, price=(index + 1) * TON, salt=42)
+        self.assertEqual(network.send(seller.ADDRESS, auction.ADDRESS, "finalize", TON), 204)
+
+        network.advance(1000)
+        network.send(seller.ADDRESS, auction.ADDRESS, "finalize", TON)
+        network.send(seller.ADDRESS, auction.ADDRESS, "finalize", TON)
+        info = AuctionInfo.fromDecoded(auction.getInfo(), address=auction.ADDRESS)
+        self.assertEqual((info.currentBuyer, info.currentBuyPrice), (bidders[2].ADDRESS, 3*TON))
+        self.assertEqual(asset.ownerAddress, bidders[2].ADDRESS)
+        self.assertTrue(info.assetDelivered)
+        self.assertEqual(sum(account.balance for account in network.ACCOUNTS.values()), total)
+
+# ==============================================================================
+#
+class Test_00_OfflineChainTime(unittest.TestCase):
+
+    def test_0(self):
+        print("\n\n----------------------------------------------------------------------")
+        print("Running:", self.__class__.__name__)
+
+    # 1. A local chain is fast-forwarded instead of waited for, getters follow it
+    def test_1(self):
+        tonClient = freeton_utils.getClient("local://chaintime")
+        target    = getNowTimestamp() + 3600
+        started   = time.monotonic()
+
+        self.assertGreaterEqual(waitForChainTime(tonClient, target), target)
+        self.assertGreaterEqual(getChainTime(tonClient), target)
+        self.assertGreaterEqual(getChainClock(tonClient)(), target)
+        self.assertLess(time.monotonic() - started, 5)
+
+    # 2. A timestamp a client takes from its own clock is never ahead of the local chain
+    def test_2(self):
+        chain   = freeton_utils.getClient("local://chaintime2").CHAIN
+        started = time.monotonic()
+        while time.monotonic() - started < 1.2:
+            timestamp = getNowTimestamp()
+            self.assertGreaterEqual(chain.getNow(), timestamp + LOCAL_BLOCK_DELAY)
+            time.sleep(0.01)
+
+# ==============================================================================
+# Pooled contexts are shared, the last "releaseClient" destroys one
+class Test_00_OfflineClientPool(unittest.TestCase):
+
+    def test_0(self):
+        print("\n\n----------------------------------------------------------------------")
+        print("Running:", self.__class__.__name__)
+
+    # 1. Borrowers hold no reference, the last owner destroys the context
+    def test_1(self):
+        borrowed = freeton_utils.getClient("local://pool")
+        released = getClientPoolStats()["released"]
+        freeton_utils.releaseClient("local://pool")
+        self.assertEqual(getClientPoolStats()["released"], released)
+
+        with freeton_utils.ownedClient("local://pool") as first:
+            self.assertIs(first, borrowed)
+            with freeton_utils.ownedClient("local://pool") as second:
+                self.assertIs(second, first)
+                self.assertIs(freeton_utils.getClient("local://pool"), first)
+            self.assertEqual(getClientPoolStats()["released"], released)
+            self.assertEqual(len(first.crypto.generate_random_sign_keys().public), 64)
+
+        self.assertEqual(getClientPoolStats()["released"], released + 1)
+        self.assertIsNot(freeton_utils.getClient("local://pool"), first)
+
+# ==============================================================================
+#
+class Test_00_OfflineErrors(unittest.TestCase):
+
+    def test_0(self):
+        print("\n\n----------------------------------------------------------------------")
+        print("Running:", self.__class__.__name__)
+
+    # 1. classifyError over TonErrors and "errorDetails" dicts
+    def test_1(self):
+        table = [
+            (dict(NO_ERROR),                                                                             ERROR_CLASS_NONE,      False),
+            ({"errorCode":"", "sdkCode":0},                                                              ERROR_CLASS_PERMANENT, False),
+            ({"errorCode":57, "sdkCode":0},                                                              ERROR_CLASS_CONTRACT,  False),
+            ({"errorCode":""},                                                                           ERROR_CLASS_PERMANENT, False),
+            (TonError(code=NetErrorCode.QUERY_FAILED,                    message="", data={}),          ERROR_CLASS_TRANSIENT, True),
+            (TonError(code=NetErrorCode.WEBSOCKET_DISCONNECTED,          message="", data={}),          ERROR_CLASS_TRANSIENT, True),
+            (TonError(code=ProcessingErrorCode.TRANSACTION_WAIT_TIMEOUT, message="", data={}),          ERROR_CLASS_TRANSIENT, True),
+            (TonError(code=ProcessingErrorCode.MESSAGE_EXPIRED,          message="", data={}),          ERROR_CLASS_EXPIRED,   True),
+            (TonError(code=ProcessingErrorCode.MESSAGE_ALREADY_EXPIRED,  message="", data={}),          ERROR_CLASS_EXPIRED,   True),
+            (TonError(code=TvmErrorCode.CONTRACT_EXECUTION_ERROR,        message="", data={"exit_code":203}), ERROR_CLASS_CONTRACT, False),
+            (TonError(code=ProcessingErrorCode.MESSAGE_REJECTED,         message="", data={"local_error":{"data":{"exit_code":57}}}), ERROR_CLASS_CONTRACT, False),
+            (TonError(code=AbiErrorCode.ENCODE_RUN_MESSAGE_FAILED,       message="", data={}),          ERROR_CLASS_PERMANENT, False),
+            (TonError(code=0,                                            message="text only", data=None), ERROR_CLASS_PERMANENT, False)]
+
+        for (error, errorClass, retryable) in table:
+            self.assertEqual(classifyError(error), errorClass, repr(error))
+            self.assertEqual(isRetryableError(error), retryable, repr(error))
+            if isinstance(error, TonError):
+                self.assertEqual(classifyError(error.toDict()), errorClass, repr(error))
+
+    # 2. A real SDK exception, and exit codes that only mean an AuctionError when the auction threw them
+    def test_2(self):
+        tonClient = freeton_utils.getClient("local://errors")
+        params    = ParamsOfEncodeMessage(abi=getAbi("../bin/AuctionDnsRecord.abi.json"), address=ZERO_ADDRESS, signer=Signer.NoSigner(), call_set=CallSet(function_name="noSuchFunction"))
+        with self.assertRaises(TonException) as context:
+            tonClient.abi.encode_message(params=params)
+        error = TonError.fromException(context.exception)
+        self.assertNotEqual(error.code, 0)
+        self.assertEqual(error.getClass(), ERROR_CLASS_PERMANENT)
+        self.assertEqual(TonError.fromException(Exception("plain")).message, "plain")
+
+        auctionAddress = "0:" + "1" * 64
+        bidAddress     = "0:" + "2" * 64
+        fromAuction    = TonError(code=TvmErrorCode.CONTRACT_EXECUTION_ERROR, message="", data={"exit_code":200, "account_address":auctionAddress})
+        fromBid        = TonError(code=TvmErrorCode.CONTRACT_EXECUTION_ERROR, message="", data={"exit_code":200, "account_address":bidAddress})
+        self.assertEqual(fromAuction.getAuctionError(auctionAddress), AuctionError.ERROR_AUCTION_NOT_RUNNING)
+        self.assertIsNone(fromBid.getAuctionError(auctionAddress))
+        self.assertEqual(fromBid.getAuctionError(), AuctionError.ERROR_AUCTION_NOT_RUNNING)
+        self.assertIsNone(TonError(code=0, message="", data={"exit_code":57}).getAuctionError())
+
+# ==============================================================================
+# AuctionIndexer end to end on a local chain: deployments -> snapshots -> events -> queries
+class Test_00_OfflineIndexer(LocalFixture, unittest.TestCase):
+
+    FIXTURE = "indexer"
+
+    def test_0(self):
+        print("\n\n----------------------------------------------------------------------")
+        print("Running:", self.__class__.__name__)
+
+    # 1. One auction with a bid, one cancelled
+    def test_1(self):
+        specGone  = getEnglishAuctionSpec(sellerAddress=self.msig.ADDRESS, assetAddress=self.msig2.ADDRESS, dtNow=self.dtNow)
+        cancelled = getAuctionForSpec(self.tonClient, specGone)
+        self.manager.createAuctionDnsRecord(msig=self.msig, value=TON, **specGone)
+        cancelled.cancelAuction(msig=self.msig, value=TON)
+
+        auction = self.startAuction(getEnglishAuctionSpec(sellerAddress=self.msig.ADDRESS, assetAddress=self.domain.ADDRESS, dtNow=self.dtNow))
+        auction.bid(msig=self.msig2, value=TON*2)
+
+        indexer = AuctionIndexer(dbPath=os.path.join(tempfile.mkdtemp(), "index.db"), tonClient=self.tonClient, managerAddress=self.manager.ADDRESS,
+            auctionCode=getCodeFromTvc(auction.TVC))
+        result  = indexer.catchUp()
+        self.assertEqual(result["snapshots"], 2)
+        self.assertEqual(result["events"],    2)
+
+        found = indexer.findAuctions(assetAddress=self.domain.ADDRESS)
+        self.assertEqual([row["address"] for row in found], [auction.ADDRESS])
+        self.assertEqual(found[0]["currentBuyer"], self.msig2.ADDRESS)
+        self.assertEqual([row["address"] for row in indexer.findAuctions(activeAt=getChainClock(self.tonClient)())], [auction.ADDRESS])
+        self.assertEqual(indexer.findAuctions(assetAddress=self.msig2.ADDRESS)[0]["cancelled"], 1)
+
+        bids = indexer.getBids(auction.ADDRESS)
+        self.assertEqual([(bid["bidderAddress"], bid["amount"]) for bid in bids], [(self.msig2.ADDRESS, TON*2 - DIME*5)])
+
+        # a cancelled auction is settled, later snapshots leave it out
+        self.assertEqual(indexer.ingestSnapshots(), 1)
+        self.assertEqual(indexer.catchUp()["auctions"], 0)
+        indexer.close()
+
+# ==============================================================================
+# Pipelined sends on a local chain: everything is sent first, then waited for together
+class Test_00_OfflinePipeline(LocalFixture, unittest.TestCase):
+
+    FIXTURE = "pipeline"
+
+    def test_0(self):
+        print("\n\n----------------------------------------------------------------------")
+        print("Running:", self.__class__.__name__)
+
+    # 1. Transfers land, a call that cannot even be encoded comes back as (index, {}, errorDetails) and does not stop the rest
+    def test_1(self):
+        balance = int(getAccountGraphQL(tonClient=self.tonClient, accountID=self.msig2.ADDRESS, fields="balance(format:DEC)")["balance"])
+        calls   = [self.msig.getTransferCall(addressDest=self.msig2.ADDRESS, value=DIME, payload="", flags=1) for _ in range(6)]
+        calls.insert(2, dict(calls[0], functionParams={"dest":self.msig2.ADDRESS}))
+
+        results = sorted(callFunctionPipelined(tonClient=self.tonClient, calls=calls, maxWorkers=4), key=lambda item: item[0])
+        self.assertEqual([index for (index, _, _) in results], list(range(7)))
+        for (index, result, errorDetails) in results:
+            if index == 2:
+                self.assertEqual(result, {})
+                self.assertNotEqual(errorDetails["errorCode"], 0)
+            else:
+                self.assertEqual(errorDetails["errorCode"], 0, errorDetails)
+                self.assertTrue(result.transaction["id"])
+        # six transfers arrived, less what the receiving transactions cost
+        received = int(getAccountGraphQL(tonClient=self.tonClient, accountID=self.msig2.ADDRESS, fields="balance(format:DEC)")["balance"]) - balance
+        self.assertGreater(received, DIME * 5)
+        self.assertLessEqual(received, DIME * 6)
+
+    # 2. Twelve auctions created in bulk are all deployed where they were expected, a broken spec is reported in its row
+    def test_2(self):
+        specs = [getEnglishAuctionSpec(sellerAddress=self.msig.ADDRESS, assetAddress=self.domain.ADDRESS, dtNow=self.dtNow + index) for index in range(12)]
+        specs.insert(5, dict(specs[0], dtStart=self.dtNow - 1, minBid="not a number"))
+
+        table = self.manager.createAuctionsDnsRecord(msig=self.msig, value=TON, specs=specs, concurrency=4)
+        self.assertEqual([row["spec"] for row in table], specs)
+        self.assertEqual([row["status"] for row in table], ["active"] * 5 + ["failed"] + ["active"] * 7)
+        self.assertNotEqual(table[5]["error"]["errorCode"], 0)
+
+        infos = self.manager.getAuctionsInfo([row["address"] for row in table if row["status"] == "active"])
+        self.assertEqual(len(infos), 12)
+
+# ==============================================================================
+# Bids signed ahead of time and sent later from a PrebuiltQueue, on a local chain
+class Test_00_OfflinePrebuilt(LocalFixture, unittest.TestCase):
+
+    FIXTURE = "prebuilt"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.auction = cls.startAuction(getEnglishAuctionSpec(sellerAddress=cls.msig.ADDRESS, assetAddress=cls.domain.ADDRESS, dtNow=cls.dtNow))
+
+    def test_0(self):
+        print("\n\n----------------------------------------------------------------------")
+        print("Running:", self.__class__.__name__)
+
+    # 1. Prebuilt messages keep what they were built from, a sent one is gone from the queue
+    def test_1(self):
+        expire = getChainClock(self.tonClient)() + 60
+        queue  = self.auction.prebuildBids(msig=self.msig2, values=[TON*2, TON*3], expire=int(expire))
+        self.assertEqual(len(queue), 2)
+        self.assertEqual(queue.getKeys(), [TON*2, TON*3])
+
+        prebuilt = queue.pop(TON*2)
+        self.assertEqual((prebuilt.contractAddress, prebuilt.functionName, prebuilt.expire), (self.msig2.ADDRESS, "sendTransaction", int(expire)))
+        self.assertEqual(prebuilt.functionParams["value"], TON*2)
+        self.assertFalse(prebuilt.isExpired(now=int(expire) - 1))
+        self.assertTrue(prebuilt.isExpired(now=int(expire)))
+
+        (result, errorDetails) = queue.send(TON*3)
+        self.assertEqual(errorDetails["errorCode"], 0, errorDetails)
+        self.assertEqual(len(queue), 0)
+        info = self.auction.getInfo()
+        self.assertEqual((info["currentBuyer"], int(info["currentBuyPrice"])), (self.msig2.ADDRESS, TON*3 - self.auction.CONSTRUCTOR["feeValue"]))
+
+    # 2. Missing and expired keys are reported, not sent
+    def test_2(self):
+        queue = self.auction.prebuildBids(msig=self.msig2, values=[TON*4, TON*5], expire=int(getChainClock(self.tonClient)()) + 60)
+        queue.put("old", self.msig2.prebuildTransfer(addressDest=self.auction.ADDRESS, value=TON, payload="", flags=1, expire=getNowTimestamp() - 1))
+
+        self.assertEqual(queue.send("missing")[1]["errorCode"], -1)
+        self.assertEqual(queue.removeExpired(), ["old"])
+        self.assertEqual(queue.getKeys(), [TON*4, TON*5])
+        self.assertEqual(queue.send(TON*4, waitForTransaction=False)[1]["errorCode"], 0)
+
+    # 3. Expiry is chain time: once the chain is past "expire" nothing is sent, however early the local clock is
+    def test_3(self):
+        queue = self.auction.prebuildBids(msig=self.msig2, values=[TON*5], expire=int(getChainClock(self.tonClient)()) + 60)
+        self.tonClient.CHAIN.advance(120)
+        self.assertEqual(queue.send(TON*5)[1]["errorCode"], -1)
+        self.assertEqual(len(queue), 0)
+
+# ==============================================================================
+# Account state fetching and local getters against single, uncached calls, on a local chain
+class Test_00_OfflineAccounts(LocalFixture, unittest.TestCase):
+
+    FIXTURE = "accounts"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.addresses = [cls.msig.ADDRESS, cls.msig2.ADDRESS, cls.domain.ADDRESS, cls.manager.ADDRESS]
+        cls.missing   = ZERO_ADDRESS[:-4] + "dead"
+
+    def test_0(self):
+        print("\n\n----------------------------------------------------------------------")
+        print("Running:", self.__class__.__name__)
+
+    # 1. Batched (chunked by "limit") and coalesced fetches give what single fetches give
+    def test_1(self):
+        fields  = "id, boc, balance(format:DEC), last_trans_lt"
+        singles = {address: getAccountGraphQL(self.tonClient, address, fields) for address in self.addresses}
+        self.assertEqual(getAccountsGraphQL(tonClient=self.tonClient, accountIDsArray=self.addresses + [self.missing], fields=fields, limit=3), singles)
+
+        loader = AccountsLoader(tonClient=self.tonClient, fields=fields, limit=3, delay=0.2)
+        self.assertEqual(loader.loadMany(self.addresses + [self.missing]), singles)
+        self.assertEqual(loader.load(self.missing), "")
+        with ThreadPoolExecutor(max_workers=len(self.addresses)) as executor:
+            loaded = list(executor.map(loader.load, self.addresses))
+        self.assertEqual(dict(zip(self.addresses, loaded)), singles)
+
+    # 2. A cached BOC is served while "last_trans_lt" stays the same and fetched again after a transaction
+    def test_2(self):
+        cache  = AccountBocCache()
+        before = getAccountGraphQL(self.tonClient, self.domain.ADDRESS, "boc")["boc"]
+        self.assertEqual(cache.getBoc(self.tonClient, self.domain.ADDRESS), before)
+        self.assertEqual(cache.getBoc(self.tonClient, self.domain.ADDRESS), before)
+        self.assertEqual(cache.getStats(), dict(cache.getStats(), hits=1, misses=1, probes=1))
+
+        self.msig.callTransfer(addressDest=self.domain.ADDRESS, value=DIME, payload="", flags=1)
+        after = getAccountGraphQL(self.tonClient, self.domain.ADDRESS, "boc")["boc"]
+        self.assertNotEqual(after, before)
+        self.assertEqual(cache.getBoc(self.tonClient, self.domain.ADDRESS), after)
+        self.assertEqual(cache.getStats(), dict(cache.getStats(), hits=1, misses=2, probes=2))
+        self.assertEqual(cache.getBoc(self.tonClient, self.missing), "")
+
+        # within TTL there is no probe at all
+        cache = AccountBocCache(ttl=3600)
+        self.assertEqual(cache.getBocs(self.tonClient, self.addresses), cache.getBocs(self.tonClient, self.addresses))
+        self.assertEqual(cache.getStats(), dict(cache.getStats(), hits=len(self.addresses), misses=len(self.addresses), probes=0))
+
+    # 3. Decoding through the function-ID index picks what trying every ABI (external first, then internal) picks
+    def test_3(self):
+        abis = [self.msig.ABI, self.domain.ABI, self.manager.ABI, "../bin/AuctionDnsRecord.abi.json"]
+
+        def _decodeByTrial(body):
+            for isInternal in [False, True]:
+                for abi in abis:
+                    try:
+                        return (abi, self.tonClient.abi.decode_message_body(params=ParamsOfDecodeMessageBody(abi=getAbi(abi), body=body, is_internal=isInternal)))
+                    except TonException:
+                        pass
+            return ("", "")
+
+        params   = ParamsOfQueryCollection(collection="messages", result="id, body", filter={"dst": {"in": self.addresses}})
+        messages = [message for message in self.tonClient.net.query_collection(params=params).result if message["body"]]
+        bodies   = [message["body"] for message in messages] + [
+            prepareMessageBoc(abiPath=self.domain.ABI, functionName="changeOwner", functionParams={"newOwnerAddress": self.msig2.ADDRESS}),
+            prepareMessageBoc(abiPath="../bin/AuctionDnsRecord.abi.json", functionName="bid", functionParams={}),
+            cellToBoc(CellBuilder().storeUint(0xDEADBEEF, 32).endCell())]
+        self.assertGreater(len(messages), len(self.addresses))
+
+        for body in bodies:
+            (abi, decoded)      = decodeMessageBody(body, abis)
+            (trialAbi, expected) = _decodeByTrial(body)
+            self.assertEqual(abi, trialAbi)
+            if body != bodies[-1]:
+                self.assertNotEqual(abi, "")
+                self.assertEqual((decoded.body_type, decoded.name, decoded.value), (expected.body_type, expected.name, expected.value))
+        self.assertEqual(decodeMessageBody(bodies[-1], abis), ("", ""))
+
+    # 4. Getters on one pinned BOC give what one "runFunctionInternal" per getter gives, a failed one does not stop the rest
+    def test_4(self):
+        boc     = getAccountGraphQL(self.tonClient, self.domain.ADDRESS, "boc")["boc"]
+        getters = ["getWhois", "getEndpointAddress", "noSuchGetter", "getDomainCode"]
+        calls   = [(self.domain.ABI, functionName, {}) for functionName in getters]
+        results = runFunctionsInternal(tonClient=self.tonClient, boc=boc, contractAddress=self.domain.ADDRESS, calls=calls)
+
+        self.assertEqual(len(results), len(getters))
+        for (functionName, (result, errorDetails)) in zip(getters, results):
+            if functionName == "noSuchGetter":
+                self.assertNotEqual(errorDetails["errorCode"], 0)
+                continue
+            self.assertEqual(errorDetails["errorCode"], 0)
+            self.assertEqual(result, runFunctionInternal(tonClient=self.tonClient, boc=boc, abiPath=self.domain.ABI, contractAddress=self.domain.ADDRESS, functionName=functionName, functionParams={}))
+        self.assertEqual(results[0][0]["ownerAddress"], self.msig.ADDRESS)
+
+        many = runFunctionsMany(tonClient=self.tonClient, contractAddresses=[self.domain.ADDRESS, self.missing], calls=calls)
+        self.assertEqual(many, {self.domain.ADDRESS: results, self.missing: []})
+
+# ==============================================================================
+# asyncio wrappers on a local chain: deploy, create, bid and read through AsyncSetcodeMultisig
+class Test_00_OfflineAsync(LocalFixture, unittest.TestCase):
+
+    FIXTURE = "async"
+    MSIGS   = 1
+
+    def test_0(self):
+        print("\n\n----------------------------------------------------------------------")
+        print("Running:", self.__class__.__name__)
+
+    # 1. The whole English auction flow with awaitables
+    def test_1(self):
+        async def _run():
+            asyncClient = getAsyncClient("local://async")
+            (seller, buyer, buyer2) = [AsyncSetcodeMultisig(tonClient=asyncClient) for _ in range(3)]
+            for msig in (seller, buyer, buyer2):
+                giverGive(self.tonClient, msig.ADDRESS, TON * 10)
+                self.assertEqual((await msig.deploy())[1]["errorCode"], 0)
+
+            manager = AsyncAuctionManagerDnsRecord(asyncClient, ownerAddress=self.msig.ADDRESS, bidCode=self.manager.INITDATA["_bidCode"], auctionCode=self.manager.INITDATA["_auctionCode"], signer=self.manager.SIGNER)
+            spec    = getEnglishAuctionSpec(sellerAddress=seller.ADDRESS, assetAddress=self.domain.ADDRESS, dtNow=self.dtNow)
+            auction = getAuctionForSpec(asyncClient, spec, AsyncAuctionDnsRecord)
+            self.assertEqual(manager.ADDRESS, self.manager.ADDRESS)
+
+            await manager.createAuctionDnsRecord(msig=seller, value=TON, **spec)
+            self.domain.callFromMultisig(msig=self.msig, functionName="changeOwner", functionParams={"newOwnerAddress": auction.ADDRESS}, value=DIME, flags=1)
+            await auction.receiveAsset(msig=seller, value=DIME)
+            result = await auction.bid(msig=buyer, value=TON*2)
+            self.assertEqual(result[1]["errorCode"], 0)
+
+            info = await auction.getAuctionInfo()
+            self.assertEqual(info.currentBuyer, buyer.ADDRESS)
+            self.assertEqual(int(info.currentBuyPrice), TON*2 - DIME*5)
+            self.assertTrue((await auction.checkDesiredPrice())["match"])
+            self.assertEqual(len(await manager.getAuctionsInfo([auction.ADDRESS])), 1)
+
+            # outbid with a prebuilt message, a key is good for one send
+            queue = await auction.prebuildBids(msig=buyer2, values=[TON*4, TON*5], expire=int(getChainClock(asyncClient)()) + 60)
+            self.assertEqual(queue.getKeys(), [TON*4, TON*5])
+            self.assertEqual((await queue.send(TON*4))[1]["errorCode"], 0)
+            self.assertEqual((await queue.send(TON*4))[1]["errorCode"], -1)
+            self.assertEqual(int((await auction.getAuctionInfo()).currentBuyPrice), TON*4 - DIME*5)
+            self.assertLess(await buyer2.getBalance(), TON*7)
+
+        asyncio.run(_run())
+
+    # 2. Bulk creation with awaitables, a spec the ABI rejects fails alone
+    def test_2(self):
+        async def _run():
+            asyncClient = getAsyncClient("local://async")
+            seller      = AsyncSetcodeMultisig(tonClient=asyncClient)
+            giverGive(self.tonClient, seller.ADDRESS, TON * 10)
+            self.assertEqual((await seller.deploy())[1]["errorCode"], 0)
+
+            manager = AsyncAuctionManagerDnsRecord(asyncClient, ownerAddress=self.msig.ADDRESS, bidCode=self.manager.INITDATA["_bidCode"], auctionCode=self.manager.INITDATA["_auctionCode"], signer=self.manager.SIGNER)
+            specs   = [getEnglishAuctionSpec(sellerAddress=seller.ADDRESS, assetAddress=self.domain.ADDRESS, dtNow=self.dtNow + index) for index in range(1, 5)]
+            specs.insert(2, dict(specs[0], minBid=-1))
+            return await manager.createAuctionsDnsRecord(msig=seller, value=TON, specs=specs, concurrency=2)
+
+        table = asyncio.run(_run())
+        self.assertEqual([row["status"] for row in table], ["active", "active", "failed", "active", "active"])
+        self.assertNotEqual(table[2]["error"]["errorCode"], 0)
+
+# ==============================================================================
+# BlindBidScheduler restarted between "bidBlind" and the reveal, on a local chain
+class Test_00_OfflineScheduler(LocalFixture, unittest.TestCase):
+
+    FIXTURE = "scheduler"
+
+    def test_0(self):
+        print("\n\n----------------------------------------------------------------------")
+        print("Running:", self.__class__.__name__)
+
+    # 1. Resumed before the bidder's multisig is registered, the reveal waits for it instead of failing
+    def test_1(self):
+        spec      = dict(getEnglishAuctionSpec(sellerAddress=self.msig.ADDRESS, assetAddress=self.domain.ADDRESS, dtNow=self.dtNow),
+            auctionType=1, minPriceStep=0, buyNowPrice=0, dtEnd=self.dtNow + 20, dtRevealEnd=self.dtNow + 40)
+        auction   = self.startAuction(spec)
+        storePath = os.path.join(tempfile.mkdtemp(), "secrets.db")
+
+        scheduler = BlindBidScheduler(storePath=storePath, wheel=TimerWheel(clock=getChainClock(self.tonClient)), retryDelay=1)
+        self.assertEqual(scheduler.commit(auction=auction, msig=self.msig2, price=TON*3, bidValue=TON*2, revealValue=TON*5)[1]["errorCode"], 0)
+        scheduler.stop()
+
+        scheduler = BlindBidScheduler(storePath=storePath, wheel=TimerWheel(clock=getChainClock(self.tonClient)), retryDelay=1)
+        scheduler.resume()
+        self.tonClient.CHAIN.advance(spec["dtEnd"] - self.dtNow + scheduler.DELAY)
+        deadline = time.monotonic() + 30
+        while not scheduler.getWaitingMultisigs() and time.monotonic() < deadline:
+            time.sleep(0.1)
+        self.assertEqual(scheduler.getWaitingMultisigs(), [self.msig2.ADDRESS])
+        self.assertEqual(scheduler.getBid(auction.ADDRESS, self.msig2.ADDRESS)["status"], "committed")
+
+        scheduler.registerMultisig(self.msig2)
+        self.assertTrue(scheduler.wait(auctionAddresses=[auction.ADDRESS], timeout=60, revealsOnly=True))
+        self.assertEqual(scheduler.getBid(auction.ADDRESS, self.msig2.ADDRESS)["status"], "revealed")
+        self.assertEqual(scheduler.getWaitingMultisigs(), [])
+
+        self.tonClient.CHAIN.advance(spec["dtRevealEnd"] - spec["dtEnd"])
+        self.assertTrue(scheduler.wait(auctionAddresses=[auction.ADDRESS], timeout=60))
+        self.assertEqual(scheduler.getAuction(auction.ADDRESS)["finalized"], 1)
+        scheduler.stop()
+
+# ==============================================================================
+# Scenarios against the configured network. Their contracts are built in setUpClass, when a scenario starts rather than
+# at import, and every scenario has its own domain name, so scenarios can run side by side
+# ==============================================================================
+#
 class Test_01_CancelDnsAuction(unittest.TestCase):
 
-    msig    = SetcodeMultisig(tonClient=getClient())
-    msig2   = SetcodeMultisig(tonClient=getClient())
-    domain  = DnsRecordTEST(tonClient=getClient(), name="kek")
-    dtNow   = getNowTimestamp()
-    
-    auction = AuctionDnsRecord(
-        tonClient     = getClient(), 
-        # statics
-        sellerAddress = msig.ADDRESS, 
-        buyerAddress  = msig2.ADDRESS,
-        assetAddress  = domain.ADDRESS, 
-        auctionType   = 4, # PRIVATE_BUY 
-        dtStart       = dtNow + 1,
-        # constructor
-        escrowAddress = msig.ADDRESS, 
-        escrowPercent = 500,
-        feeValue      = DIME*5,
-        minBid        = TON,
-        minPriceStep  = TON, 
-        buyNowPrice   = TON*6, 
-        dtEnd         = dtNow+70,
-        dtRevealEnd   = 0, # it is not blind auction
-        dutchCycle    = 0) # it is not dutch auction
-
-    manager = AuctionManagerDnsRecord(tonClient=getClient(), ownerAddress=msig.ADDRESS, bidCode=getCodeFromTvc(auction.TVC_BID), auctionCode=getCodeFromTvc(auction.TVC))
-    
+    @classmethod
+    def setUpClass(cls):
+        cls.msig    = SetcodeMultisig(tonClient=getClient())
+        cls.msig2   = SetcodeMultisig(tonClient=getClient())
+        cls.domain  = DnsRecordTEST(tonClient=getClient(), name="kek1")
+        cls.dtNow   = getNowTimestamp()
+
+        cls.auction = AuctionDnsRecord(
+            tonClient     = getClient(),
+            # statics
+            sellerAddress = cls.msig.ADDRESS,
+            buyerAddress  = cls.msig2.ADDRESS,
+            assetAddress  = cls.domain.ADDRESS,
+            auctionType   = 4, # PRIVATE_BUY
+            dtStart       = cls.dtNow + 1,
+            # constructor
+            escrowAddress = cls.msig.ADDRESS,
+            escrowPercent = 500,
+            feeValue      = DIME*5,
+            minBid        = TON,
+            minPriceStep  = TON,
+            buyNowPrice   = TON*6,
+            dtEnd         = cls.dtNow+70,
+            dtRevealEnd   = 0, # it is not blind auction
+            dutchCycle    = 0) # it is not dutch auction
+
+        cls.manager = AuctionManagerDnsRecord(tonClient=getClient(), ownerAddress=cls.msig.ADDRESS, bidCode=getCodeFromTvc(cls.auction.TVC_BID), auctionCode=getCodeFromTvc(cls.auction.TVC))
+
     def test_0(self):
         print("\n\n----------------------------------------------------------------------")
         print("Running:", self.__class__.__name__)
@@ -181,32 +1075,34 @@ class Test_01_CancelDnsAuction(unittest.TestCase):
 # 
 class Test_02_DeployDnsAuctionPrivate(unittest.TestCase):
 
-    msig    = SetcodeMultisig(tonClient=getClient())
-    msig2   = SetcodeMultisig(tonClient=getClient())
-    domain  = DnsRecordTEST(tonClient=getClient(), name="kek")
-    dtNow   = getNowTimestamp()
-    
-    auction = AuctionDnsRecord(
-        tonClient     = getClient(), 
-        # statics
-        sellerAddress = msig.ADDRESS, 
-        buyerAddress  = msig2.ADDRESS,
-        assetAddress  = domain.ADDRESS, 
-        auctionType   = 4, # PRIVATE_BUY 
-        dtStart       = dtNow + 1,
-        # constructor
-        escrowAddress = msig.ADDRESS, 
-        escrowPercent = 500,
-        feeValue      = DIME*5,
-        minBid        = TON,
-        minPriceStep  = TON, 
-        buyNowPrice   = TON*6, 
-        dtEnd         = dtNow+70,
-        dtRevealEnd   = 0, # it is not blind auction
-        dutchCycle    = 0) # it is not dutch auction
-
-    manager = AuctionManagerDnsRecord(tonClient=getClient(), ownerAddress=msig.ADDRESS, bidCode=getCodeFromTvc(auction.TVC_BID), auctionCode=getCodeFromTvc(auction.TVC))
-    
+    @classmethod
+    def setUpClass(cls):
+        cls.msig    = SetcodeMultisig(tonClient=getClient())
+        cls.msig2   = SetcodeMultisig(tonClient=getClient())
+        cls.domain  = DnsRecordTEST(tonClient=getClient(), name="kek2")
+        cls.dtNow   = getNowTimestamp()
+
+        cls.auction = AuctionDnsRecord(
+            tonClient     = getClient(),
+            # statics
+            sellerAddress = cls.msig.ADDRESS,
+            buyerAddress  = cls.msig2.ADDRESS,
+            assetAddress  = cls.domain.ADDRESS,
+            auctionType   = 4, # PRIVATE_BUY
+            dtStart       = cls.dtNow + 1,
+            # constructor
+            escrowAddress = cls.msig.ADDRESS,
+            escrowPercent = 500,
+            feeValue      = DIME*5,
+            minBid        = TON,
+            minPriceStep  = TON,
+            buyNowPrice   = TON*6,
+            dtEnd         = cls.dtNow+70,
+            dtRevealEnd   = 0, # it is not blind auction
+            dutchCycle    = 0) # it is not dutch auction
+
+        cls.manager = AuctionManagerDnsRecord(tonClient=getClient(), ownerAddress=cls.msig.ADDRESS, bidCode=getCodeFromTvc(cls.auction.TVC_BID), auctionCode=getCodeFromTvc(cls.auction.TVC))
+
     def test_0(self):
         print("\n\n----------------------------------------------------------------------")
         print("Running:", self.__class__.__name__)
@@ -279,32 +1175,34 @@ class Test_02_DeployDnsAuctionPrivate(unittest.TestCase):
 # 
 class Test_03_DeployDnsAuctionPublic(unittest.TestCase):
 
-    msig    = SetcodeMultisig(tonClient=getClient())
-    msig2   = SetcodeMultisig(tonClient=getClient())
-    domain  = DnsRecordTEST(tonClient=getClient(), name="kek")
-    dtNow   = getNowTimestamp()
-    
-    auction = AuctionDnsRecord(
-        tonClient     = getClient(), 
-        # statics
-        sellerAddress = msig.ADDRESS, 
-        buyerAddress  = ZERO_ADDRESS,
-        assetAddress  = domain.ADDRESS, 
-        auctionType   = 3, # PUBLIC_BUY 
-        dtStart       = dtNow + 1,
-        # constructor
-        escrowAddress = msig.ADDRESS, 
-        escrowPercent = 500,
-        feeValue      = DIME*5,
-        minBid        = TON,
-        minPriceStep  = TON, 
-        buyNowPrice   = TON*6, 
-        dtEnd         = dtNow+70,
-        dtRevealEnd   = 0, # it is not blind auction
-        dutchCycle    = 0) # it is not dutch auction
-
-    manager = AuctionManagerDnsRecord(tonClient=getClient(), ownerAddress=msig.ADDRESS, bidCode=getCodeFromTvc(auction.TVC_BID), auctionCode=getCodeFromTvc(auction.TVC))
-    
+    @classmethod
+    def setUpClass(cls):
+        cls.msig    = SetcodeMultisig(tonClient=getClient())
+        cls.msig2   = SetcodeMultisig(tonClient=getClient())
+        cls.domain  = DnsRecordTEST(tonClient=getClient(), name="kek3")
+        cls.dtNow   = getNowTimestamp()
+
+        cls.auction = AuctionDnsRecord(
+            tonClient     = getClient(),
+            # statics
+            sellerAddress = cls.msig.ADDRESS,
+            buyerAddress  = ZERO_ADDRESS,
+            assetAddress  = cls.domain.ADDRESS,
+            auctionType   = 3, # PUBLIC_BUY
+            dtStart       = cls.dtNow + 1,
+            # constructor
+            escrowAddress = cls.msig.ADDRESS,
+            escrowPercent = 500,
+            feeValue      = DIME*5,
+            minBid        = TON,
+            minPriceStep  = TON,
+            buyNowPrice   = TON*6,
+            dtEnd         = cls.dtNow+70,
+            dtRevealEnd   = 0, # it is not blind auction
+            dutchCycle    = 0) # it is not dutch auction
+
+        cls.manager = AuctionManagerDnsRecord(tonClient=getClient(), ownerAddress=cls.msig.ADDRESS, bidCode=getCodeFromTvc(cls.auction.TVC_BID), auctionCode=getCodeFromTvc(cls.auction.TVC))
+
     def test_0(self):
         print("\n\n----------------------------------------------------------------------")
         print("Running:", self.__class__.__name__)
@@ -377,35 +1275,37 @@ class Test_03_DeployDnsAuctionPublic(unittest.TestCase):
 # 
 class Test_04_DeployDnsAuctionEnglishForward(unittest.TestCase):
 
-    msig    = SetcodeMultisig(tonClient=getClient())
-    msig2   = SetcodeMultisig(tonClient=getClient())
-    msig3   = SetcodeMultisig(tonClient=getClient())
-    msig4   = SetcodeMultisig(tonClient=getClient())
-    msig5   = SetcodeMultisig(tonClient=getClient())
-    domain  = DnsRecordTEST(tonClient=getClient(), name="kek")
-    dtNow   = getNowTimestamp()
-    
-    auction = AuctionDnsRecord(
-        tonClient     = getClient(), 
-        # statics
-        sellerAddress = msig.ADDRESS, 
-        buyerAddress  = ZERO_ADDRESS,
-        assetAddress  = domain.ADDRESS, 
-        auctionType   = 0, # ENGLISH_FORWARD 
-        dtStart       = dtNow + 1,
-        # constructor
-        escrowAddress = msig.ADDRESS, 
-        escrowPercent = 500,
-        feeValue      = DIME*5,
-        minBid        = TON,
-        minPriceStep  = TON, 
-        buyNowPrice   = TON*6, 
-        dtEnd         = dtNow+170,
-        dtRevealEnd   = 0, # it is not blind auction
-        dutchCycle    = 0) # it is not dutch auction
-
-    manager = AuctionManagerDnsRecord(tonClient=getClient(), ownerAddress=msig.ADDRESS, bidCode=getCodeFromTvc(auction.TVC_BID), auctionCode=getCodeFromTvc(auction.TVC))
-    
+    @classmethod
+    def setUpClass(cls):
+        cls.msig    = SetcodeMultisig(tonClient=getClient())
+        cls.msig2   = SetcodeMultisig(tonClient=getClient())
+        cls.msig3   = SetcodeMultisig(tonClient=getClient())
+        cls.msig4   = SetcodeMultisig(tonClient=getClient())
+        cls.msig5   = SetcodeMultisig(tonClient=getClient())
+        cls.domain  = DnsRecordTEST(tonClient=getClient(), name="kek4")
+        cls.dtNow   = getNowTimestamp()
+
+        cls.auction = AuctionDnsRecord(
+            tonClient     = getClient(),
+            # statics
+            sellerAddress = cls.msig.ADDRESS,
+            buyerAddress  = ZERO_ADDRESS,
+            assetAddress  = cls.domain.ADDRESS,
+            auctionType   = 0, # ENGLISH_FORWARD
+            dtStart       = cls.dtNow + 1,
+            # constructor
+            escrowAddress = cls.msig.ADDRESS,
+            escrowPercent = 500,
+            feeValue      = DIME*5,
+            minBid        = TON,
+            minPriceStep  = TON,
+            buyNowPrice   = TON*6,
+            dtEnd         = cls.dtNow+170,
+            dtRevealEnd   = 0, # it is not blind auction
+            dutchCycle    = 0) # it is not dutch auction
+
+        cls.manager = AuctionManagerDnsRecord(tonClient=getClient(), ownerAddress=cls.msig.ADDRESS, bidCode=getCodeFromTvc(cls.auction.TVC_BID), auctionCode=getCodeFromTvc(cls.auction.TVC))
+
     def test_0(self):
         print("\n\n----------------------------------------------------------------------")
         print("Running:", self.__class__.__name__)
@@ -513,32 +1413,34 @@ class Test_04_DeployDnsAuctionEnglishForward(unittest.TestCase):
 # 
 class Test_05_DeployDnsAuctionDutchForward(unittest.TestCase):
 
-    msig    = SetcodeMultisig(tonClient=getClient())
-    msig2   = SetcodeMultisig(tonClient=getClient())
-    domain  = DnsRecordTEST(tonClient=getClient(), name="kek")
-    dtNow   = getNowTimestamp()
-    
-    auction = AuctionDnsRecord(
-        tonClient     = getClient(), 
-        # statics
-        sellerAddress = msig.ADDRESS, 
-        buyerAddress  = ZERO_ADDRESS,
-        assetAddress  = domain.ADDRESS, 
-        auctionType   = 2, # DUTCH_FORWARD 
-        dtStart       = dtNow + 1,
-        # constructor
-        escrowAddress = msig.ADDRESS, 
-        escrowPercent = 500,
-        feeValue      = DIME*5,
-        minBid        = TON*10,
-        minPriceStep  = DIME, 
-        buyNowPrice   = TON, 
-        dtEnd         = dtNow+170,
-        dtRevealEnd   = 0, # it is not blind auction
-        dutchCycle    = 2)
-
-    manager = AuctionManagerDnsRecord(tonClient=getClient(), ownerAddress=msig.ADDRESS, bidCode=getCodeFromTvc(auction.TVC_BID), auctionCode=getCodeFromTvc(auction.TVC))
-    
+    @classmethod
+    def setUpClass(cls):
+        cls.msig    = SetcodeMultisig(tonClient=getClient())
+        cls.msig2   = SetcodeMultisig(tonClient=getClient())
+        cls.domain  = DnsRecordTEST(tonClient=getClient(), name="kek5")
+        cls.dtNow   = getNowTimestamp()
+
+        cls.auction = AuctionDnsRecord(
+            tonClient     = getClient(),
+            # statics
+            sellerAddress = cls.msig.ADDRESS,
+            buyerAddress  = ZERO_ADDRESS,
+            assetAddress  = cls.domain.ADDRESS,
+            auctionType   = 2, # DUTCH_FORWARD
+            dtStart       = cls.dtNow + 1,
+            # constructor
+            escrowAddress = cls.msig.ADDRESS,
+            escrowPercent = 500,
+            feeValue      = DIME*5,
+            minBid        = TON*10,
+            minPriceStep  = DIME,
+            buyNowPrice   = TON,
+            dtEnd         = cls.dtNow+170,
+            dtRevealEnd   = 0, # it is not blind auction
+            dutchCycle    = 2)
+
+        cls.manager = AuctionManagerDnsRecord(tonClient=getClient(), ownerAddress=cls.msig.ADDRESS, bidCode=getCodeFromTvc(cls.auction.TVC_BID), auctionCode=getCodeFromTvc(cls.auction.TVC))
+
     def test_0(self):
         print("\n\n----------------------------------------------------------------------")
         print("Running:", self.__class__.__name__)
@@ -589,7 +1491,11 @@ class Test_05_DeployDnsAuctionDutchForward(unittest.TestCase):
 
         result = self.auction.receiveAsset(msig=self.msig,  value=100000000)
 
-        time.sleep(5)
+        # let the price drop for a couple of dutch cycles
+        waitForChainTime(getClient(), getChainTime(getClient()) + 5)
+
+        result = self.auction.checkDesiredPrice()
+        self.assertTrue(result["match"], result)
 
         result = self.auction.bid     (msig=self.msig2, value=TON*11)
         result = self.auction.finalize(msig=self.msig2, value=TON)
@@ -613,32 +1519,34 @@ class Test_05_DeployDnsAuctionDutchForward(unittest.TestCase):
 # 
 class Test_06_DeployDnsAuctionEnglishBlind(unittest.TestCase):
 
-    msig    = SetcodeMultisig(tonClient=getClient())
-    msig2   = SetcodeMultisig(tonClient=getClient())
-    domain  = DnsRecordTEST(tonClient=getClient(), name="kek")
-    dtNow   = getNowTimestamp()
-    
-    auction = AuctionDnsRecord(
-        tonClient     = getClient(), 
-        # statics
-        sellerAddress = msig.ADDRESS, 
-        buyerAddress  = ZERO_ADDRESS,
-        assetAddress  = domain.ADDRESS, 
-        auctionType   = 1, # ENGLISH_BLIND 
-        dtStart       = dtNow + 1,
-        # constructor
-        escrowAddress = msig.ADDRESS, 
-        escrowPercent = 500,
-        feeValue      = DIME*5,
-        minBid        = TON,
-        minPriceStep  = 0, 
-        buyNowPrice   = 0, 
-        dtEnd         = dtNow+20,
-        dtRevealEnd   = dtNow+40,
-        dutchCycle    = 0)
-
-    manager = AuctionManagerDnsRecord(tonClient=getClient(), ownerAddress=msig.ADDRESS, bidCode=getCodeFromTvc(auction.TVC_BID), auctionCode=getCodeFromTvc(auction.TVC))
-    
+    @classmethod
+    def setUpClass(cls):
+        cls.msig    = SetcodeMultisig(tonClient=getClient())
+        cls.msig2   = SetcodeMultisig(tonClient=getClient())
+        cls.domain  = DnsRecordTEST(tonClient=getClient(), name="kek6")
+        cls.dtNow   = getNowTimestamp()
+
+        cls.auction = AuctionDnsRecord(
+            tonClient     = getClient(),
+            # statics
+            sellerAddress = cls.msig.ADDRESS,
+            buyerAddress  = ZERO_ADDRESS,
+            assetAddress  = cls.domain.ADDRESS,
+            auctionType   = 1, # ENGLISH_BLIND
+            dtStart       = cls.dtNow + 1,
+            # constructor
+            escrowAddress = cls.msig.ADDRESS,
+            escrowPercent = 500,
+            feeValue      = DIME*5,
+            minBid        = TON,
+            minPriceStep  = 0,
+            buyNowPrice   = 0,
+            dtEnd         = cls.dtNow+20,
+            dtRevealEnd   = cls.dtNow+40,
+            dutchCycle    = 0)
+
+        cls.manager = AuctionManagerDnsRecord(tonClient=getClient(), ownerAddress=cls.msig.ADDRESS, bidCode=getCodeFromTvc(cls.auction.TVC_BID), auctionCode=getCodeFromTvc(cls.auction.TVC))
+
     def test_0(self):
         print("\n\n----------------------------------------------------------------------")
         print("Running:", self.__class__.__name__)
@@ -672,11 +1580,13 @@ class Test_06_DeployDnsAuctionEnglishBlind(unittest.TestCase):
 
         price1 = TON*2
         salt1  = "123424534654"
-        hash1  = self.manager.getHashFromPrice(price=price1, salt=salt1)
+        hash1  = getHashFromPrice(price=price1, salt=salt1)
+        self.assertEqual(int(hash1, 0), int(self.manager.getHashFromPrice(price=price1, salt=salt1), 0))
 
         price2 = TON*3
-        salt2  = "12389053544654"
-        hash2  = self.manager.getHashFromPrice(price=price2, salt=salt2)
+        salt2  = generateSalt()
+        hash2  = getHashFromPrice(price=price2, salt=salt2)
+        self.assertEqual(int(hash2, 0), int(self.manager.getHashFromPrice(price=price2, salt=salt2), 0))
         
         result = self.manager.createAuctionDnsRecord(msig=self.msig, value=TON, 
             sellerAddress = self.msig.ADDRESS, 
@@ -696,23 +1606,22 @@ class Test_06_DeployDnsAuctionEnglishBlind(unittest.TestCase):
         result = self.domain.callFromMultisig(msig=self.msig, functionName="changeOwner", functionParams={"newOwnerAddress": self.auction.ADDRESS}, value=100000000, flags=1)
         result = self.auction.receiveAsset(msig=self.msig, value=100000000)
 
-        result = self.auction.bidBlind(msig=self.msig,  value=TON, priceHash=str(hash1))
-        result = self.auction.bidBlind(msig=self.msig2, value=TON, priceHash=str(hash2))
-        #msgArray = unwrapMessages(getClient(), result[0].transaction["out_msgs"], _getAbiArray())
-        #pprint(msgArray)
-        
-        time.sleep(15)
-
-        result = self.auction.revealBidBlind(msig=self.msig,  value=TON*4, price=price1, salt=salt1)
-        result = self.auction.revealBidBlind(msig=self.msig2, value=TON*5, price=price2, salt=salt2)
-        #msgArray = unwrapMessages(getClient(), result[0].transaction["out_msgs"], _getAbiArray())
-        #pprint(msgArray)
-
-        time.sleep(20)
-
-        result = self.auction.finalize(msig=self.msig2, value=TON)
-        result = self.auction.finalize(msig=self.msig2, value=TON)
-        msgArray = unwrapMessages(getClient(), result[0].transaction["out_msgs"], _getAbiArray())
+        # reveals and finalize are fired by the scheduler at dtEnd/dtRevealEnd of chain time;
+        # half of "bidValue" deploys AuctionBid, which keeps "feeValue" and throws ERROR_NOT_ENOUGH_MONEY below it
+        scheduler = BlindBidScheduler(storePath=os.path.join(tempfile.mkdtemp(), "secrets.db"), wheel=TimerWheel(clock=getChainClock(getClient())), retryDelay=1)
+        scheduler.commit(auction=self.auction, msig=self.msig2, price=price2, bidValue=TON*2, revealValue=TON*5, salt=salt2)
+        scheduler.commit(auction=self.auction, msig=self.msig,  price=price1, bidValue=TON*2, revealValue=TON*4, salt=salt1)
+        self.assertEqual(scheduler.getBid(self.auction.ADDRESS, self.msig.ADDRESS)["status"], "committed")
+
+        waitForChainTime(getClient(), self.auction.CONSTRUCTOR["dtEnd"] + scheduler.DELAY)
+        self.assertTrue(scheduler.wait(auctionAddresses=[self.auction.ADDRESS], timeout=180, revealsOnly=True))
+        waitForChainTime(getClient(), self.auction.CONSTRUCTOR["dtRevealEnd"] + scheduler.DELAY)
+        self.assertTrue(scheduler.wait(auctionAddresses=[self.auction.ADDRESS], timeout=180))
+        # both reveals fire at once: the lower one is bounced if it arrives second
+        self.assertIn(scheduler.getBid(self.auction.ADDRESS, self.msig.ADDRESS)["status"], ("revealed", "failed"))
+        self.assertEqual(scheduler.getBid(self.auction.ADDRESS, self.msig2.ADDRESS)["status"], "revealed")
+        self.assertEqual(scheduler.getAuction(self.auction.ADDRESS)["finalized"], 1)
+        scheduler.stop()
         
         result = self.domain.run(functionName="getWhois", functionParams={})
         self.assertEqual(result["ownerAddress"], self.msig2.ADDRESS)
@@ -731,10 +1640,14 @@ class Test_06_DeployDnsAuctionEnglishBlind(unittest.TestCase):
 # 
 class Test_07_DeployDebot(unittest.TestCase):
 
-    msig    = SetcodeMultisig(tonClient=getClient(), signer=loadSigner(keysFile="msig.json"))
-    manager = AuctionManagerDnsRecord(tonClient=getClient(), ownerAddress=msig.ADDRESS, bidCode=getCodeFromTvc("../bin/AuctionBid.tvc"), auctionCode=getCodeFromTvc("../bin/AuctionDnsRecord.tvc"))
-    debot   = AuctionDebot(tonClient=getClient(), ownerAddress=msig.ADDRESS)
-    
+    @classmethod
+    def setUpClass(cls):
+        # owner keys from "msig.json" if there is one (not in the repo), otherwise a fresh pair
+        signer      = loadSigner(keysFile="msig.json") if os.path.exists("msig.json") else Signer.Keys(getClient().crypto.generate_random_sign_keys())
+        cls.msig    = SetcodeMultisig(tonClient=getClient(), signer=signer)
+        cls.manager = AuctionManagerDnsRecord(tonClient=getClient(), ownerAddress=cls.msig.ADDRESS, bidCode=getCodeFromTvc("../bin/AuctionBid.tvc"), auctionCode=getCodeFromTvc("../bin/AuctionDnsRecord.tvc"))
+        cls.debot   = AuctionDebot(tonClient=getClient(), ownerAddress=cls.msig.ADDRESS)
+
     def test_0(self):
         print("\n\n----------------------------------------------------------------------")
         print("Running:", self.__class__.__name__)
@@ -772,5 +1685,63 @@ class Test_07_DeployDebot(unittest.TestCase):
         #self.assertEqual(result[1]["errorCode"], 0)
 
 # ==============================================================================
-# 
-unittest.main()
+# "sys.stdout" while scenarios run side by side: "print" of a scenario thread goes to that scenario's stream;
+# threads a test starts itself are not scenario threads and print to the real stdout
+class ScenarioStdout(object):
+    def __init__(self, stdout):
+        self.STDOUT  = stdout
+        self.STREAMS = threading.local()
+
+    def _getStream(self):
+        return getattr(self.STREAMS, "stream", self.STDOUT)
+
+    def write(self, text):
+        return self._getStream().write(text)
+
+    def flush(self):
+        self._getStream().flush()
+
+    def __getattr__(self, name: str):
+        return getattr(self.STDOUT, name)
+
+# ==============================================================================
+# Scenario classes side by side, "workers" at a time; tests of one class keep their order,
+# class names left in argv pick the scenarios; output of every scenario is printed in one piece, then the timing report
+def runParallel(workers: int, names):
+    loader  = unittest.TestLoader()
+    classes = [value for (name, value) in sorted(globals().items()) if name.startswith("Test_") and (not names or name in names)]
+    stdout  = ScenarioStdout(sys.stdout)
+
+    def _runScenario(testClass):
+        stream  = io.StringIO()
+        started = time.monotonic()
+        stdout.STREAMS.stream = stream
+        try:
+            result = unittest.TextTestRunner(stream=stream, verbosity=2).run(loader.loadTestsFromTestCase(testClass))
+        finally:
+            del stdout.STREAMS.stream
+        return (testClass.__name__, result, time.monotonic() - started, stream.getvalue())
+
+    started    = time.monotonic()
+    sys.stdout = stdout
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            reports = list(executor.map(_runScenario, classes))
+    finally:
+        sys.stdout = stdout.STDOUT
+    elapsed = time.monotonic() - started
+
+    for (_, _, _, output) in reports:
+        print(output)
+    print("{:<45} {:>6} {:>7} {:>9}".format("Scenario", "Tests", "Failed", "Seconds"))
+    for (name, result, seconds, _) in reports:
+        print("{:<45} {:>6} {:>7} {:>9.2f}".format(name, result.testsRun, len(result.failures) + len(result.errors), seconds))
+    print("{} scenarios in {:.2f}s ({:.2f}s one after another)".format(len(reports), elapsed, sum(report[2] for report in reports)))
+    return all(result.wasSuccessful() for (_, result, _, _) in reports)
+
+# ==============================================================================
+# Guarded, CodecService workers import this module again
+if __name__ == "__main__":
+    if PARALLEL_WORKERS > 0:
+        sys.exit(0 if runParallel(PARALLEL_WORKERS, sys.argv[1:]) else 1)
+    unittest.main()